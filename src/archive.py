@@ -0,0 +1,234 @@
+"""
+Append-only archives of binary game records (see replay.py).
+
+An archive is two files:
+
+  - the data file, holding the records one after another, and
+  - the index file (the data file's path plus ".idx"), holding one
+    little-endian 8-byte offset per record: the offset in the data
+    file at which that record ends. Record i starts where record
+    i - 1 ends (record 0 at offset 0).
+
+ArchiveWriter appends a record to the data file before its offset to
+the index, so a crash can at worst leave unindexed bytes at the end of
+the data file, which the next writer cuts off.
+
+ArchiveReader maps both files into memory (mmap), so that opening an
+archive reads nothing, finding a record takes two index lookups, and
+records are returned as memoryview slices of the mapping rather than
+copies. Readers pickle as their path, so worker processes of a pool
+each map the same file and share its pages in the OS page cache
+instead of each holding a copy.
+"""
+import contextlib
+import mmap
+import os
+import struct
+from typing import BinaryIO, Iterator, Optional, Union
+
+from blokus import Blokus
+from replay import Replayer, record
+
+_OFFSET = struct.Struct("<Q")
+
+
+def index_path(path: str) -> str:
+    """
+    Returns the path of an archive's index file.
+    """
+    return path + ".idx"
+
+
+class ArchiveWriter:
+    """
+    Appends records to an archive, creating it if needed.
+    Use as a context manager.
+    """
+
+    path: str
+    _data: BinaryIO
+    _index: BinaryIO
+    _end: int
+    _count: int
+
+    def __init__(self, path: str) -> None:
+        """
+        Opens the archive at path for appending, dropping any bytes
+        that were written to it but never indexed.
+
+        Raises ValueError if the data file is shorter than its index
+        says (records were lost, so appending would corrupt it).
+        """
+        self.path = path
+        self._index = open(index_path(path), "a+b")
+        size = self._index.seek(0, os.SEEK_END)
+        self._count = size // _OFFSET.size
+        self._index.truncate(self._count * _OFFSET.size)
+        self._end = 0
+        if self._count:
+            self._index.seek((self._count - 1) * _OFFSET.size)
+            self._end = _OFFSET.unpack(self._index.read(_OFFSET.size))[0]
+        self._data = open(path, "a+b")
+        if self._data.seek(0, os.SEEK_END) < self._end:
+            self.close()
+            raise ValueError(f"{path} is shorter than its index.")
+        self._data.truncate(self._end)
+
+    def __len__(self) -> int:
+        """
+        Returns the number of records in the archive.
+        """
+        return self._count
+
+    def append(self, data: bytes) -> int:
+        """
+        Appends a record, and returns its position in the archive.
+        """
+        self._data.write(data)
+        self._data.flush()
+        self._end += len(data)
+        self._index.write(_OFFSET.pack(self._end))
+        self._index.flush()
+        self._count += 1
+        return self._count - 1
+
+    def append_game(self, game: Blokus) -> int:
+        """
+        Appends the record of a game (see replay.record), and returns
+        its position in the archive.
+        """
+        return self.append(record(game))
+
+    def close(self) -> None:
+        """
+        Closes the archive.
+        """
+        self._data.close()
+        self._index.close()
+
+    def __enter__(self) -> "ArchiveWriter":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+def _map(path: str) -> Union[mmap.mmap, bytes]:
+    """
+    Maps a file read-only into memory (an empty file maps to b"").
+    """
+    with open(path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class ArchiveReader:
+    """
+    Random access to the records of an archive, through memory maps.
+    Records appended after the reader was opened are not visible
+    to it.
+    """
+
+    path: str
+    _data: Union[mmap.mmap, bytes]
+    _index: Union[mmap.mmap, bytes]
+    _view: memoryview
+    _count: int
+
+    def __init__(self, path: str) -> None:
+        """
+        Maps the archive at path.
+
+        Raises FileNotFoundError if there is no archive at path.
+        """
+        self.path = path
+        self._index = _map(index_path(path))
+        self._data = _map(path)
+        self._view = memoryview(self._data)
+        count = len(self._index) // _OFFSET.size
+        # Ignore offsets past the end of the data (only possible if the
+        # data file was truncated behind the writer's back).
+        while count and self._offset(count) > len(self._data):
+            count -= 1
+        self._count = count
+
+    def __reduce__(self) -> tuple:
+        return (ArchiveReader, (self.path,))
+
+    def _offset(self, i: int) -> int:
+        """
+        Returns the offset at which record i - 1 ends (0 for i = 0).
+        """
+        if i == 0:
+            return 0
+        return _OFFSET.unpack_from(self._index, (i - 1) * _OFFSET.size)[0]
+
+    def __len__(self) -> int:
+        """
+        Returns the number of records in the archive.
+        """
+        return self._count
+
+    def __getitem__(self, i: int) -> memoryview:
+        """
+        Returns record i, as a read-only view of the archive
+        (negative positions count from the end).
+
+        Raises IndexError if there is no record i.
+        """
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        return self._view[self._offset(i):self._offset(i + 1)]
+
+    def span(self, start: int, stop: int) -> memoryview:
+        """
+        Returns records start to stop - 1, concatenated, as one
+        read-only view of the archive.
+
+        Raises IndexError unless 0 <= start <= stop <= len(self).
+        """
+        if not 0 <= start <= stop <= self._count:
+            raise IndexError((start, stop))
+        return self._view[self._offset(start):self._offset(stop)]
+
+    def records(self, start: int = 0,
+                stop: Optional[int] = None) -> Iterator[memoryview]:
+        """
+        Yields records start to stop - 1 (by default, all of them)
+        as read-only views of the archive.
+        """
+        stop = self._count if stop is None else min(stop, self._count)
+        end = self._offset(start)
+        for i in range(start, stop):
+            begin, end = end, self._offset(i + 1)
+            yield self._view[begin:end]
+
+    def __iter__(self) -> Iterator[memoryview]:
+        return self.records()
+
+    def replayer(self, i: int, trusted: bool = False) -> Replayer:
+        """
+        Returns a Replayer for record i (see replay.Replayer).
+        """
+        return Replayer(self[i], trusted=trusted)
+
+    def close(self) -> None:
+        """
+        Unmaps the archive. If views returned earlier are still in use,
+        the data stays mapped until they are garbage collected.
+        """
+        with contextlib.suppress(BufferError):
+            self._view.release()
+        for mapping in (self._data, self._index):
+            if isinstance(mapping, mmap.mmap):
+                with contextlib.suppress(BufferError):
+                    mapping.close()
+
+    def __enter__(self) -> "ArchiveReader":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
@@ -0,0 +1,392 @@
+"""
+Vectorized simulation of many independent Blokus games (requires numpy).
+
+BlokusBatch advances N games of the same layout in lockstep. Every
+placement that fits on the board (an orientation at an anchor; see
+orientations.py) gets a placement id, and the placements are
+precomputed as a sparse placement-by-square table: for each placement,
+the squares it covers, the squares sharing an edge with it, and the
+squares diagonal to it. Rows are padded to a fixed width with a dummy
+square that lies off the board and is never blocked or on a frontier.
+
+The games themselves are stacked arrays (one row per game), so checking
+the legality of every placement in every game, making one move in every
+game, and updating scores and the game-over flags are each a handful of
+whole-array operations. For the legality check, the current player's
+planes are bit-packed across games, 64 games to a word, and each
+placement's squares are looked up in the packed planes.
+
+Memory grows with N times the number of placements (about 12,000 on a
+14 x 14 board and 30,000 on a 20 x 20 board), so very large batches
+are best split into several.
+"""
+from functools import lru_cache
+from typing import Optional
+
+import numpy as np
+
+from shape_definitions import ShapeKind
+from piece import Point
+from orientations import ALL_ORIENTATIONS
+from move import Move, encode_move
+from zobrist import SHAPE_INDEX
+
+NUM_SHAPES = len(SHAPE_INDEX)
+ONE_INDEX = SHAPE_INDEX[ShapeKind.ONE]
+
+# Action meaning "retire" (or, for games already over, "do nothing").
+RETIRE = -1
+
+
+class Placements:
+    """
+    Every placement that fits on a (size x size) board.
+
+    Squares are numbered r * size + c; number size * size is the
+    dummy square used for padding.
+
+        moves : the Move of each placement
+        codes : the move code (see move.encode_move) of each placement
+        shapes : the shape index (see zobrist.SHAPE_INDEX) of each
+        num_squares : the number of squares each placement covers
+        squares : (placements x 5) squares covered by each placement
+        edges : (placements x E) squares sharing an edge with each
+        corners : (placements x C) squares diagonal to each, but not
+            sharing an edge with it
+    """
+
+    size: int
+    moves: list[Move]
+    codes: np.ndarray
+    shapes: np.ndarray
+    num_squares: np.ndarray
+    squares: np.ndarray
+    edges: np.ndarray
+    corners: np.ndarray
+
+    def __init__(self, size: int) -> None:
+        """
+        Enumerates the placements of a (size x size) board.
+        """
+        self.size = size
+        dummy = size * size
+        moves = []
+        squares = []
+        edges = []
+        corners = []
+        for orientation in ALL_ORIENTATIONS:
+            rows, cols = orientation.anchors(size)
+            for r in rows:
+                for c in cols:
+                    move = Move(orientation.kind, orientation.orientation_id,
+                                (r, c))
+                    covered = set(move.squares())
+                    edge = _neighbors(covered, size,
+                                      ((-1, 0), (0, -1), (0, 1), (1, 0)))
+                    corner = _neighbors(covered, size,
+                                        ((-1, -1), (-1, 1), (1, -1), (1, 1)))
+                    moves.append(move)
+                    squares.append(sorted(covered))
+                    edges.append(sorted(edge))
+                    corners.append(sorted(corner - edge))
+
+        def table(rows: list[list[Point]]) -> np.ndarray:
+            width = max(len(row) for row in rows)
+            result = np.full((len(rows), width), dummy, dtype=np.int32)
+            for i, row in enumerate(rows):
+                result[i, :len(row)] = [r * size + c for r, c in row]
+            return result
+
+        self.moves = moves
+        self.codes = np.array([encode_move(move, size) for move in moves],
+                              dtype=np.int32)
+        self.shapes = np.array([SHAPE_INDEX[move.kind] for move in moves],
+                               dtype=np.int8)
+        self.num_squares = np.array([len(row) for row in squares],
+                                    dtype=np.int16)
+        self.squares = table(squares)
+        self.edges = table(edges)
+        self.corners = table(corners)
+
+    def __len__(self) -> int:
+        """
+        Returns the number of placements.
+        """
+        return len(self.moves)
+
+
+def _neighbors(covered: set[Point], size: int,
+               offsets: tuple[Point, ...]) -> set[Point]:
+    """
+    Returns the on-board squares at the given offsets from the covered
+    squares, other than the covered squares themselves.
+    """
+    result = set()
+    for r, c in covered:
+        for dr, dc in offsets:
+            point = (r + dr, c + dc)
+            if 0 <= point[0] < size and 0 <= point[1] < size and \
+                    point not in covered:
+                result.add(point)
+    return result
+
+
+@lru_cache(maxsize=None)
+def placements(size: int) -> Placements:
+    """
+    Returns the (shared) placement table for a (size x size) board.
+    """
+    return Placements(size)
+
+
+class BlokusBatch:
+    """
+    N independent Blokus games with the same layout, played in
+    lockstep. Players and the rules are as in blokus.Blokus; arrays
+    indexed by player have an unused column 0.
+
+    Attributes (one row per game):
+        owner : (N x squares + 1) player occupying each square, or 0
+        blocked : (N x players + 1 x squares + 1) squares each player
+            may not cover (occupied, or sharing an edge with their
+            pieces)
+        corners : (N x players + 1 x squares + 1) each player's corner
+            frontier (may also include blocked squares, which no
+            legal placement covers anyway)
+        remaining : (N x players + 1 x 21) shapes each player has
+            not played
+        retired : (N x players + 1) retired players
+        scores : (N x players + 1) scores
+        curr_player : (N) player to move
+        done : (N) whether the game is over
+    """
+
+    num_games: int
+    num_players: int
+    size: int
+    start_positions: set[Point]
+    placements: Placements
+    owner: np.ndarray
+    blocked: np.ndarray
+    corners: np.ndarray
+    remaining: np.ndarray
+    retired: np.ndarray
+    scores: np.ndarray
+    curr_player: np.ndarray
+    done: np.ndarray
+
+    def __init__(self, num_games: int, num_players: int, size: int,
+                 start_positions: set[Point]) -> None:
+        """
+        Constructor
+
+            num_games: number of games to play in lockstep
+            num_players, size, start_positions: see BlokusBase
+
+        Raises ValueError...
+            if num_games is less than 1,
+            if num_players is less than 1 or more than 4,
+            if the size is less than 5,
+            if not all start_positions are on the board, or
+            if there are fewer start_positions than num_players.
+        """
+        if num_games < 1:
+            raise ValueError("Need at least one game.")
+        if num_players < 1 or num_players > 4:
+            raise ValueError("Incorrect # of players.")
+        if size < 5:
+            raise ValueError("Incorrect size")
+        for r, c in start_positions:
+            if not (0 <= r < size and 0 <= c < size):
+                raise ValueError("Start position not on board.")
+        if len(start_positions) < num_players:
+            raise ValueError("Fewer start positions than # of players.")
+
+        self.num_games = num_games
+        self.num_players = num_players
+        self.size = size
+        self.start_positions = start_positions
+        self.placements = placements(size)
+
+        n, p, s = num_games, num_players + 1, size * size + 1
+        self.owner = np.zeros((n, s), dtype=np.int8)
+        self.blocked = np.zeros((n, p, s), dtype=bool)
+        self.corners = np.zeros((n, p, s), dtype=bool)
+        for r, c in start_positions:
+            self.corners[:, 1:, r * size + c] = True
+        self.remaining = np.ones((n, p, NUM_SHAPES), dtype=bool)
+        self.remaining[:, 0] = False
+        self.retired = np.zeros((n, p), dtype=bool)
+        self.scores = np.full((n, p), -89, dtype=np.int16)
+        self.scores[:, 0] = 0
+        self.curr_player = np.ones(n, dtype=np.int8)
+        self.done = np.zeros(n, dtype=bool)
+
+    def _legal_words(self) -> np.ndarray:
+        """
+        Returns the legality of every placement in every game, packed
+        as a (placements x words) uint64 array whose bit g (counting
+        words from the left) is game g.
+        """
+        games = np.arange(self.num_games)
+        table = self.placements
+        blocked = _pack(self.blocked[games, self.curr_player])
+        corners = _pack(self.corners[games, self.curr_player])
+        remaining = _pack(self.remaining[games, self.curr_player])
+        playing = _pack(~self.done[:, None])
+
+        # 64 games per operation.
+        fits = blocked[table.squares[:, 0]]
+        touches = corners[table.squares[:, 0]]
+        for k in range(1, table.squares.shape[1]):
+            fits |= blocked[table.squares[:, k]]
+            touches |= corners[table.squares[:, k]]
+        return ~fits & touches & remaining[table.shapes] & playing
+
+    def legal_placements(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the legal placements of the current player of each
+        game as two arrays, the games and the placement ids, sorted
+        by game. Finished games have none.
+        """
+        words = self._legal_words()
+        ids, columns = np.nonzero(words)
+        bits = np.unpackbits(words[ids, columns].view(np.uint8)
+                             .reshape(-1, 8), axis=1, bitorder="little")
+        rows, offsets = np.nonzero(bits)
+        games = columns[rows] * 64 + offsets
+        order = np.argsort(games, kind="stable")
+        return games[order], ids[rows][order]
+
+    def legal_mask(self) -> np.ndarray:
+        """
+        Returns the (N x placements) boolean mask of the placements
+        the current player of each game may make. Rows of finished
+        games are all False.
+        """
+        games, ids = self.legal_placements()
+        mask = np.zeros((self.num_games, len(self.placements)), dtype=bool)
+        mask[games, ids] = True
+        return mask
+
+    def step(self, actions: np.ndarray) -> None:
+        """
+        Makes one move in every game that is not over: the placement
+        with the given id, or a retirement for RETIRE. Actions for
+        finished games are ignored. The actions must be legal (see
+        legal_mask); they are not checked.
+        """
+        actions = np.asarray(actions)
+        active = ~self.done
+        retiring = active & (actions == RETIRE)
+        placing = active & (actions != RETIRE)
+        games = np.nonzero(placing)[0]
+        players = self.curr_player[games].astype(np.intp)
+        chosen = actions[games]
+        table = self.placements
+
+        self.retired[retiring, self.curr_player[retiring]] = True
+
+        first = self.remaining[games, players].all(axis=1)
+        for r, c in self.start_positions:
+            self.corners[games[first], players[first], r * self.size + c] = \
+                False
+
+        covered = table.squares[chosen]
+        rows = games[:, None]
+        self.owner[rows, covered] = players[:, None]
+        self.blocked[rows, :, covered] = True
+        self.blocked[rows, players[:, None], table.edges[chosen]] = True
+        self.corners[rows, players[:, None], table.corners[chosen]] = True
+
+        shapes = table.shapes[chosen]
+        self.remaining[games, players, shapes] = False
+        points = table.num_squares[chosen].astype(np.int16)
+        finished = ~self.remaining[games, players].any(axis=1)
+        points[finished] += np.where(shapes[finished] == ONE_INDEX, 20, 15)
+        self.scores[games, players] += points
+
+        # Keep the dummy square empty and off every frontier.
+        dummy = self.size * self.size
+        self.owner[:, dummy] = 0
+        self.blocked[:, :, dummy] = False
+        self.corners[:, :, dummy] = False
+
+        self._next_players(active)
+
+    def _next_players(self, moved: np.ndarray) -> None:
+        """
+        Updates the game-over flags and passes the turn, in each game
+        that just moved and is not over, to the next player who has
+        neither retired nor played all of their pieces.
+        """
+        playing = ~self.retired & self.remaining.any(axis=2)
+        self.done = np.asarray(~playing.any(axis=1), dtype=bool)
+        moving = moved & ~self.done
+        games = np.nonzero(moving)[0]
+        if len(games) == 0:
+            return
+        curr = self.curr_player[games].astype(np.intp)
+        offsets = np.arange(1, self.num_players + 1)
+        candidates = (curr[:, None] + offsets[None, :] - 1) \
+            % self.num_players + 1
+        eligible = playing[games[:, None], candidates]
+        first = eligible.argmax(axis=1)
+        self.curr_player[games] = candidates[np.arange(len(games)), first]
+
+    def winners(self) -> np.ndarray:
+        """
+        Returns the (N x players + 1) boolean mask of each finished
+        game's winners (all False for games that are not over).
+        """
+        scores = self.scores[:, 1:]
+        best = scores.max(axis=1, keepdims=True)
+        result = np.zeros_like(self.retired)
+        result[:, 1:] = (scores == best) & self.done[:, None]
+        return result
+
+    def move(self, action: int) -> Optional[Move]:
+        """
+        Returns the Move for a placement id (None for RETIRE).
+        """
+        if action == RETIRE:
+            return None
+        return self.placements.moves[action]
+
+
+def _pack(planes: np.ndarray) -> np.ndarray:
+    """
+    Packs an (N x M) boolean array into an (M x words) uint64 array
+    whose bit g (counting words from the left) is row g.
+    """
+    packed = np.packbits(planes.T, axis=1, bitorder="little")
+    padding = -packed.shape[1] % 8
+    if padding:
+        packed = np.pad(packed, ((0, 0), (0, padding)))
+    return np.ascontiguousarray(packed).view(np.uint64)
+
+
+def random_actions(batch: BlokusBatch,
+                   rng: np.random.Generator) -> np.ndarray:
+    """
+    Picks a uniformly random legal placement for each game of the
+    batch, or RETIRE where there is none.
+    """
+    games, ids = batch.legal_placements()
+    counts = np.bincount(games, minlength=batch.num_games)
+    firsts = np.cumsum(counts) - counts
+    picks = firsts + (rng.random(len(counts)) * counts).astype(np.intp)
+    actions = np.full(len(counts), RETIRE, dtype=np.intp)
+    actions[counts > 0] = ids[picks[counts > 0]]
+    return actions
+
+
+def play_random_games(batch: BlokusBatch,
+                      rng: np.random.Generator) -> np.ndarray:
+    """
+    Plays every game of the batch to the end with uniformly random
+    legal moves, and returns the final scores (N x players + 1).
+    """
+    while not batch.done.all():
+        batch.step(random_actions(batch, rng))
+    return batch.scores
@@ -0,0 +1,392 @@
+"""
+Benchmarks of the engine's hot paths, with saved baselines.
+
+Each benchmark times one operation of a BlokusBase engine in a fixed
+position: a setup (mini, mono, duo or classic board, 1 to 4 players)
+at a phase of the game (its opening, or a third or two thirds of the
+way through a seeded random game, built up move by move the way
+place_many_pieces in tests/test_blokus.py builds its position). The
+operations are:
+
+    available_moves   one call
+    legal_to_place    one call, on a mix of legal and illegal pieces
+    maybe_place       placing one legal piece
+    remaining_shapes  one call
+    playout           a game finished with uniformly random moves
+
+Every benchmark is run until a sample takes at least min_time, and
+the best of repeat samples is kept, as seconds per operation (the
+minimum is the least noisy estimate of what the code costs).
+
+Results can be saved as a JSON baseline, and later runs compared to
+it: the command exits with status 1 if any benchmark got slower than
+its baseline by more than the threshold. A baseline records the engine
+it was run on, and is only compared with runs on the same engine:
+
+    python src/benchmark.py --save baseline.json
+    python src/benchmark.py --compare baseline.json --threshold 0.1
+"""
+import copy
+import json
+import math
+import platform
+import random
+import sys
+import time
+from typing import Callable, NamedTuple, Optional, Sequence
+
+import click
+
+from base import BlokusBase
+from blokus import Blokus
+from piece import Piece
+from layouts import Layout
+from move import Move
+from bot import ordered_moves
+from engines import ENGINES, SETUPS, game_moves, setup_game
+
+VERSION = 1
+
+# How far through the seeded game each phase's position is.
+PHASES: dict[str, float] = {
+    "opening": 0.0,
+    "middle": 1 / 3,
+    "late": 2 / 3,
+}
+
+# Sets up a benchmark in a position: does any preparation needed for
+# `number` operations, and returns a function that performs them and
+# returns how many it performed (0 if the operation does not apply to
+# the position) and how long they took, in seconds.
+Operation = Callable[[BlokusBase, random.Random, int],
+                     Callable[[], tuple[int, float]]]
+
+
+class Baseline(NamedTuple):
+    """
+    Saved benchmark results.
+
+        engine : the name of the engine they were run on (see ENGINES)
+        results : seconds per operation, by key (setup/phase/operation)
+    """
+
+    engine: str
+    results: dict[str, float]
+
+
+class Comparison(NamedTuple):
+    """
+    A benchmark's result next to its baseline.
+
+        key : the benchmark (setup/phase/operation)
+        baseline : the baseline's seconds per operation
+        current : this run's seconds per operation
+        ratio : current / baseline
+    """
+
+    key: str
+    baseline: float
+    current: float
+    ratio: float
+
+
+def position(engine: type[BlokusBase], layout: Layout,
+             moves: Sequence[Optional[Move]], phase: float) -> BlokusBase:
+    """
+    Returns a game of the engine after the first moves of a game, up
+    to the given fraction of them, backing up until the player to
+    move has a legal move.
+    """
+    plies = math.floor(phase * len(moves))
+    while True:
+        game = setup_game(engine, layout, moves[:plies])
+        if plies == 0 or game.available_moves():
+            return game
+        plies -= 1
+
+
+def _timed(run: Callable[[], int]) -> Callable[[], tuple[int, float]]:
+    """
+    Returns a function that calls run, and returns its result and how
+    long it took.
+    """
+    def timed() -> tuple[int, float]:
+        start = time.perf_counter()
+        count = run()
+        return count, time.perf_counter() - start
+    return timed
+
+
+def _available_moves(game: BlokusBase, rng: random.Random,
+                     number: int) -> Callable[[], tuple[int, float]]:
+    def run() -> int:
+        for _ in range(number):
+            game.available_moves()
+        return number
+    return _timed(run)
+
+
+def _legal_to_place(game: BlokusBase, rng: random.Random,
+                    number: int) -> Callable[[], tuple[int, float]]:
+    # Up to 16 legal pieces, and 16 pieces of the player's remaining
+    # shapes at random places and orientations.
+    legal = ordered_moves(game)
+    pieces = rng.sample(legal, min(16, len(legal)))
+    shapes = game.remaining_shapes(game.curr_player)
+    for _ in range(16):
+        piece = Piece(game.shapes[rng.choice(shapes)])
+        piece.set_anchor((rng.randrange(game.size),
+                          rng.randrange(game.size)))
+        for _ in range(rng.randrange(4)):
+            piece.rotate_right()
+        pieces.append(piece)
+
+    def run() -> int:
+        for _ in range(number):
+            for piece in pieces:
+                game.legal_to_place(piece)
+        return number * len(pieces)
+    return _timed(run)
+
+
+def _maybe_place(game: BlokusBase, rng: random.Random,
+                 number: int) -> Callable[[], tuple[int, float]]:
+    # Engines that can take moves back (Blokus.pop) place the piece
+    # over and over in the same game; others get a copy per placement.
+    legal = ordered_moves(game)
+    if not legal:
+        return lambda: (0, 0.0)
+    move = Move.from_piece(rng.choice(legal))
+    pieces = [move.to_piece() for _ in range(number)]
+    pop = getattr(game, "pop", None)
+    games = [game] * number if pop is not None else \
+        [copy.deepcopy(game) for _ in range(number)]
+
+    def run() -> tuple[int, float]:
+        seconds = 0.0
+        for copied, piece in zip(games, pieces):
+            start = time.perf_counter()
+            copied.maybe_place(piece)
+            seconds += time.perf_counter() - start
+            if pop is not None:
+                pop()
+        return number, seconds
+    return run
+
+
+def _remaining_shapes(game: BlokusBase, rng: random.Random,
+                      number: int) -> Callable[[], tuple[int, float]]:
+    players = range(1, game.num_players + 1)
+
+    def run() -> int:
+        for _ in range(number):
+            for player in players:
+                game.remaining_shapes(player)
+        return number * len(players)
+    return _timed(run)
+
+
+def _playout(game: BlokusBase, rng: random.Random,
+             number: int) -> Callable[[], tuple[int, float]]:
+    games = [copy.deepcopy(game) for _ in range(number)]
+    seed = rng.getrandbits(64)
+
+    def run() -> int:
+        playout_rng = random.Random(seed)
+        for copied in games:
+            while not copied.game_over:
+                legal = ordered_moves(copied)
+                if legal:
+                    copied.maybe_place(playout_rng.choice(legal))
+                else:
+                    copied.retire()
+        return number
+    return _timed(run)
+
+
+OPERATIONS: dict[str, Operation] = {
+    "available_moves": _available_moves,
+    "legal_to_place": _legal_to_place,
+    "maybe_place": _maybe_place,
+    "remaining_shapes": _remaining_shapes,
+    "playout": _playout,
+}
+
+
+def measure(operation: Operation, game: BlokusBase, repeat: int = 3,
+            min_time: float = 0.05, seed: int = 0) -> Optional[float]:
+    """
+    Returns the best of repeat samples of an operation's time in a
+    position, in seconds per operation, each sample repeating it
+    enough times to take at least min_time, unless that would take
+    more than ten times as long with its preparation (or None if the
+    operation does not apply to the position).
+    """
+    number = 1
+    while True:
+        start = time.perf_counter()
+        count, elapsed = operation(game, random.Random(seed), number)()
+        if count == 0:
+            return None
+        if elapsed >= min_time:
+            break
+        scale = max(2, min(10, math.ceil(min_time / max(elapsed, 1e-9))))
+        # Untimed preparation (such as copying the game) counts towards
+        # a limit too, so that it cannot make samples take long.
+        if (time.perf_counter() - start) * scale > 10 * min_time:
+            break
+        number *= scale
+    best = elapsed / count
+    for _ in range(repeat - 1):
+        count, elapsed = operation(game, random.Random(seed), number)()
+        best = min(best, elapsed / count)
+    return best
+
+
+def run_benchmarks(setups: Sequence[str], phases: Sequence[str],
+                   operations: Sequence[str],
+                   engine: type[BlokusBase] = Blokus, repeat: int = 3,
+                   min_time: float = 0.05, seed: int = 0,
+                   progress: Optional[Callable[[str, float], None]] = None
+                   ) -> dict[str, float]:
+    """
+    Runs the benchmarks of every setup, phase and operation, and
+    returns their seconds per operation by key (setup/phase/operation),
+    calling progress with each result as it comes.
+    """
+    results = {}
+    for setup in setups:
+        layout = SETUPS[setup]
+        moves = game_moves(layout, seed)
+        for phase in phases:
+            game = position(engine, layout, moves, PHASES[phase])
+            for name in operations:
+                seconds = measure(OPERATIONS[name], game, repeat, min_time,
+                                  seed)
+                if seconds is None:
+                    continue
+                key = f"{setup}/{phase}/{name}"
+                results[key] = seconds
+                if progress is not None:
+                    progress(key, seconds)
+    return results
+
+
+def save(path: str, results: dict[str, float], engine: str) -> None:
+    """
+    Writes results to a JSON baseline file.
+    """
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump({"version": VERSION, "engine": engine,
+                   "python": platform.python_version(),
+                   "results": results}, file, indent=2, sort_keys=True)
+        file.write("\n")
+
+
+def load(path: str) -> Baseline:
+    """
+    Returns the baseline stored in a JSON baseline file.
+
+    Raises ValueError if the file is not a baseline.
+    """
+    with open(path, encoding="utf-8") as file:
+        data = json.load(file)
+    if not isinstance(data, dict) or data.get("version") != VERSION or \
+            not isinstance(data.get("engine"), str):
+        raise ValueError("Not a benchmark baseline.")
+    return Baseline(data["engine"], data["results"])
+
+
+def compare(baseline: dict[str, float],
+            results: dict[str, float]) -> list[Comparison]:
+    """
+    Returns the comparison of every benchmark in both the baseline and
+    the results, in the results' order.
+    """
+    return [Comparison(key, baseline[key], seconds, seconds / baseline[key])
+            for key, seconds in results.items() if key in baseline]
+
+
+def regressions(comparisons: Sequence[Comparison],
+                threshold: float) -> list[Comparison]:
+    """
+    Returns the comparisons that got slower by more than the threshold
+    (0.1 for 10%).
+    """
+    return [c for c in comparisons if c.ratio > 1 + threshold]
+
+
+def _format(seconds: float) -> str:
+    """
+    Returns a time in the most readable unit.
+    """
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3g} {unit}"
+    return f"{seconds / 1e-9:.3g} ns"
+
+
+@click.command
+@click.option("-s", "--setup", "setups", multiple=True,
+              type=click.Choice(list(SETUPS)),
+              help="setup to benchmark (repeatable; default: all)")
+@click.option("-p", "--phase", "phases", multiple=True,
+              type=click.Choice(list(PHASES)),
+              help="game phase (repeatable; default: all)")
+@click.option("-o", "--operation", "operations", multiple=True,
+              type=click.Choice(list(OPERATIONS)),
+              help="operation (repeatable; default: all)")
+@click.option("-e", "--engine", default="blokus",
+              type=click.Choice(list(ENGINES)), help="engine")
+@click.option("-r", "--repeat", default=3, help="samples per benchmark")
+@click.option("--min-time", default=0.05, help="seconds per sample")
+@click.option("--seed", default=0, help="random seed of the positions")
+@click.option("--save", "save_path", default=None,
+              help="write the results to a JSON baseline")
+@click.option("--compare", "baseline_path", default=None,
+              type=click.Path(exists=True, dir_okay=False),
+              help="compare the results with a JSON baseline")
+@click.option("-t", "--threshold", default=0.1,
+              help="slowdown that counts as a regression (0.1 = 10%)")
+def main_benchmark(setups: tuple[str, ...], phases: tuple[str, ...],
+                   operations: tuple[str, ...], engine: str, repeat: int,
+                   min_time: float, seed: int, save_path: Optional[str],
+                   baseline_path: Optional[str], threshold: float) -> None:
+    """
+    Benchmark the engine, and check for regressions against a
+    baseline recorded on the same engine.
+    """
+    baseline = None
+    if baseline_path is not None:
+        saved = load(baseline_path)
+        if saved.engine != engine:
+            raise click.UsageError(
+                f"{baseline_path} was recorded on the {saved.engine} "
+                f"engine, not {engine}.")
+        baseline = saved.results
+
+    def progress(key: str, seconds: float) -> None:
+        line = f"{key:<40} {_format(seconds):>10}"
+        if baseline is not None and key in baseline:
+            line += f" {seconds / baseline[key]:>7.2f}x"
+        print(line, flush=True)
+
+    results = run_benchmarks(setups or list(SETUPS), phases or list(PHASES),
+                             operations or list(OPERATIONS), ENGINES[engine],
+                             repeat, min_time, seed, progress)
+    if save_path is not None:
+        save(save_path, results, engine)
+    if baseline is not None:
+        slower = regressions(compare(baseline, results), threshold)
+        for comparison in slower:
+            print(f"REGRESSION {comparison.key}: "
+                  f"{_format(comparison.baseline)} -> "
+                  f"{_format(comparison.current)} "
+                  f"({comparison.ratio:.2f}x)")
+        if slower:
+            sys.exit(1)
+        print(f"No regressions beyond {threshold:.0%}.")
+
+
+if __name__ == "__main__":
+    main_benchmark()
@@ -0,0 +1,397 @@
+"""
+Bitboard implementation of BlokusBase.
+
+The board is stored as arbitrary-precision integers with one bit per
+square, so that the placement rules reduce to a few bitwise tests.
+
+Squares are numbered row by row, with one unused guard column at the
+end of every row: square (r, c) is bit r * (size + 1) + c. Shifting a
+mask by one bit to the left or right therefore never wraps a square
+around onto the neighbouring row; it lands on a guard bit instead,
+which is masked away.
+"""
+from typing import Optional
+
+from shape_definitions import ShapeKind
+from piece import Point, Shape, Piece
+from base import BlokusBase, Grid
+from orientations import ORIENTATIONS, copy_shapes
+from move import Move
+
+
+class BlokusBitboard(BlokusBase):
+    """
+    Bitboard implementation of Blokus. Drop-in replacement for
+    blokus.Blokus.
+
+    New attributes:
+        _width : bits per row of the bitboards (size plus a guard column)
+        _board : mask of every square on the board
+        _starts : mask of the start positions
+        _occupied : mask of the squares covered by any played piece
+        _owned : per-player masks of the squares covered by their pieces
+        _edges : per-player masks of the squares sharing an edge with
+            their pieces; their later pieces may not cover these
+        _corners : per-player masks of the squares sharing a corner with
+            their pieces; their later pieces must cover one of these
+    """
+
+    _shapes: dict[ShapeKind, Shape]
+    _curr_player: int
+    _grid: Grid
+    _scores: dict[int, int]
+    _retired_players: set[int]
+    _placed_pieces: dict[int, set[Piece]]
+    _played: dict[int, set[ShapeKind]]
+    _width: int
+    _board: int
+    _starts: int
+    _occupied: int
+    _owned: dict[int, int]
+    _edges: dict[int, int]
+    _corners: dict[int, int]
+
+    def __init__(
+        self,
+        num_players: int,
+        size: int,
+        start_positions: set[Point],
+    ) -> None:
+        """
+        Constructor (See BlokusBase)
+        """
+        if num_players < 1 or num_players > 4:
+            raise ValueError("Incorrect # of players.")
+        if size < 5:
+            raise ValueError("Incorrect size")
+        for r, c in start_positions:
+            if not (0 <= r < size and 0 <= c < size):
+                raise ValueError("Start position not on board.")
+        if len(start_positions) < num_players:
+            raise ValueError("Fewer start positions than # of players.")
+
+        super().__init__(num_players, size, start_positions)
+
+        self._curr_player = 1
+        self._grid = [[None] * size for _ in range(size)]
+
+        self._shapes = copy_shapes()
+
+        players = range(1, num_players + 1)
+        self._scores = {player: -89 for player in players}
+        self._retired_players = set()
+        self._placed_pieces = {player: set() for player in players}
+        self._played = {player: set() for player in players}
+
+        self._width = size + 1
+        row_mask = (1 << size) - 1
+        self._board = 0
+        for r in range(size):
+            self._board |= row_mask << (r * self._width)
+        self._starts = 0
+        for point in start_positions:
+            self._starts |= self._bit(point)
+        self._occupied = 0
+        self._owned = {player: 0 for player in players}
+        self._edges = {player: 0 for player in players}
+        self._corners = {player: 0 for player in players}
+
+    #
+    # BITBOARD HELPERS
+    #
+
+    def _bit(self, point: Point) -> int:
+        """
+        Returns the mask with only the bit for the given
+        (on-board) square set.
+        """
+        r, c = point
+        return 1 << (r * self._width + c)
+
+    def _piece_mask(self, piece: Piece) -> Optional[int]:
+        """
+        Returns the mask of the squares covered by the piece,
+        or None if any square lies beyond the walls.
+        """
+        assert piece.anchor is not None
+        return self._offsets_mask(tuple(piece.shape.squares), piece.anchor)
+
+    def _edge_neighbors(self, mask: int) -> int:
+        """
+        Returns the on-board squares that share an edge with, but
+        are not part of, the given mask.
+        """
+        w = self._width
+        spread = (mask << 1) | (mask >> 1) | (mask << w) | (mask >> w)
+        return spread & self._board & ~mask
+
+    def _corner_neighbors(self, mask: int) -> int:
+        """
+        Returns the on-board squares that share a corner with
+        the given mask (including squares that also share an edge).
+        """
+        w = self._width
+        spread = (mask << (w + 1)) | (mask << (w - 1)) | \
+                 (mask >> (w - 1)) | (mask >> (w + 1))
+        return spread & self._board & ~mask
+
+    def _check_piece(self, piece: Piece) -> None:
+        """
+        Raises ValueError if the piece has no anchor or if the
+        current player has already played its shape.
+        """
+        if piece.anchor is None or \
+                piece.shape.kind in self._played[self._curr_player]:
+            raise ValueError
+
+    def _next_player(self) -> None:
+        """
+        Passes the turn to the next player who has neither retired
+        nor played all of their pieces. Once the game is over the
+        current player is left unchanged.
+        """
+        if self.game_over:
+            return
+        while True:
+            self._curr_player = (self._curr_player % self._num_players) + 1
+            if self._curr_player not in self._retired_players and \
+                    len(self._played[self._curr_player]) < len(self._shapes):
+                break
+
+    #
+    # PROPERTIES
+    #
+
+    @property
+    def shapes(self) -> dict[ShapeKind, Shape]:
+        """
+        See BlokusBase
+        """
+        return self._shapes
+
+    @property
+    def size(self) -> int:
+        """
+        See BlokusBase
+        """
+        return self._size
+
+    @property
+    def start_positions(self) -> set[Point]:
+        """
+        See BlokusBase
+        """
+        return self._start_positions
+
+    @property
+    def num_players(self) -> int:
+        """
+        See BlokusBase
+        """
+        return self._num_players
+
+    @property
+    def curr_player(self) -> int:
+        """
+        See BlokusBase
+        """
+        return self._curr_player
+
+    @property
+    def retired_players(self) -> set[int]:
+        """
+        See BlokusBase
+        """
+        return self._retired_players
+
+    @property
+    def placed_pieces(self) -> dict[int, set[Piece]]:
+        """
+        Returns the pieces each player has played so far.
+        """
+        return self._placed_pieces
+
+    @property
+    def grid(self) -> Grid:
+        """
+        See BlokusBase
+        """
+        return self._grid
+
+    @property
+    def game_over(self) -> bool:
+        """
+        See BlokusBase
+        """
+        for player in range(1, self._num_players + 1):
+            if player not in self._retired_players and \
+                    len(self._played[player]) < len(self._shapes):
+                return False
+        return True
+
+    @property
+    def winners(self) -> Optional[list[int]]:
+        """
+        See BlokusBase
+        """
+        if not self.game_over:
+            return []
+        winning_score = max(self._scores.values())
+        return [player for player, score in self._scores.items()
+                if score == winning_score]
+
+    #
+    # METHODS
+    #
+
+    def remaining_shapes(self, player: int) -> list[ShapeKind]:
+        """
+        See BlokusBase
+        """
+        return [kind for kind in self._shapes
+                if kind not in self._played[player]]
+
+    def any_wall_collisions(self, piece: Piece) -> bool:
+        """
+        See BlokusBase
+        """
+        self._check_piece(piece)
+        return self._piece_mask(piece) is None
+
+    def any_collisions(self, piece: Piece) -> bool:
+        """
+        See BlokusBase
+        """
+        self._check_piece(piece)
+        mask = self._piece_mask(piece)
+        return mask is None or mask & self._occupied != 0
+
+    def legal_to_place(self, piece: Piece) -> bool:
+        """
+        See BlokusBase
+        """
+        self._check_piece(piece)
+        mask = self._piece_mask(piece)
+        if mask is None or mask & self._occupied:
+            return False
+
+        player = self._curr_player
+        if not self._owned[player]:
+            return mask & self._starts != 0
+        if mask & self._edges[player]:
+            return False
+        return mask & self._corners[player] != 0
+
+    def maybe_place(self, piece: Piece) -> bool:
+        """
+        See BlokusBase
+        """
+        if not self.legal_to_place(piece):
+            return False
+
+        player = self._curr_player
+        kind = piece.shape.kind
+        mask = self._piece_mask(piece)
+        assert mask is not None
+
+        self._occupied |= mask
+        self._owned[player] |= mask
+        self._edges[player] |= self._edge_neighbors(mask)
+        self._corners[player] |= self._corner_neighbors(mask)
+
+        squares = piece.squares()
+        for r, c in squares:
+            self._grid[r][c] = (player, kind)
+        self._scores[player] += len(squares)
+
+        self._placed_pieces[player].add(piece)
+        self._played[player].add(kind)
+        if len(self._played[player]) == len(self._shapes):
+            self._scores[player] += 20 if kind == ShapeKind.ONE else 15
+
+        self._next_player()
+        return True
+
+    def retire(self) -> None:
+        """
+        See BlokusBase
+        """
+        self._retired_players.add(self._curr_player)
+        self._next_player()
+
+    def get_score(self, player: int) -> int:
+        """
+        See BlokusBase
+        """
+        return self._scores[player]
+
+    def available_moves(self) -> set[Piece]:
+        """
+        See BlokusBase
+        """
+        return {move.to_piece() for move in self.legal_moves()}
+
+    def legal_moves(self) -> set[Move]:
+        """
+        Returns the set of all possible moves that the current
+        player may make, one Move per distinct placement.
+
+        Moves are generated with whole-board mask operations, one
+        orientation at a time: the squares its first square can be on
+        are those where every square of the orientation lands on a
+        free square (on the board, unoccupied and sharing no edge with
+        the player's pieces), and some square lands on the player's
+        corner frontier (empty squares diagonal to, but not sharing an
+        edge with, their pieces; or the start positions before their
+        first move). A square that would cross a wall lands on a guard
+        bit or off the board, neither of which is free, since every
+        orientation is connected.
+        """
+        player = self._curr_player
+        if self._owned[player]:
+            frontier = self._corners[player] & ~self._edges[player]
+        else:
+            frontier = self._starts
+        frontier &= ~self._occupied
+        moves: set[Move] = set()
+        if not frontier:
+            return moves
+        free = self._board & ~(self._occupied | self._edges[player])
+
+        w = self._width
+        for kind in self.remaining_shapes(player):
+            for orientation in ORIENTATIONS[kind]:
+                r0, c0 = orientation.squares[0]
+                fits = free
+                touches = 0
+                for dr, dc in orientation.squares:
+                    shift = (dr - r0) * w + (dc - c0)
+                    if shift >= 0:
+                        fits &= free >> shift
+                        touches |= frontier >> shift
+                    else:
+                        fits &= free << -shift
+                        touches |= frontier << -shift
+                found = fits & touches
+                while found:
+                    low = found & -found
+                    found ^= low
+                    r, c = divmod(low.bit_length() - 1, w)
+                    moves.add(Move(kind, orientation.orientation_id,
+                                   (r - r0, c - c0)))
+        return moves
+
+    def _offsets_mask(self, offsets: tuple[Point, ...],
+                      anchor: Point) -> Optional[int]:
+        """
+        Returns the mask of the given offsets from the anchor,
+        or None if any square lies beyond the walls.
+        """
+        ar, ac = anchor
+        mask = 0
+        for dr, dc in offsets:
+            r, c = ar + dr, ac + dc
+            if not (0 <= r < self._size and 0 <= c < self._size):
+                return None
+            mask |= 1 << (r * self._width + c)
+        return mask
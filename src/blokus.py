@@ -1,12 +1,52 @@
+import random
+import struct
 from abc import ABC, abstractmethod
-from typing import Optional
+from array import array
+from typing import NamedTuple, Optional
 
-from shape_definitions import ShapeKind, definitions
+from shape_definitions import ShapeKind
 from piece import Point, Shape, Piece
+from orientations import ORIENTATIONS, copy_shapes
+from move import Move, encode_move, decode_move, code_array
 from base import BlokusBase, Grid
+from zobrist import SHAPE_INDEX, zobrist_keys
+from instrument import Counters, instrument_enabled, instrumented
 
 Cell = Optional[tuple[int, ShapeKind]]
 
+# Snapshot layout (see Blokus.snapshot): the header, then 2 bytes per
+# start position, 1 byte per square (the occupant's player number times
+# 32 plus their shape's index plus 1, or 0 if empty), one _PLAYER entry
+# per player, and for each player their placed moves as move codes,
+# and their forbidden edges and corner frontier as (row, col) byte pairs.
+_SNAPSHOT_MAGIC = b"BLKS"
+_SNAPSHOT_VERSION = 1
+_SNAPSHOT_HEADER = struct.Struct("<4sBBBBB?")
+_SNAPSHOT_PLAYER = struct.Struct("<hBIBHH")
+_SHAPES_BY_INDEX = list(SHAPE_INDEX)
+# Number of squares of each shape.
+_SHAPE_SIZES = {kind: len(ORIENTATIONS[kind][0].squares)
+                for kind in ORIENTATIONS}
+
+
+class _Undo(NamedTuple):
+    """
+    What pop needs to revert one move (None for a retirement):
+    the player who made it, the game_over flag, the position hash and
+    (for placements) the points scored, the player's remaining shapes
+    before the move and the changes to the frontiers and edges.
+    """
+    move: Optional[Move]
+    player: int
+    game_over: bool
+    position_hash: int
+    score: int = 0
+    frontier_removed: tuple[tuple[int, Point], ...] = ()
+    frontier_added: tuple[Point, ...] = ()
+    edges_added: tuple[Point, ...] = ()
+    remaining: Optional[dict[ShapeKind, None]] = None
+
+
 class Blokus(BlokusBase):
     """
     Abstract base class for Blokus."""
@@ -14,12 +54,14 @@ class Blokus(BlokusBase):
     _num_players: int
     _size: int
     _start_positions: set[Point]
+    counters: Optional[Counters]
 
     def __init__(
         self,
         num_players: int,
         size: int,
         start_positions: set[Point],
+        instrument: Optional[bool] = None,
     ) -> None:
         """
         Subclasses should have constructors which accept these
@@ -28,6 +70,10 @@ class Blokus(BlokusBase):
             num_players: Number of players
             size: Number of squares on each side of the board
             start_positions: Positions for players' first moves
+            instrument: Whether to count calls, time and rejections
+                in self.counters (see instrument.py); by default,
+                whether the BLOKUS_INSTRUMENT environment variable
+                is set
 
         Raises ValueError...
             if num_players is less than 1 or more than 4,
@@ -39,9 +85,8 @@ class Blokus(BlokusBase):
             raise ValueError("Incorrect # of players.")
         if size < 5:
             raise ValueError("Incorrect size")
-        for tup in start_positions:
-            r, c = tup
-            if r > size or c > size:
+        for r, c in start_positions:
+            if not (0 <= r < size and 0 <= c < size):
                 raise ValueError("Start position not on board.")
         if len(start_positions) < num_players:
             raise ValueError("Fewer start positions than # of players.")
@@ -50,11 +95,9 @@ class Blokus(BlokusBase):
 
         self._curr_player = 1
 
-        self._grid = [[None] * size for _ in range(size)]
+        self._grid : Grid = [[None] * size for _ in range(size)]
 
-        self._shapes : dict[ShapeKind, Shape] = {}
-        for key, val in definitions.items():
-            self._shapes[key] = Shape.from_string(key, val)
+        self._shapes : dict[ShapeKind, Shape] = copy_shapes()
 
         self._scores : dict[int, int] = {}
         for player in range(1, self.num_players + 1):
@@ -62,9 +105,47 @@ class Blokus(BlokusBase):
 
         self._retired_players : set[int] = set()
 
-        self._placed_pieces : dict[int, set[Piece]] = {}
+        # Shapes each player has not yet played (as dict keys, for
+        # constant-time lookup in definition order), and whether the
+        # game is over. Both are kept up to date by maybe_place and
+        # retire, so reading them never scans the grid.
+        self._remaining : dict[int, dict[ShapeKind, None]] = {}
+        for player in range(1, self.num_players + 1):
+            self._remaining[player] = dict.fromkeys(self._shapes)
+        self._game_over = False
+
+        self._placed_moves : dict[int, list[Move]] = {}
+        for player in range(1, self.num_players + 1):
+            self._placed_moves[player] = []
+
+        # One entry per maybe_place, push or retire, for pop to revert.
+        self._history : list[_Undo] = []
+
+        # Zobrist hash of the position (see zobrist.py), kept up to
+        # date by every move.
+        self._keys = zobrist_keys(size)
+        self._hash = self._keys.to_move[self._curr_player]
+
+        # Corner frontier: the empty squares that a player's next piece
+        # may use to satisfy the corner rule. These are the unoccupied
+        # start positions until the player places their first piece,
+        # and afterwards the empty squares diagonal to (but not sharing
+        # an edge with) the player's pieces.
+        self._frontier : dict[int, set[Point]] = {}
+        # Squares sharing an edge with a player's pieces, which their
+        # later pieces may not cover.
+        self._edges : dict[int, set[Point]] = {}
         for player in range(1, self.num_players + 1):
-            self._placed_pieces[player] = set()
+            self._frontier[player] = set(start_positions)
+            self._edges[player] = set()
+
+        # Instrumentation swaps in a subclass with counting methods,
+        # so uninstrumented games pay nothing for it.
+        engine = getattr(type(self), "_uninstrumented", type(self))
+        if instrument is None:
+            instrument = instrument_enabled()
+        self.counters = Counters() if instrument else None
+        self.__class__ = instrumented(engine) if instrument else engine
     
     @property
     def shapes(self) -> dict[ShapeKind, Shape]:
@@ -91,8 +172,9 @@ class Blokus(BlokusBase):
         return self._retired_players
     
     @property
-    def placed_pieces(self) -> dict[int, Piece]:
-        return self._placed_pieces
+    def placed_pieces(self) -> dict[int, set[Piece]]:
+        return {player: {move.to_piece() for move in moves}
+                for player, moves in self._placed_moves.items()}
 
     @property
     def grid(self) -> Grid:
@@ -100,50 +182,60 @@ class Blokus(BlokusBase):
 
     @property
     def game_over(self) -> bool:
-        condition_1 = len(self._retired_players) == self._num_players
-        condition_2 = True
-        for player in range(1, self._num_players + 1):
-            if len(self.remaining_shapes(player)) > 0 and \
-                    player not in self.retired_players:
-                condition_2 = False
-        return condition_1 or condition_2
+        return self._game_over
+
+    @property
+    def position_hash(self) -> int:
+        """
+        Returns the 64-bit Zobrist hash of the position: the squares
+        each player occupies, the shapes each player has played, the
+        retired players and the player to move (see zobrist.py).
+        """
+        return self._hash
+
+    @property
+    def history(self) -> list[Optional[Move]]:
+        """
+        Returns the moves made so far, in order (None for a
+        retirement).
+        """
+        return [undo.move for undo in self._history]
 
     @property
     def winners(self) -> Optional[list[int]]:
-        if self.game_over:
-            scores = {} 
-            for player in range(1, self._num_players + 1):
-                scores[player] = self.get_score(player)
-            winning_score = max(scores.values())
-            winners = []
-            for player, score in scores.items():
-                if score == winning_score:
-                    winners.append(player)
-            return winners
-        return []
+        if not self._game_over:
+            return []
+        winning_score = max(self._scores.values())
+        return [player for player, score in self._scores.items()
+                if score == winning_score]
 
     #
     # METHODS
     #
 
     def remaining_shapes(self, player: int) -> list[ShapeKind]:
-        shapes_played = set()
-        for row in self.grid:
-            for tup in row:
-                if tup is not None:
-                    grid_player, kind = tup
-                    if grid_player == player:
-                        shapes_played.add(kind)
-        shapes_not_played = []
-        for kind in self.shapes:
-            if kind not in shapes_played:
-                shapes_not_played.append(kind)
-        return shapes_not_played
+        return list(self._remaining[player])
 
-    def any_wall_collisions(self, piece: Piece) -> bool:
+    def frontier(self, player: int) -> set[Point]:
+        """
+        Returns the player's corner frontier: the empty squares their
+        next piece may use to satisfy the corner rule. The set is the
+        game's own, kept up to date by every move, and must not be
+        modified.
+        """
+        return self._frontier[player]
+
+    def _check_piece(self, piece: Piece) -> None:
+        """
+        Raises ValueError if the piece has no anchor or if the
+        current player has already played its shape.
+        """
         if (piece.anchor is None) or (piece.shape.kind not in
-                                      self.remaining_shapes(self.curr_player)):
+                                      self._remaining[self.curr_player]):
             raise ValueError
+
+    def any_wall_collisions(self, piece: Piece) -> bool:
+        self._check_piece(piece)
         for point in piece.squares():
             r,c = point
             if not (0 <= r < self.size and 0 <= c < self.size):
@@ -151,97 +243,475 @@ class Blokus(BlokusBase):
         return False
 
     def any_collisions(self, piece: Piece) -> bool:
-        if (piece.anchor is None) or (piece.shape.kind not in
-                                      self.remaining_shapes(self.curr_player)):
-            raise ValueError
-
-        if self.any_wall_collisions(piece):
-            return True
-        for point in piece.squares():
-            r,c = point
-            if self.grid[r][c] is not None:
-                return True
-        return False
+        self._check_piece(piece)
+        return not self._on_empty_squares(piece.squares())
 
     def legal_to_place(self, piece: Piece) -> bool:
         if self.any_collisions(piece):
             return False
+        return self._fits(piece.squares())
 
-        if len(self.remaining_shapes(self.curr_player)) == 21:
-            for position in self._start_positions:
-                for point in piece.squares():
-                    if position == point:
-                        return True
-            return False
-
-        condition_3 = False
-        for placed_piece in self.placed_pieces[self.curr_player]:
-            for corner in placed_piece.intercardinal_neighbors():
-                for point in piece.squares():
-                    if corner == point:
-                        condition_3 = True
-        for placed_piece in self.placed_pieces[self.curr_player]:
-            for edge in placed_piece.cardinal_neighbors():
-                if edge in piece.squares():
-                    condition_3 = False
-
-        return condition_3
+    def _fits(self, squares: list[Point]) -> bool:
+        """
+        Given the squares of a piece that collides with neither the
+        walls nor any played pieces, returns whether they cover a
+        square of the current player's corner frontier and share no
+        edge with the current player's pieces.
+        """
+        frontier = self._frontier[self.curr_player]
+        edges = self._edges[self.curr_player]
+        corner = False
+        for point in squares:
+            if point in edges:
+                return False
+            if point in frontier:
+                corner = True
+        return corner
 
     def maybe_place(self, piece: Piece) -> bool:
         if self.legal_to_place(piece):
-            self._placed_pieces[self.curr_player].add(piece)
-            if len(self.placed_pieces[self.curr_player]) == 21:
-                if piece.shape.kind == ShapeKind.ONE:
-                    self._scores[self.curr_player] += 20
-                else:
-                    self._scores[self.curr_player] += 15
-            for point in piece.squares():
-                r,c = point
-                self.grid[r][c] = (self.curr_player, piece.shape.kind)
-                self._scores[self.curr_player] += 1
-            while True:
-                self._curr_player = (self._curr_player % self._num_players) + 1
-                if not self.curr_player in self.retired_players:
-                    break
+            self._place(Move.from_piece(piece), piece.squares())
             return True
         return False
 
+    def push(self, move: Optional[Move], trusted: bool = False) -> bool:
+        """
+        Like maybe_place, but takes a Move, or None to retire the
+        current player. Returns whether the move was legal (and so
+        made). Either way, pop can then revert it.
+
+        With trusted=True, the move is assumed to be legal and is not
+        checked (for replaying moves already known to be legal).
+
+        Raises ValueError if the player has already played
+        a piece with this shape.
+        """
+        if move is None:
+            self.retire()
+            return True
+        squares = move.squares()
+        if trusted:
+            self._place(move, squares)
+            return True
+        if move.kind not in self._remaining[self.curr_player]:
+            raise ValueError
+        if not (self._on_empty_squares(squares) and self._fits(squares)):
+            return False
+        self._place(move, squares)
+        return True
+
+    def pop(self) -> Optional[Move]:
+        """
+        Reverts the most recent move (whether made with push,
+        maybe_place or retire), restoring the board, scores, current
+        player, retirements, remaining shapes and frontiers exactly,
+        in time proportional to the size of the piece. Returns the
+        reverted move (None for a retirement).
+
+        Raises IndexError if no moves have been made.
+        """
+        undo = self._history.pop()
+        player = undo.player
+        self._curr_player = player
+        self._game_over = undo.game_over
+        self._hash = undo.position_hash
+        move = undo.move
+        if move is None:
+            self._retired_players.discard(player)
+            return None
+
+        for r, c in move.squares():
+            self._grid[r][c] = None
+        self._scores[player] -= undo.score
+        self._placed_moves[player].pop()
+        assert undo.remaining is not None
+        self._remaining[player] = undo.remaining
+
+        self._frontier[player].difference_update(undo.frontier_added)
+        self._edges[player].difference_update(undo.edges_added)
+        for other, point in undo.frontier_removed:
+            self._frontier[other].add(point)
+        return move
+
+    def _place(self, move: Move, squares: list[Point]) -> None:
+        """
+        Places a legal move for the current player, covering the
+        given squares, and passes the turn.
+        """
+        player = self.curr_player
+        kind = move.kind
+        score = len(squares)
+        undo_hash = self._hash
+        square_keys = self._keys.squares[player]
+        size = self._size
+        position_hash = undo_hash
+        for r, c in squares:
+            position_hash ^= square_keys[r * size + c]
+        self._hash = \
+            position_hash ^ self._keys.shapes[player][SHAPE_INDEX[kind]]
+        # Copy rather than rebuild the dict, so that pop can restore it
+        # without hashing every shape again.
+        remaining = self._remaining[player]
+        self._remaining[player] = remaining.copy()
+        del self._remaining[player][kind]
+        self._placed_moves[player].append(move)
+        if not self._remaining[player]:
+            score += 20 if kind == ShapeKind.ONE else 15
+        grid = self._grid
+        cell = (player, kind)
+        for r, c in squares:
+            grid[r][c] = cell
+        self._scores[player] += score
+        removed, added, edges_added = self._update_frontiers(squares)
+        self._history.append(_Undo(move, player, self._game_over,
+                                   undo_hash, score, removed, added,
+                                   edges_added, remaining))
+        self._next_player()
+
+    def _next_player(self) -> None:
+        """
+        Updates the game_over flag and, unless the game is over, passes
+        the turn to the next player who has neither retired nor played
+        all of their pieces.
+        """
+        self._game_over = all(
+            player in self._retired_players or not self._remaining[player]
+            for player in range(1, self._num_players + 1)
+        )
+        if self._game_over:
+            return
+        self._hash ^= self._keys.to_move[self._curr_player]
+        while True:
+            self._curr_player = (self._curr_player % self._num_players) + 1
+            if self.curr_player not in self.retired_players and \
+                    self._remaining[self.curr_player]:
+                break
+        self._hash ^= self._keys.to_move[self._curr_player]
+
+    def _update_frontiers(self, squares: list[Point]) -> tuple[
+            tuple[tuple[int, Point], ...], tuple[Point, ...],
+            tuple[Point, ...]]:
+        """
+        Updates the corner frontiers and forbidden edges after the
+        current player has covered the given squares. Returns what
+        changed, for pop: the (player, point) pairs removed from
+        frontiers, and the points added to the current player's
+        frontier and edges.
+        """
+        player = self._curr_player
+        size = self._size
+        grid = self._grid
+        removed = []
+        for other, frontier in self._frontier.items():
+            for point in squares:
+                if point in frontier:
+                    frontier.remove(point)
+                    removed.append((other, point))
+
+        frontier = self._frontier[player]
+        edges = self._edges[player]
+        if len(self._placed_moves[player]) == 1:
+            removed.extend((player, point) for point in frontier)
+            frontier.clear()
+        edges_added = []
+        for r, c in squares:
+            for er, ec in ((r - 1, c), (r, c - 1), (r, c + 1), (r + 1, c)):
+                edge = (er, ec)
+                if 0 <= er < size and 0 <= ec < size \
+                        and grid[er][ec] is None and edge not in edges:
+                    edges.add(edge)
+                    edges_added.append(edge)
+                    if edge in frontier:
+                        frontier.remove(edge)
+                        removed.append((player, edge))
+        added = []
+        for r, c in squares:
+            for cr, cc in ((r - 1, c - 1), (r - 1, c + 1), (r + 1, c - 1),
+                           (r + 1, c + 1)):
+                corner = (cr, cc)
+                if 0 <= cr < size and 0 <= cc < size and \
+                        grid[cr][cc] is None and \
+                        corner not in edges and corner not in frontier:
+                    frontier.add(corner)
+                    added.append(corner)
+        return tuple(removed), tuple(added), tuple(edges_added)
+
     def retire(self) -> None:
+        self._history.append(_Undo(None, self.curr_player, self._game_over,
+                                   self._hash))
         self._retired_players.add(self.curr_player)
-        self._curr_player = (self._curr_player % self._num_players) + 1
+        self._hash ^= self._keys.retired[self.curr_player]
+        self._next_player()
 
     def get_score(self, player: int) -> int:
         return self._scores[player]
 
-    def available_moves(self) -> set[Piece]:
-
-        available_spots = []
-        for r in range(self.size):
-            for c in range(self.size):
-                if self.grid[r][c] is None:
-                    available_spots.append((r, c))
+    def snapshot(self) -> bytes:
+        """
+        Returns the state of the game (the board, each player's
+        remaining shapes, placed pieces, score and retirement, the
+        current player and whether the game is over) packed into
+        about a kilobyte. The corner frontiers and forbidden edges are
+        included too, so that from_snapshot need not recompute them.
+        The move history is not included, so a game restored with
+        from_snapshot cannot pop earlier moves.
+        """
+        size = self.size
+        cells = bytearray(size * size)
+        for r, row in enumerate(self._grid):
+            for c, cell in enumerate(row):
+                if cell is not None:
+                    cells[r * size + c] = \
+                        cell[0] * 32 + SHAPE_INDEX[cell[1]] + 1
+        starts = sorted(self._start_positions)
+        parts = [
+            _SNAPSHOT_HEADER.pack(_SNAPSHOT_MAGIC, _SNAPSHOT_VERSION, size,
+                                  self._num_players, len(starts),
+                                  self._curr_player, self._game_over),
+            bytes(coord for point in starts for coord in point),
+            bytes(cells),
+        ]
+        for player in range(1, self._num_players + 1):
+            remaining = 0
+            for kind in self._remaining[player]:
+                remaining |= 1 << SHAPE_INDEX[kind]
+            parts.append(_SNAPSHOT_PLAYER.pack(
+                self._scores[player], player in self._retired_players,
+                remaining, len(self._placed_moves[player]),
+                len(self._edges[player]), len(self._frontier[player])))
+        for player in range(1, self._num_players + 1):
+            codes = code_array(size)
+            codes.extend(encode_move(move, size)
+                         for move in self._placed_moves[player])
+            parts.append(codes.tobytes())
+            for points in (self._edges[player], self._frontier[player]):
+                parts.append(bytes(coord for point in sorted(points)
+                                   for coord in point))
+        return b"".join(parts)
+
+    @classmethod
+    def from_snapshot(cls, data: bytes) -> "Blokus":
+        """
+        Returns a new game in the state saved by snapshot. Snapshots
+        are only meant to be restored on machines with the same byte
+        order as the one that took them.
 
-        moves = set()
+        Raises ValueError if the data is not a snapshot.
+        """
+        if len(data) < _SNAPSHOT_HEADER.size:
+            raise ValueError("Not a snapshot.")
+        magic, version, size, num_players, num_starts, curr_player, \
+            game_over = _SNAPSHOT_HEADER.unpack_from(data)
+        if magic != _SNAPSHOT_MAGIC or version != _SNAPSHOT_VERSION:
+            raise ValueError("Not a snapshot.")
+        offset = _SNAPSHOT_HEADER.size
+        starts = data[offset:offset + 2 * num_starts]
+        offset += 2 * num_starts
+        game = cls(num_players, size, set(zip(starts[::2], starts[1::2])))
+
+        cells = data[offset:offset + size * size]
+        offset += size * size
+        grid = game._grid
+        keys = game._keys
+        position_hash = 0
+        for i, cell in enumerate(cells):
+            if cell:
+                player, index = divmod(cell, 32)
+                r, c = divmod(i, size)
+                grid[r][c] = (player, _SHAPES_BY_INDEX[index - 1])
+                position_hash ^= keys.squares[player][i]
+
+        if len(data) < offset + num_players * _SNAPSHOT_PLAYER.size:
+            raise ValueError("Truncated snapshot.")
+        counts = {}
+        for player in range(1, num_players + 1):
+            score, retired, remaining, count, num_edges, num_frontier = \
+                _SNAPSHOT_PLAYER.unpack_from(data, offset)
+            offset += _SNAPSHOT_PLAYER.size
+            game._scores[player] = score
+            if retired:
+                game._retired_players.add(player)
+            game._remaining[player] = {
+                kind: None for kind in game._shapes
+                if remaining >> SHAPE_INDEX[kind] & 1
+            }
+            for kind, i in SHAPE_INDEX.items():
+                if not remaining >> i & 1:
+                    position_hash ^= keys.shapes[player][i]
+            if retired:
+                position_hash ^= keys.retired[player]
+            counts[player] = (count, num_edges, num_frontier)
+        for player in range(1, num_players + 1):
+            count, num_edges, num_frontier = counts[player]
+            codes = code_array(size)
+            end = offset + count * codes.itemsize
+            codes.frombytes(data[offset:end])
+            game._placed_moves[player] = [decode_move(code, size)
+                                          for code in codes]
+            edges = data[end:end + 2 * num_edges]
+            offset = end + 2 * num_edges
+            frontier = data[offset:offset + 2 * num_frontier]
+            offset += 2 * num_frontier
+            game._edges[player] = set(zip(edges[::2], edges[1::2]))
+            game._frontier[player] = set(zip(frontier[::2], frontier[1::2]))
+        if offset != len(data) or len(cells) != size * size:
+            raise ValueError("Truncated snapshot.")
+
+        game._curr_player = curr_player
+        game._game_over = game_over
+        game._hash = position_hash ^ keys.to_move[curr_player]
+        return game
 
-        for shape in self.remaining_shapes(self.curr_player):
-            piece = Piece(self.shapes[shape])
-            flipped_piece = Piece(self.shapes[shape])
-            for spot in available_spots:
-                piece.set_anchor(spot)
-                for _ in range(4):
-                    piece.rotate_right()
-                    if self.legal_to_place(piece):
-                        moves.add(piece)
-                
-                flipped_piece.set_anchor(spot)
-                flipped_piece.flip_horizontally()
-                for _ in range(4):
-                    flipped_piece.rotate_right()
-                    if self.legal_to_place(flipped_piece):
-                        moves.add(flipped_piece)
+    def available_moves(self) -> set[Piece]:
+        return {move.to_piece() for move in self.legal_moves()}
 
+    def legal_moves(self) -> set[Move]:
+        """
+        Returns the set of all possible moves that the current
+        player may make, as Moves rather than Pieces (one Move per
+        distinct placement; see available_moves).
+        """
+        moves = set()
+        tried = set()
+        player = self.curr_player
+        shapes = self._remaining[player]
+        size = self._size
+        grid = self._grid
+        edges = self._edges[player]
+        # Every candidate covers a frontier square, so only collisions
+        # and forbidden edges need checking.
+        for r, c in self._frontier[player]:
+            for shape in shapes:
+                for orientation in ORIENTATIONS[shape]:
+                    offsets = orientation.squares
+                    for dr, dc in offsets:
+                        ar, ac = r - dr, c - dc
+                        key = (orientation.catalog_index, ar, ac)
+                        if key in tried:
+                            continue
+                        tried.add(key)
+                        for sr, sc in offsets:
+                            sr += ar
+                            sc += ac
+                            if not (0 <= sr < size and 0 <= sc < size) or \
+                                    grid[sr][sc] is not None or \
+                                    (sr, sc) in edges:
+                                break
+                        else:
+                            moves.add(Move(shape, orientation.orientation_id,
+                                           (ar, ac)))
         return moves
-        
 
+    def sample_move(self, rng: random.Random,
+                    tries: int = 16) -> Optional[Move]:
+        """
+        Returns a random legal move for the current player, or None
+        if they have none. Meant for playouts, where a full
+        legal_moves per ply would be too slow: up to tries random
+        placements touching the player's corner frontier are tested
+        first, and if none of them fits, the first legal placement
+        found by scanning the frontier squares and shapes in random
+        order is returned. The choice is therefore random but not
+        uniform. The scan skips shapes bigger than the room around
+        each frontier square (see _room), which makes showing that a
+        player has no moves, the worst case, cheap near the end.
+        """
+        player = self._curr_player
+        if not self._frontier[player]:
+            return None
+        frontier = list(self._frontier[player])
+        shapes = list(self._remaining[player])
+        size = self._size
+        grid = self._grid
+        edges = self._edges[player]
+        # Index with rng.random rather than rng.choice, which costs
+        # several times as much; a try covers a frontier square, so
+        # it fits if it is on empty squares off the player's edges.
+        random = rng.random
+        num_frontier = len(frontier)
+        num_shapes = len(shapes)
+        for _ in range(tries):
+            r, c = frontier[int(random() * num_frontier)]
+            kind = shapes[int(random() * num_shapes)]
+            orientations = ORIENTATIONS[kind]
+            orientation = orientations[int(random() * len(orientations))]
+            offsets = orientation.squares
+            dr, dc = offsets[int(random() * len(offsets))]
+            ar, ac = r - dr, c - dc
+            for sr, sc in offsets:
+                sr += ar
+                sc += ac
+                if not (0 <= sr < size and 0 <= sc < size) or \
+                        grid[sr][sc] is not None or (sr, sc) in edges:
+                    break
+            else:
+                return Move(kind, orientation.orientation_id, (ar, ac))
+        rng.shuffle(frontier)
+        rng.shuffle(shapes)
+        largest = max(_SHAPE_SIZES[shape] for shape in shapes)
+        for r, c in frontier:
+            room = self._room(r, c, edges, largest)
+            for shape in shapes:
+                if _SHAPE_SIZES[shape] > room:
+                    continue
+                for orientation in ORIENTATIONS[shape]:
+                    offsets = orientation.squares
+                    for dr, dc in offsets:
+                        ar, ac = r - dr, c - dc
+                        for sr, sc in offsets:
+                            sr += ar
+                            sc += ac
+                            if not (0 <= sr < size and 0 <= sc < size) or \
+                                    grid[sr][sc] is not None or \
+                                    (sr, sc) in edges:
+                                break
+                        else:
+                            return Move(shape, orientation.orientation_id,
+                                        (ar, ac))
+        return None
+
+    def _room(self, r: int, c: int, edges: set[Point], limit: int) -> int:
+        """
+        Returns the number of squares, up to limit, in the region of
+        empty squares outside edges that contains (r, c) (connected
+        through shared edges). Pieces covering (r, c) fit in it.
+        """
+        size = self._size
+        grid = self._grid
+        seen = {(r, c)}
+        todo = [(r, c)]
+        while todo:
+            r, c = todo.pop()
+            for point in ((r - 1, c), (r, c - 1), (r, c + 1), (r + 1, c)):
+                nr, nc = point
+                if 0 <= nr < size and 0 <= nc < size and \
+                        grid[nr][nc] is None and point not in edges and \
+                        point not in seen:
+                    seen.add(point)
+                    if len(seen) >= limit:
+                        return limit
+                    todo.append(point)
+        return len(seen)
+
+    def available_moves_packed(self) -> array:
+        """
+        Returns the codes (see move.encode_move) of all possible moves
+        that the current player may make, in increasing order, packed
+        into an array of 2-byte unsigned integers (4-byte for boards
+        larger than 26 x 26). NumPy users can wrap the result without
+        copying, using numpy.frombuffer.
+        """
+        codes = code_array(self.size)
+        codes.extend(sorted(encode_move(move, self.size)
+                            for move in self.legal_moves()))
+        return codes
 
-    
\ No newline at end of file
+    def _on_empty_squares(self, squares: list[Point]) -> bool:
+        """
+        Returns whether all of the squares are on the board and empty.
+        """
+        for r, c in squares:
+            if not (0 <= r < self.size and 0 <= c < self.size) or \
+                    self.grid[r][c] is not None:
+                return False
+        return True
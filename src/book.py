@@ -0,0 +1,289 @@
+"""
+Opening books: precomputed first moves for the standard layouts.
+
+A book maps positions from the first few plies of a layout (see
+layouts.py) to a recommended move, so that bots can play the opening,
+where the branching factor is largest, with one lookup instead of a
+search. Positions are keyed by their canonical hash (see symmetry.py),
+and moves are stored in the canonical frame, so one entry serves every
+rotation and reflection of a position.
+
+Books are built offline from self-play statistics: many games are
+played with uniformly random moves, and for every position reached
+in the first plies, each move tried there is scored by the mover's
+final margin (their score minus the best other score; their score, in
+one-player games). The book keeps, for each position, the move with
+the best mean margin among those tried at least min_visits times.
+
+On disk, a book is a header, the start positions, and one 20-byte
+entry per position (hash, move code, visits, mean margin), all
+little-endian:
+
+    python src/book.py build duo -g 20000 -p 4 -o duo.book
+    python src/book.py show duo.book
+"""
+import contextlib
+import multiprocessing
+import random
+import struct
+from typing import Iterator, NamedTuple, Optional
+
+import click
+
+from base import BlokusBase
+from blokus import Blokus
+from layouts import LAYOUTS, Layout
+from move import Move, encode_move, decode_move
+from symmetry import canonicalize, transform_move
+
+MAGIC = b"BLKB"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sBBBBBI")
+_ENTRY = struct.Struct("<QIIf")
+
+
+class BookEntry(NamedTuple):
+    """
+    The recommended move in one position.
+
+        move : the move, in the position's canonical frame
+        visits : how many self-play games tried the move there
+        value : the mover's mean final margin in those games
+    """
+
+    move: Move
+    visits: int
+    value: float
+
+
+class OpeningBook:
+    """
+    Recommended moves for the opening of one layout, keyed by
+    canonical position hash.
+    """
+
+    layout: Layout
+    plies: int
+    entries: dict[int, BookEntry]
+
+    def __init__(self, layout: Layout, plies: int,
+                 entries: Optional[dict[int, BookEntry]] = None) -> None:
+        """
+        Constructor
+
+            layout: the layout the book is for
+            plies: how many plies (moves from the start) it covers
+            entries: the recommended move of each position, by
+                canonical hash
+        """
+        self.layout = layout
+        self.plies = plies
+        self.entries = entries if entries is not None else {}
+
+    def __len__(self) -> int:
+        """
+        Returns the number of positions in the book.
+        """
+        return len(self.entries)
+
+    def lookup(self, game: BlokusBase) -> Optional[Move]:
+        """
+        Returns the book move for the position, mapped to the
+        position's own frame, or None if the position is not in the
+        book (including when the game is not of the book's layout).
+        """
+        if (game.num_players, game.size, game.start_positions) != \
+                (self.layout.num_players, self.layout.size,
+                 self.layout.start_positions):
+            return None
+        canonical = canonicalize(game)
+        entry = self.entries.get(canonical.hash)
+        if entry is None:
+            return None
+        return transform_move(entry.move, canonical.symmetry.inverse,
+                              game.size)
+
+    def dumps(self) -> bytes:
+        """
+        Returns the book in its on-disk format.
+        """
+        layout = self.layout
+        starts = sorted(layout.start_positions)
+        parts = [_HEADER.pack(MAGIC, VERSION, layout.size,
+                              layout.num_players, len(starts), self.plies,
+                              len(self.entries)),
+                 bytes(coord for point in starts for coord in point)]
+        for key in sorted(self.entries):
+            entry = self.entries[key]
+            parts.append(_ENTRY.pack(key, encode_move(entry.move, layout.size),
+                                     entry.visits, entry.value))
+        return b"".join(parts)
+
+    @staticmethod
+    def loads(data: bytes) -> "OpeningBook":
+        """
+        Returns the book stored in data.
+
+        Raises ValueError if the data is not a book.
+        """
+        if len(data) < _HEADER.size:
+            raise ValueError("Not an opening book.")
+        magic, version, size, num_players, num_starts, plies, count = \
+            _HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not an opening book.")
+        offset = _HEADER.size
+        starts = data[offset:offset + 2 * num_starts]
+        offset += 2 * num_starts
+        if len(data) != offset + count * _ENTRY.size:
+            raise ValueError("Truncated opening book.")
+        layout = Layout(num_players, size,
+                        frozenset(zip(starts[::2], starts[1::2])))
+        entries = {}
+        for key, code, visits, value in _ENTRY.iter_unpack(data[offset:]):
+            entries[key] = BookEntry(decode_move(code, size), visits, value)
+        return OpeningBook(layout, plies, entries)
+
+    def save(self, path: str) -> None:
+        """
+        Writes the book to a file.
+        """
+        with open(path, "wb") as file:
+            file.write(self.dumps())
+
+    @staticmethod
+    def load(path: str) -> "OpeningBook":
+        """
+        Reads a book from a file.
+
+        Raises ValueError if the file is not a book.
+        """
+        with open(path, "rb") as file:
+            return OpeningBook.loads(file.read())
+
+
+# One ply of a self-play game: the canonical hash of the position, the
+# move made (in the canonical frame) and the player who made it.
+_Ply = tuple[int, int, int]
+
+
+def _self_play(job: tuple[Layout, int, int]) -> tuple[list[_Ply],
+                                                      dict[int, int]]:
+    """
+    Plays one seeded game of uniformly random moves, and returns its
+    first plies and the final margin of each player.
+    """
+    layout, plies, seed = job
+    rng = random.Random(seed)
+    size = layout.size
+    game = Blokus(layout.num_players, size, set(layout.start_positions))
+    path: list[_Ply] = []
+    while not game.game_over:
+        legal = sorted(game.legal_moves(),
+                       key=lambda move: encode_move(move, size))
+        move = rng.choice(legal) if legal else None
+        if move is not None and len(path) < plies:
+            canonical = canonicalize(game)
+            image = transform_move(move, canonical.symmetry, size)
+            path.append((canonical.hash, encode_move(image, size),
+                         game.curr_player))
+        game.push(move)
+
+    scores = {player: game.get_score(player)
+              for player in range(1, layout.num_players + 1)}
+    margins = {}
+    for player, score in scores.items():
+        others = [s for p, s in scores.items() if p != player]
+        margins[player] = score - max(others) if others else score
+    return path, margins
+
+
+def build_book(layout: Layout, num_games: int, plies: int,
+               min_visits: int = 2, seed: int = 0,
+               workers: Optional[int] = 1) -> OpeningBook:
+    """
+    Builds a book for a layout from num_games self-play games (see the
+    module docstring), spread over a pool of worker processes (one per
+    CPU if workers is None). The book depends only on the arguments
+    other than workers.
+    """
+    jobs = ((layout, plies, random.Random(f"blokus-book-{seed}-{i}")
+             .getrandbits(64)) for i in range(num_games))
+    # stats[key][code] = [visits, total margin] (margins are whole
+    # numbers of squares)
+    stats: dict[int, dict[int, list[int]]] = {}
+
+    with contextlib.ExitStack() as stack:
+        if workers == 1:
+            results: Iterator[tuple[list[_Ply], dict[int, int]]] = \
+                map(_self_play, jobs)
+        else:
+            pool = stack.enter_context(multiprocessing.Pool(workers))
+            results = pool.imap(_self_play, jobs, chunksize=16)
+        for path, margins in results:
+            for key, code, player in path:
+                stat = stats.setdefault(key, {}).setdefault(code, [0, 0])
+                stat[0] += 1
+                stat[1] += margins[player]
+
+    entries = {}
+    for key, moves in stats.items():
+        candidates = [(total / visits, visits, -code)
+                      for code, (visits, total) in moves.items()
+                      if visits >= min_visits]
+        if candidates:
+            value, visits, code = max(candidates)
+            entries[key] = BookEntry(decode_move(-code, layout.size),
+                                     visits, value)
+    return OpeningBook(layout, plies, entries)
+
+
+@click.group
+def main_book() -> None:
+    """
+    Build and inspect opening books.
+    """
+
+
+@main_book.command
+@click.argument("layout", type=click.Choice(list(LAYOUTS)))
+@click.option("-g", "--games", default=10000, help="self-play games")
+@click.option("-p", "--plies", default=4, help="plies covered")
+@click.option("-m", "--min-visits", default=2,
+              help="games a move needs to be chosen")
+@click.option("-s", "--seed", default=0, help="random seed")
+@click.option("-w", "--workers", type=int, default=None,
+              help="worker processes (default: one per CPU)")
+@click.option("-o", "--output", required=True, help="book file")
+def build(layout: str, games: int, plies: int, min_visits: int, seed: int,
+          workers: Optional[int], output: str) -> None:
+    """
+    Build a book for LAYOUT from self-play.
+    """
+    book = build_book(LAYOUTS[layout], games, plies, min_visits, seed,
+                      workers)
+    book.save(output)
+    print(f"{len(book)} positions written to {output}")
+
+
+@main_book.command
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+def show(path: str) -> None:
+    """
+    Print the entries of a book.
+    """
+    book = OpeningBook.load(path)
+    layout = book.layout
+    print(f"{layout.num_players} players, {layout.size}x{layout.size}, "
+          f"starts {sorted(layout.start_positions)}, {book.plies} plies, "
+          f"{len(book)} positions")
+    for key, entry in sorted(book.entries.items(),
+                             key=lambda item: -item[1].visits):
+        print(f"{key:016x} | {entry.move.kind.name} "
+              f"{entry.move.orientation_id} at {entry.move.anchor} | "
+              f"{entry.visits} games | margin {entry.value:.2f}")
+
+
+if __name__ == "__main__":
+    main_book()
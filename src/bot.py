@@ -4,60 +4,142 @@ Code for blockus bot
 '''
 
 
+import contextlib
+import multiprocessing
+import os
 import random
 import sys
-import fakes
-from shape_definitions import ShapeKind, definitions 
-import piece
+import time
+from typing import Iterator, Optional
+
+from base import BlokusBase
+from blokus import Blokus
+from shape_definitions import definitions
+from piece import Piece, Point
+from move import Move
+from book import OpeningBook
+from simlog import GameRecord, RecordWriter
+from scheduler import Scheduler, apply
+
+
+def ordered_moves(game: BlokusBase) -> list[Piece]:
+    '''
+    Returns the available moves in a fixed order (by shape, then by
+    squares), so that a seeded bot makes the same choices in every run
+    and in every process
+    '''
+
+    return sorted(game.available_moves(),
+                  key=lambda p: (p.shape.kind.value, sorted(p.squares())))
+
+
+def book_move(game: BlokusBase,
+              book: Optional[OpeningBook]) -> Optional[Piece]:
+    '''
+    Returns the opening book's move for the current position, if the
+    book has one and it is legal
+    '''
+
+    if book is None:
+        return None
+    move = book.lookup(game)
+    if move is None or \
+            move.kind not in game.remaining_shapes(game.curr_player):
+        return None
+    piece = move.to_piece()
+    return piece if game.legal_to_place(piece) else None
+
 
 class RandomBot:
     '''
     Bot that chooses randomly from possible moves
     '''
 
-    def __init__(self, game: fakes.BlokusFake) -> None:
+    def __init__(self, game: BlokusBase,
+                 rng: Optional[random.Random] = None,
+                 book: Optional[OpeningBook] = None) -> None:
         self.game = game
+        self.rng = rng if rng is not None else random.Random()
+        self.book = book
 
-    def move(self) -> None:
+    def choose_move(self, state: BlokusBase,
+                    deadline: Optional[float] = None) -> Optional[Move]:
         '''
-        Simple bot makes random choice from avaible move and makes that move
+        Simple bot makes random choice from avaible moves (or the opening
+        book's move, if it has one), None to retire (see scheduler.Bot;
+        it always answers well within any deadline)
         '''
 
-        poss_moves = self.game.available_moves()
+        opening = book_move(state, self.book)
+        if opening is not None:
+            return Move.from_piece(opening)
 
-        if poss_moves == set():
-            self.game.retire()
-        else:
-            move : set[fakes.Piece]  = random.choice(list(poss_moves))
-            self.game.maybe_place(move)
+        poss_moves = ordered_moves(state)
+
+        if poss_moves == []:
+            return None
+        move : Piece = self.rng.choice(poss_moves)
+        return Move.from_piece(move)
+
+    def move(self) -> None:
+        '''
+        Makes the chosen move in the bot's game
+        '''
 
+        apply(self.game, self.choose_move(self.game))
 
-class SimpleBot: 
+
+class SimpleBot:
     '''
-    Bot that uses blockus specific heuristic to preform bettter 
+    Bot that uses blockus specific heuristic to preform bettter
     '''
 
-    def __init__(self, game: fakes.BlokusFake) -> None:
+    def __init__(self, game: BlokusBase,
+                 rng: Optional[random.Random] = None,
+                 book: Optional[OpeningBook] = None) -> None:
         self.game = game
+        self.rng = rng if rng is not None else random.Random()
+        self.book = book
+
+    def choose_move(self, state: BlokusBase,
+                    deadline: Optional[float] = None) -> Optional[Move]:
+        '''
+        Chooses one of the placements of the biggest available piece (or
+        the opening book's move, if it has one), None to retire (see
+        scheduler.Bot)
+        '''
+
+        opening = book_move(state, self.book)
+        if opening is not None:
+            return Move.from_piece(opening)
+
+        poss_moves = ordered_moves(state)
+
+        if poss_moves == []:
+            return None
+        biggest = self.av_biggest_piece(poss_moves)
+        # Every available piece has a shape, so one of them is biggest.
+        assert biggest is not None
+        return Move.from_piece(biggest)
 
     def move(self) -> None:
-        poss_moves = self.game.available_moves()
+        '''
+        Makes the chosen move in the bot's game
+        '''
+
+        apply(self.game, self.choose_move(self.game))
 
-        if poss_moves == set():
-            self.game.retire()
-        else:
-            if self.av_biggest_piece() == None:
-                print("SOMETHING GONE WRONG")
-            self.game.maybe_place(self.av_biggest_piece())
-        
 
-    def av_biggest_piece(self) -> piece:
+    def av_biggest_piece(self, av_pieces: Optional[list[Piece]] = None
+                         ) -> Optional[Piece]:
         """
         Identifies biggest piece, by going through definitions dictionary
-            backwards, in avaiable moves and returns it
+            backwards, in avaiable moves (ordered_moves, unless already
+            given) and returns one of its placements at random
         """
 
-        av_pieces = self.game.available_moves()
+        if av_pieces is None:
+            av_pieces = ordered_moves(self.game)
         av_pieces_shapekind = [x.shape.kind for x in av_pieces]
 
         all_pieces_shape_kind = list(definitions.keys())
@@ -67,63 +149,127 @@ class SimpleBot:
             if all_pieces_shape_kind[-1 * (i+1)] in av_pieces_shapekind:
                 biggest_shape_kind = all_pieces_shape_kind[-1 * (i+1)]
                 break
-            
-        for p in av_pieces:
-            if p.shape.kind == biggest_shape_kind:
-                return p
+        else:
+            return None
 
-        return None
+        return self.rng.choice([p for p in av_pieces
+                                if p.shape.kind == biggest_shape_kind])
+
+
+def game_seed(seed: int, index: int) -> int:
+    '''
+    Derives the seed of one game from the seed of a simulation, so that
+    each game's outcome depends only on (seed, index), not on which
+    worker plays it or in what order
+    '''
+
+    return random.Random(f"blokus-game-{seed}-{index}").getrandbits(64)
 
 
+def play_game(seed: int, index: int = 0) -> GameRecord:
+    '''
+    Plays one seeded game between a RandomBot (player 1) and a SimpleBot
+    (player 2), returns its record (see simlog.GameRecord)
+    '''
+
+    start = time.perf_counter()
+
+    #creates needed variables for a game
+    num_players = 2
+    dim_board = 11
+    ul : Point = (0, 0)
+    br : Point = (dim_board - 1, dim_board - 1)
+
+    game = Blokus(num_players, dim_board, {ul, br})
+    rng = random.Random(seed)
+    bots : list[SimpleBot|RandomBot] = [RandomBot(game, rng),
+                                        SimpleBot(game, rng)]
+
+    #bots take turns on the live game until it is over
+    Scheduler(game, bots, isolate=False).play()
+
+    players = range(1, num_players + 1)
+    return GameRecord(
+        game_index=index,
+        seed=seed,
+        bots=[type(bot).__name__ for bot in bots],
+        size=dim_board,
+        start_positions=[list(point) for point in sorted({ul, br})],
+        scores=[game.get_score(player) for player in players],
+        winners=game.winners or [],
+        moves=sum(len(game.shapes) - len(game.remaining_shapes(player))
+                  for player in players),
+        seconds=time.perf_counter() - start)
+
+
+def _play_job(job: tuple[int, int]) -> GameRecord:
+    '''
+    Plays game (index, seed) in a worker process
+    '''
 
+    index, seed = job
+    return play_game(seed, index)
 
 
-def simulation(NUM_GAMES: int):
+def simulation(NUM_GAMES: int, workers: Optional[int] = None,
+               seed: int = 0, output: Optional[str] = None
+               ) -> dict[int | str, int]:
     '''
-    Simulates a given number of blockus games, prints bots win rate and tie 
-    rate.
+    Simulates a given number of blockus games, prints bots win rate, tie
+    rate and average scores, and returns the win and tie tallies.
+
+    Games are spread over a pool of worker processes (one per CPU by
+    default; workers=1 plays them in this process). Game i is played
+    with game_seed(seed, i), so the results only depend on the seed.
+    If an output path is given, each game's record is written to it
+    as soon as the game is tallied (see simlog.RecordWriter).
     '''
 
     wins : dict[int | str, int] = {1: 0, 2: 0, "Ties": 0}
+    total_scores : dict[int, int] = {1: 0, 2: 0}
+    jobs = ((i, game_seed(seed, i)) for i in range(NUM_GAMES))
+    writer = RecordWriter(output) if output is not None else None
+
+    with contextlib.ExitStack() as stack:
+        if writer is not None:
+            stack.enter_context(writer)
+        if workers == 1:
+            results : Iterator[GameRecord] = map(_play_job, jobs)
+        else:
+            workers = workers or os.cpu_count() or 1
+            chunksize = max(1, min(64, NUM_GAMES // (4 * workers)))
+            pool = stack.enter_context(multiprocessing.Pool(workers))
+            results = pool.imap(_play_job, jobs, chunksize=chunksize)
+
+        for record in results:
+
+            #updates wins dictionary
+            if record.winners == [1, 2]:
+                wins["Ties"] += 1
+            else:
+                for winner in record.winners:
+                    wins[winner] += 1
+            for player, score in enumerate(record.scores, start=1):
+                total_scores[player] += score
+            if writer is not None:
+                writer.write(record)
 
-    for _ in range(NUM_GAMES):
-        
-        #creates needed variables for a game
-        num_players = 2
-        dim_board = 11
-        ul = (0,0)
-        br = (dim_board, dim_board)
-
-        game = fakes.BlokusFake(num_players, dim_board, {ul, br})
-        bots : list[SimpleBot|RandomBot] = [RandomBot(game), SimpleBot(game)]
-        player_index : int = 0
-
-        while not game.game_over:
-            
-            #bot makes move
-            bots[player_index].move()
-
-            #updates whose turn it is
-            player_index = (player_index + 1) % 2
-            
-
-        winners :  list[int] = game.winners
-
-        #updates wins dictionary
-        if winners == [1, 2]:
-            wins["Ties"] += 1 
-        else: 
-            for winner in winners:
-                wins[winner] += 1
-    
 
     #output statistic of games
     print(f"Bot 0 Wins  | {(wins[1] / NUM_GAMES) * 100} %")
     print(f"Bot 1 Wins  | {(wins[2] / NUM_GAMES) * 100} %")
-    print(f"Ties        | {(wins["Ties"] / NUM_GAMES) * 100} %")
+    print(f"Ties        | {(wins['Ties'] / NUM_GAMES) * 100} %")
+    print(f"Bot 0 Score | {total_scores[1] / NUM_GAMES}")
+    print(f"Bot 1 Score | {total_scores[2] / NUM_GAMES}")
+    return wins
 
 #start of loop
 if __name__ == "__main__":
-    
+
     num_games : int = int(sys.argv[1])
-    simulation(num_games)
+    num_workers : Optional[int] = int(sys.argv[2]) if len(sys.argv) > 2 \
+        else None
+    base_seed : int = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+    output_path : Optional[str] = sys.argv[4] if len(sys.argv) > 4 \
+        else None
+    simulation(num_games, num_workers, base_seed, output_path)
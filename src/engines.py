@@ -0,0 +1,65 @@
+"""
+The engines and setups that the offline tools (benchmark.py and
+perft.py) run on, and the seeded random games they start from.
+
+A setup is a Layout: the standard layouts of layouts.py, plus two on
+a 5x5 board (mini-1 and mini-2), small enough to search exhaustively.
+The NumPy engine is only registered when numpy is installed.
+"""
+import random
+from typing import Optional, Sequence
+
+from base import BlokusBase
+from blokus import Blokus
+from bitboard import BlokusBitboard
+from layouts import LAYOUTS, Layout
+from move import Move, encode_move
+
+ENGINES: dict[str, type[BlokusBase]] = {
+    "blokus": Blokus,
+    "bitboard": BlokusBitboard,
+}
+try:
+    from numpy_backend import BlokusNumpy
+    ENGINES["numpy"] = BlokusNumpy
+except ImportError:
+    pass
+
+SETUPS: dict[str, Layout] = {
+    "mini-1": Layout(1, 5, frozenset({(0, 0), (4, 4)})),
+    "mini-2": Layout(2, 5, frozenset({(0, 0), (4, 4)})),
+    **LAYOUTS,
+}
+
+
+def game_moves(layout: Layout, seed: int = 0) -> list[Optional[Move]]:
+    """
+    Returns the moves of a game of the layout played with uniformly
+    random moves (None for a retirement), seeded with seed.
+    """
+    rng = random.Random(seed)
+    game = Blokus(layout.num_players, layout.size,
+                  set(layout.start_positions))
+    while not game.game_over:
+        legal = sorted(game.legal_moves(),
+                       key=lambda move: encode_move(move, layout.size))
+        game.push(rng.choice(legal) if legal else None)
+    return game.history
+
+
+def setup_game(engine: type[BlokusBase], layout: Layout,
+               moves: Sequence[Optional[Move]] = ()) -> BlokusBase:
+    """
+    Returns a game of the engine in the layout, after the given moves
+    (None for a retirement).
+
+    Raises ValueError if a move is illegal.
+    """
+    game = engine(layout.num_players, layout.size,
+                  set(layout.start_positions))
+    for move in moves:
+        if move is None:
+            game.retire()
+        elif not game.maybe_place(move.to_piece()):
+            raise ValueError(f"Illegal move: {move}")
+    return game
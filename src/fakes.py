@@ -4,9 +4,10 @@ Fake implementations of BlokusBase.
 We provide a BlokusStub implementation, and
 you must provide a BlokusFake implementation.
 """
-from shape_definitions import ShapeKind, definitions
+from shape_definitions import ShapeKind
 from piece import Point, Shape, Piece
 from base import BlokusBase, Grid
+from orientations import copy_shapes
 
 
 class BlokusStub(BlokusBase):
@@ -271,9 +272,7 @@ class BlokusFake(BlokusBase):
         assert num_players < 3
         self._curr_player = 1
         self._grid = [[None] * size for _ in range(size)]
-        self._shapes : dict[ShapeKind, Shape] = {}
-        for key, val in definitions.items():
-            self._shapes[key] = Shape.from_string(key, val)
+        self._shapes : dict[ShapeKind, Shape] = copy_shapes()
         self._scores : dict[int, int] = {}
         for player in range(1, self.num_players + 1):
             self._scores[player] = -89
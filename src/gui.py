@@ -8,9 +8,10 @@ import os
 import random
 import click
 from base import BlokusBase, Grid
-from blokus import Blokus
 from fakes import BlokusFake
+from layouts import LAYOUTS
 from piece import Piece
+from preview import PendingPreview, new_game
 from shape_definitions import ShapeKind
 os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "hide"
 import pygame
@@ -29,6 +30,7 @@ class GUI:
     pend_piece : Piece
     pend_loc : tuple[int, int]
     play_colors : dict[int, tuple[int, int, int]]
+    preview : PendingPreview
 
     font : pygame.font.Font
     clock : pygame.time.Clock
@@ -53,6 +55,7 @@ class GUI:
         self.pend_piece = Piece(self.game.shapes[random.choice
                                                  (list(game.shapes.keys()))])
         self.pend_loc = (self.size // 2, self.size // 2)
+        self.preview = PendingPreview(game)
         self.play_colors = {}
         for player in range(1, self.game.num_players + 1):
             if player % 4 == 0:
@@ -182,16 +185,17 @@ class GUI:
         Returns (None) : Nothing, draws
         """
         self.pend_piece.set_anchor(self.pend_loc)
+        if self.preview.legal(self.pend_piece):
+            color = (253, 255, 50)
+        else:
+            color = (150,53,53)
 
         for coord in self.pend_piece.squares():
             r, c = coord
             top = r * (self.sq_side + self.outline) + self.outline
             left = c * (self.sq_side + self.outline) + self.outline
             rect = pygame.Rect(left, top, self.sq_side, self.sq_side)
-            if not self.game.legal_to_place(self.pend_piece):
-                pygame.draw.rect(self.surface, (150,53,53), rect)
-            else:
-                pygame.draw.rect(self.surface, (253, 255, 50), rect)
+            pygame.draw.rect(self.surface, color, rect)
 
 
 
@@ -453,26 +457,16 @@ class GUI:
 @click.option('-s', '--size', default=14, help='board size')
 @click.option('-p', '--start-position', nargs=2, 
               multiple=True, default=((4,4),(9,9)), help='start points')
-@click.option('--game', type=click.Choice(['duo', 'mono','classic-2'
-                                           ,'classic-3','classic-4']))
+@click.option('--game', type=click.Choice(list(LAYOUTS)))
 def main_gui(num_players, size, start_position, game):
     """
     click command for gui
     """
     if game is not None:
-        if game == 'duo':
-            GUI(Blokus(2, 14, {(4,4), (9,9)}))
-        elif game == 'mono':
-            GUI(Blokus(1, 11, {(5,5)}))
-        elif game == 'classic-2':
-            GUI(Blokus(2, 20, {(0,0), (0, 19), (19, 0), (19, 19)}))
-        elif game == 'classic-3':
-            GUI(Blokus(3, 20, {(0,0), (0, 19), (19, 0), (19, 19)}))
-        elif game == 'classic-4':
-            GUI(Blokus(4, 20, {(0,0), (0, 19), (19, 0), (19, 19)}))
+        num_players, size, starts = LAYOUTS[game]
     else:
         starts = set(start_position)
-        GUI(Blokus(num_players, size, starts))
+    GUI(new_game(num_players, size, set(starts)))
 
 if __name__ == "__main__":
     main_gui()
\ No newline at end of file
@@ -0,0 +1,303 @@
+"""
+Opt-in instrumentation of the engine's hot paths.
+
+An instrumented game counts the calls to, and the time spent in,
+
+    available_moves, legal_moves, legal_to_place, any_collisions,
+    remaining_shapes and maybe_place
+
+(times include nested calls: maybe_place's includes the
+legal_to_place it makes), and the reason each rejected placement
+failed, checked in this order:
+
+    wall            a square is off the board
+    overlap         a square is already occupied
+    own-edge        a square shares an edge with the player's pieces
+    start-position  the player's first piece covers no start position
+    no-corner       a later piece touches no corner of their pieces
+
+Rejections are counted for legal_to_place and push calls that fail,
+and for move generation: each legal_moves call (and so each
+available_moves call) counts every candidate placement it rejects, a
+candidate being an orientation of a remaining shape anchored so that
+it covers a square of the player's corner frontier (see
+Blokus.legal_moves). Such candidates always touch a corner, so they
+only fail on wall, overlap and own-edge. sample_move's random tries
+are not counted. Working out the reasons takes time of its own, which
+is left out of the method times.
+
+Blokus games are instrumented when constructed with instrument=True,
+or, by default, when the BLOKUS_INSTRUMENT environment variable is
+set (to anything but "", "0", "false" or "no"). Instrumentation
+switches the game to a subclass whose methods wrap the engine's, so
+uninstrumented games run the engine's own methods, with no overhead
+at all. Instrumented games pickle and copy as instances of that
+subclass. The counters are kept in game.counters, and can be dumped
+as JSON or printed as a table.
+"""
+import json
+import os
+import time
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+from piece import Point, Piece
+from move import Move
+from orientations import ORIENTATIONS
+
+if TYPE_CHECKING:
+    from blokus import Blokus
+
+ENV_VAR = "BLOKUS_INSTRUMENT"
+
+METHODS = ("available_moves", "legal_moves", "legal_to_place",
+           "any_collisions", "remaining_shapes", "maybe_place")
+
+REASONS = ("wall", "overlap", "own-edge", "start-position", "no-corner")
+
+
+def instrument_enabled() -> bool:
+    """
+    Returns whether the BLOKUS_INSTRUMENT environment variable asks
+    for instrumentation.
+    """
+    return os.environ.get(ENV_VAR, "").strip().lower() not in \
+        ("", "0", "false", "no")
+
+
+class Counters:
+    """
+    Call counts, times and rejection reasons of one game.
+
+        calls : the number of calls to each method
+        seconds : the total time spent in each method
+        rejections : the number of rejected pieces, by reason
+        overhead : the time spent working out rejection reasons
+    """
+
+    calls: dict[str, int]
+    seconds: dict[str, float]
+    rejections: dict[str, int]
+    overhead: float
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Sets every counter back to zero.
+        """
+        self.calls = dict.fromkeys(METHODS, 0)
+        self.seconds = dict.fromkeys(METHODS, 0.0)
+        self.rejections = dict.fromkeys(REASONS, 0)
+        self.overhead = 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        """
+        Returns the counters as a dictionary of plain values.
+        """
+        return {
+            "methods": {name: {"calls": self.calls[name],
+                               "seconds": self.seconds[name]}
+                        for name in METHODS},
+            "rejections": dict(self.rejections),
+        }
+
+    def to_json(self) -> str:
+        """
+        Returns the counters as JSON.
+        """
+        return json.dumps(self.as_dict(), indent=2)
+
+    def table(self) -> str:
+        """
+        Returns the counters as a text table.
+        """
+        lines = [f"{'method':<18} {'calls':>9} {'seconds':>10} "
+                 f"{'us/call':>9}"]
+        for name in METHODS:
+            calls = self.calls[name]
+            seconds = self.seconds[name]
+            per_call = seconds / calls * 1e6 if calls else 0.0
+            lines.append(f"{name:<18} {calls:>9} {seconds:>10.4f} "
+                         f"{per_call:>9.1f}")
+        total = sum(self.rejections.values())
+        lines.append("")
+        lines.append(f"{'rejection':<18} {'count':>9} {'share':>10}")
+        for reason in REASONS:
+            count = self.rejections[reason]
+            share = count / total if total else 0.0
+            lines.append(f"{reason:<18} {count:>9} {share:>10.1%}")
+        return "\n".join(lines)
+
+
+def _collision(game: "Blokus", squares: list[Point]) -> Optional[str]:
+    """
+    Returns why the current player may not cover the squares, if it
+    is a wall, overlap or own-edge collision (None otherwise).
+    """
+    player = game.curr_player
+    size = game.size
+    grid = game.grid
+    if any(not (0 <= r < size and 0 <= c < size) for r, c in squares):
+        return "wall"
+    if any(grid[r][c] is not None for r, c in squares):
+        return "overlap"
+    for r, c in squares:
+        for er, ec in ((r - 1, c), (r, c - 1), (r, c + 1), (r + 1, c)):
+            if 0 <= er < size and 0 <= ec < size:
+                cell = grid[er][ec]
+                if cell is not None and cell[0] == player:
+                    return "own-edge"
+    return None
+
+
+def rejection_reason(game: "Blokus", piece: Piece) -> str:
+    """
+    Returns why the current player may not place a piece that
+    legal_to_place rejected (see the module docstring).
+    """
+    return _move_reason(game, piece.squares())
+
+
+def _move_reason(game: "Blokus", squares: list[Point]) -> str:
+    """
+    Returns why the current player may not cover the squares, which
+    make up a rejected placement.
+    """
+    reason = _collision(game, squares)
+    if reason is not None:
+        return reason
+    if game._placed_moves[game.curr_player]:
+        return "no-corner"
+    return "start-position"
+
+
+def count_candidates(game: "Blokus", rejections: dict[str, int]) -> None:
+    """
+    Adds the reason for each candidate placement that move generation
+    rejects in the game's position (see the module docstring) to
+    rejections.
+    """
+    player = game.curr_player
+    tried = set()
+    for r, c in game.frontier(player):
+        for kind in game._remaining[player]:
+            for orientation in ORIENTATIONS[kind]:
+                offsets = orientation.squares
+                for dr, dc in offsets:
+                    ar, ac = r - dr, c - dc
+                    key = (orientation.catalog_index, ar, ac)
+                    if key in tried:
+                        continue
+                    tried.add(key)
+                    reason = _collision(game, [(sr + ar, sc + ac)
+                                               for sr, sc in offsets])
+                    if reason is not None:
+                        rejections[reason] += 1
+
+
+def _wrap(name: str, method: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Returns a method that calls method, counting the call and its
+    time (less any overhead it adds) in self.counters under name.
+    """
+    def wrapper(self: Any, *args: Any) -> Any:
+        counters = self.counters
+        overhead = counters.overhead
+        start = time.perf_counter()
+        try:
+            return method(self, *args)
+        finally:
+            counters.calls[name] += 1
+            counters.seconds[name] += time.perf_counter() - start - \
+                (counters.overhead - overhead)
+    wrapper.__name__ = name
+    wrapper.__doc__ = method.__doc__
+    return wrapper
+
+
+def _wrap_legal_to_place(method: Callable[..., bool]) -> Callable[..., bool]:
+    """
+    Returns a legal_to_place that is counted like the other methods,
+    and also counts the reason for each rejection.
+    """
+    counted = _wrap("legal_to_place", method)
+
+    def legal_to_place(self: Any, piece: Piece) -> bool:
+        legal = counted(self, piece)
+        if not legal:
+            start = time.perf_counter()
+            self.counters.rejections[rejection_reason(self, piece)] += 1
+            self.counters.overhead += time.perf_counter() - start
+        return legal
+    legal_to_place.__doc__ = method.__doc__
+    return legal_to_place
+
+
+def _wrap_legal_moves(method: Callable[..., set[Move]]
+                      ) -> Callable[..., set[Move]]:
+    """
+    Returns a legal_moves that is counted like the other methods,
+    and also counts the reason for each candidate it rejects.
+    """
+    counted = _wrap("legal_moves", method)
+
+    def legal_moves(self: Any) -> set[Move]:
+        moves = counted(self)
+        start = time.perf_counter()
+        count_candidates(self, self.counters.rejections)
+        self.counters.overhead += time.perf_counter() - start
+        return moves
+    legal_moves.__doc__ = method.__doc__
+    return legal_moves
+
+
+def _wrap_push(method: Callable[..., bool]) -> Callable[..., bool]:
+    """
+    Returns a push that counts the reason for each rejected move.
+    """
+    def push(self: Any, move: Optional[Move], trusted: bool = False) -> bool:
+        made = method(self, move, trusted)
+        if not made:
+            assert move is not None
+            start = time.perf_counter()
+            reason = _move_reason(self, move.squares())
+            self.counters.rejections[reason] += 1
+            self.counters.overhead += time.perf_counter() - start
+        return made
+    push.__doc__ = method.__doc__
+    return push
+
+
+def _reduce(self: Any) -> tuple[Any, ...]:
+    """
+    Pickles an instrumented game by its engine class, which, unlike
+    the instrumented subclass, can be found by import.
+    """
+    return _restore, (self._uninstrumented,), self.__dict__
+
+
+def _restore(engine: type) -> Any:
+    """
+    Returns an empty instrumented game of the engine, for unpickling.
+    """
+    return object.__new__(instrumented(engine))
+
+
+@lru_cache(maxsize=None)
+def instrumented(cls: type) -> type:
+    """
+    Returns the instrumented subclass of an engine class.
+    """
+    namespace: dict[str, Any] = {
+        name: _wrap(name, getattr(cls, name)) for name in METHODS
+    }
+    namespace["legal_to_place"] = _wrap_legal_to_place(
+        getattr(cls, "legal_to_place"))
+    namespace["legal_moves"] = _wrap_legal_moves(getattr(cls, "legal_moves"))
+    namespace["push"] = _wrap_push(getattr(cls, "push"))
+    namespace["__reduce__"] = _reduce
+    namespace["_uninstrumented"] = cls
+    namespace["__module__"] = __name__
+    return type(f"Instrumented{cls.__name__}", (cls,), namespace)
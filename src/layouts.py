@@ -0,0 +1,35 @@
+"""
+The standard Blokus layouts: number of players, board size and start
+positions. Shared by the user interfaces, bots and offline tools.
+"""
+from types import MappingProxyType
+from typing import Mapping, NamedTuple
+
+from piece import Point
+
+
+class Layout(NamedTuple):
+    """
+    The setup of a game, with the fields of a BlokusBase constructor
+    in order. The start positions are frozen, so typed code passes
+    set(layout.start_positions) to the constructor.
+
+        num_players : number of players
+        size : number of squares on each side of the board
+        start_positions : positions for players' first moves
+    """
+
+    num_players: int
+    size: int
+    start_positions: frozenset[Point]
+
+
+_CORNERS = frozenset({(0, 0), (0, 19), (19, 0), (19, 19)})
+
+LAYOUTS: Mapping[str, Layout] = MappingProxyType({
+    "duo": Layout(2, 14, frozenset({(4, 4), (9, 9)})),
+    "mono": Layout(1, 11, frozenset({(5, 5)})),
+    "classic-2": Layout(2, 20, _CORNERS),
+    "classic-3": Layout(3, 20, _CORNERS),
+    "classic-4": Layout(4, 20, _CORNERS),
+})
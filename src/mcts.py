@@ -0,0 +1,280 @@
+"""
+Monte Carlo Tree Search bot.
+
+MCTSBot chooses moves with UCT for any number of players (1 to 4):
+each node keeps, for every player, the total reward of the playouts
+through it, and each player picks the child that is best for
+themselves (a player's reward is their share of the win, or, in
+one-player games, their score scaled to between 0 and 1).
+
+Blokus positions have hundreds of legal moves, too many to try each
+one even once, so nodes use progressive widening: a node visited n
+times may have at most WIDENING * n ** ALPHA children, added largest
+piece first (a strong prior in Blokus), in random order among pieces
+of the same size.
+
+The tree is walked and the playouts played on a single game with
+Blokus.push and Blokus.pop, without copying it, and playouts choose
+their moves with Blokus.sample_move instead of generating every legal
+move. With several workers, each worker process grows its own tree
+from a snapshot of the position (root parallelization) and the root
+statistics of all trees are summed.
+
+Playouts are still pure Python, a few dozen pushes, samples and pops
+each: on one core, a search from the opening runs about 450 playouts
+a second on duo and 300 on classic-4, well short of thousands per
+second. Budget playouts in the hundreds per worker accordingly.
+"""
+import math
+import multiprocessing
+import multiprocessing.pool
+import random
+import time
+from typing import Optional
+
+from move import Move, encode_move, decode_move
+from blokus import Blokus
+from scheduler import apply
+
+EXPLORATION = 0.7
+WIDENING = 2.0
+ALPHA = 0.5
+
+# Move codes for the root statistics (see _search); retiring is -1.
+_RETIRE = -1
+
+
+class Node:
+    """
+    A position in the search tree.
+
+        move : the move leading to the position (None for a
+            retirement, or at the root)
+        player : the player to move in the position
+        children : the positions reached by the moves tried so far
+        untried : the moves not yet tried, in the order they will be
+            (None until the node is first expanded)
+        visits : the number of playouts through the position
+        totals : each player's total reward over those playouts
+            (index 0 unused)
+    """
+
+    __slots__ = ("move", "player", "children", "untried", "visits",
+                 "totals")
+
+    move: Optional[Move]
+    player: int
+    children: list["Node"]
+    untried: Optional[list[Optional[Move]]]
+    visits: int
+    totals: list[float]
+
+    def __init__(self, move: Optional[Move], player: int,
+                 num_players: int) -> None:
+        self.move = move
+        self.player = player
+        self.children = []
+        self.untried = None
+        self.visits = 0
+        self.totals = [0.0] * (num_players + 1)
+
+    def select(self) -> "Node":
+        """
+        Returns the child with the best UCT score for the player to
+        move here.
+        """
+        log_visits = math.log(self.visits)
+        player = self.player
+
+        def score(child: Node) -> float:
+            return child.totals[player] / child.visits + \
+                EXPLORATION * math.sqrt(log_visits / child.visits)
+
+        return max(self.children, key=score)
+
+
+def rewards(game: Blokus) -> list[float]:
+    """
+    Returns each player's reward for a finished game (index 0
+    unused): their share of the win, or, for one player, their
+    score scaled from -89..20 to 0..1.
+    """
+    result = [0.0] * (game.num_players + 1)
+    if game.num_players == 1:
+        result[1] = (game.get_score(1) + 89) / 109
+        return result
+    winners = game.winners
+    assert winners is not None
+    for player in winners:
+        result[player] = 1 / len(winners)
+    return result
+
+
+def _ordered_moves(game: Blokus, rng: random.Random) -> list[Optional[Move]]:
+    """
+    Returns the current player's legal moves (or [None], to retire, if
+    there are none) in the order progressive widening adds them: the
+    last move is tried first.
+    """
+    moves = sorted(game.legal_moves(),
+                   key=lambda move: encode_move(move, game.size))
+    if not moves:
+        return [None]
+    rng.shuffle(moves)
+    moves.sort(key=lambda move: len(move.orientation.squares))
+    return list(moves)
+
+
+def search(game: Blokus, rng: random.Random, playouts: Optional[int] = None,
+           deadline: Optional[float] = None) -> Node:
+    """
+    Grows a search tree from the game's position until playouts
+    playouts have been run or time.perf_counter() passes deadline
+    (whichever comes first; at least one playout is always run), and
+    returns its root. The game is left as it was.
+    """
+    num_players = game.num_players
+    root = Node(None, game.curr_player, num_players)
+    done = 0
+    while done == 0 or \
+            (playouts is None or done < playouts) and \
+            (deadline is None or time.perf_counter() < deadline):
+        node = root
+        path = [root]
+        depth = 0
+
+        # Selection and expansion.
+        while not game.game_over:
+            if node.untried is None:
+                node.untried = _ordered_moves(game, rng)
+            limit = WIDENING * (node.visits + 1) ** ALPHA
+            if node.untried and len(node.children) < limit:
+                move = node.untried.pop()
+                game.push(move, trusted=True)
+                depth += 1
+                child = Node(move, game.curr_player, num_players)
+                node.children.append(child)
+                path.append(child)
+                break
+            node = node.select()
+            game.push(node.move, trusted=True)
+            depth += 1
+            path.append(node)
+
+        # Playout.
+        while not game.game_over:
+            game.push(game.sample_move(rng), trusted=True)
+            depth += 1
+        reward = rewards(game)
+        for _ in range(depth):
+            game.pop()
+
+        # Backpropagation.
+        for node in path:
+            node.visits += 1
+            for player in range(1, num_players + 1):
+                node.totals[player] += reward[player]
+        done += 1
+    return root
+
+
+def _search(job: tuple[bytes, int, Optional[int], Optional[float]]
+            ) -> dict[int, tuple[int, float]]:
+    """
+    Grows a tree from a snapshot in a worker process, for at most the
+    given playouts and seconds, and returns the visits and the root
+    player's total reward of each root child, by move code.
+    """
+    snapshot, seed, playouts, seconds = job
+    deadline = None if seconds is None else time.perf_counter() + seconds
+    game = Blokus.from_snapshot(snapshot)
+    root = search(game, random.Random(seed), playouts, deadline)
+    return {
+        _RETIRE if child.move is None else encode_move(child.move, game.size):
+            (child.visits, child.totals[root.player])
+        for child in root.children
+    }
+
+
+class MCTSBot:
+    """
+    Bot that chooses moves with Monte Carlo Tree Search.
+
+        game : the game the bot plays in
+        rng : random number generator (also seeds the workers)
+        playouts : playouts per move, per worker (None for no limit)
+        seconds : time per move (None for no limit)
+        workers : number of worker processes (1 to search in this
+            process)
+    """
+
+    game: Blokus
+    rng: random.Random
+    playouts: Optional[int]
+    seconds: Optional[float]
+    workers: int
+    _pool: Optional[multiprocessing.pool.Pool]
+
+    def __init__(self, game: Blokus, rng: Optional[random.Random] = None,
+                 playouts: Optional[int] = 1000,
+                 seconds: Optional[float] = None, workers: int = 1) -> None:
+        """
+        Constructor (see the class attributes).
+
+        Raises ValueError if neither playouts nor seconds is given.
+        """
+        if playouts is None and seconds is None:
+            raise ValueError("Need a playout or time budget.")
+        self.game = game
+        self.rng = rng if rng is not None else random.Random()
+        self.playouts = playouts
+        self.seconds = seconds
+        self.workers = workers
+        self._pool = None
+
+    def choose_move(self, state: Blokus,
+                    deadline: Optional[float] = None) -> Optional[Move]:
+        """
+        Returns the most visited move at the root of a search of the
+        state (None to retire), stopping at the bot's own budget or
+        at deadline, whichever comes first (see scheduler.Bot).
+        """
+        seconds = self.seconds
+        if deadline is not None:
+            remaining = max(0.0, deadline - time.perf_counter())
+            seconds = remaining if seconds is None else \
+                min(seconds, remaining)
+
+        if self.workers == 1:
+            own = None if seconds is None else time.perf_counter() + seconds
+            root = search(state, self.rng, self.playouts, own)
+            return max(root.children, key=lambda child: child.visits).move
+
+        if self._pool is None:
+            self._pool = multiprocessing.Pool(self.workers)
+        snapshot = state.snapshot()
+        jobs = [(snapshot, self.rng.getrandbits(64), self.playouts,
+                 seconds) for _ in range(self.workers)]
+        stats: dict[int, list[float]] = {}
+        for result in self._pool.map(_search, jobs):
+            for code, (visits, total) in result.items():
+                stat = stats.setdefault(code, [0, 0.0])
+                stat[0] += visits
+                stat[1] += total
+        code = max(stats, key=lambda code: (stats[code][0], -code))
+        return None if code == _RETIRE else decode_move(code, state.size)
+
+    def move(self) -> None:
+        """
+        Makes the chosen move in the bot's game (or retires).
+        """
+        apply(self.game, self.choose_move(self.game))
+
+    def close(self) -> None:
+        """
+        Shuts down the worker processes, if any.
+        """
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
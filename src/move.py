@@ -0,0 +1,123 @@
+"""
+Compact, immutable representation of Blokus moves.
+
+A Piece carries its own deep copy of a Shape and is transformed in
+place, so it cannot be used as a set element or dictionary key. A Move
+instead names a placement by its shape kind, the id of one of that
+shape's distinct orientations (see orientations.py), and the anchor.
+Moves compare and hash by value, so each placement corresponds to
+exactly one Move.
+
+Moves on a (size x size) board can also be encoded as small integers,
+which are cheaper to store in bulk and can index policy vectors or
+transposition entries. The code of a move is
+
+    (orientation index * size + anchor row) * size + anchor column
+
+where the orientation index is the move's position in ALL_ORIENTATIONS,
+so the codes of a board run from 0 to num_move_codes(size) - 1.
+"""
+from array import array
+from dataclasses import dataclass
+
+from shape_definitions import ShapeKind
+from piece import Point, Piece
+from orientations import (ORIENTATIONS, ALL_ORIENTATIONS, NUM_ORIENTATIONS,
+                          Orientation, find_orientation)
+
+
+@dataclass(frozen=True, slots=True)
+class Move:
+    """
+    A placement of a shape on the board.
+
+        kind : the shape kind
+        orientation_id : index into ORIENTATIONS[kind]
+        anchor : the board position of the shape's origin
+    """
+
+    kind: ShapeKind
+    orientation_id: int
+    anchor: Point
+
+    @property
+    def orientation(self) -> Orientation:
+        """
+        Returns the orientation of the shape.
+        """
+        return ORIENTATIONS[self.kind][self.orientation_id]
+
+    def squares(self) -> list[Point]:
+        """
+        Returns the board positions covered by the move.
+        """
+        r, c = self.anchor
+        return [(r + dr, c + dc) for dr, dc in self.orientation.squares]
+
+    def to_piece(self) -> Piece:
+        """
+        Returns a new Piece for this move.
+        """
+        return self.orientation.piece(self.anchor)
+
+    @staticmethod
+    def from_piece(piece: Piece) -> "Move":
+        """
+        Returns the Move covering the same squares as the given Piece.
+
+        Raises ValueError if the anchor of the piece is None.
+        """
+        squares = piece.squares()
+        orientation = find_orientation(piece.shape.kind, squares)
+        # The piece may be a translation of the catalog orientation
+        # (e.g., LETTER_O rotated about its corner), so the anchor is
+        # found by lining up the top-left corners of the two.
+        row_shift = min(r for r, _ in squares) - \
+            min(r for r, _ in orientation.squares)
+        col_shift = min(c for _, c in squares) - \
+            min(c for _, c in orientation.squares)
+        return Move(piece.shape.kind, orientation.orientation_id,
+                    (row_shift, col_shift))
+
+
+def num_move_codes(size: int) -> int:
+    """
+    Returns the number of distinct move codes on a (size x size) board.
+    """
+    return NUM_ORIENTATIONS * size * size
+
+
+def encode_move(move: Move, size: int) -> int:
+    """
+    Returns the code of a move on a (size x size) board.
+
+    Raises ValueError if the anchor of the move is not on the board
+    (no move that fits on the board has such an anchor).
+    """
+    r, c = move.anchor
+    if not (0 <= r < size and 0 <= c < size):
+        raise ValueError(f"Anchor not on board: {move}")
+    return (move.orientation.catalog_index * size + r) * size + c
+
+
+def decode_move(code: int, size: int) -> Move:
+    """
+    Returns the move with the given code on a (size x size) board.
+
+    Raises ValueError if the code is out of range.
+    """
+    if not 0 <= code < num_move_codes(size):
+        raise ValueError(f"Move code out of range: {code}")
+    index, cell = divmod(code, size * size)
+    orientation = ALL_ORIENTATIONS[index]
+    return Move(orientation.kind, orientation.orientation_id,
+                divmod(cell, size))
+
+
+def code_array(size: int) -> array:
+    """
+    Returns an empty array with the smallest unsigned item type that
+    holds every move code of a (size x size) board: 2 bytes per code
+    for boards up to 26 x 26.
+    """
+    return array("H" if num_move_codes(size) <= 1 << 16 else "I")
@@ -0,0 +1,166 @@
+"""
+NumPy backend for Blokus (requires numpy).
+
+BlokusNumpy keeps, alongside the state of Blokus, two boolean planes
+per player:
+
+  - blocked: squares the player's next piece may not cover (walls,
+    occupied squares and squares sharing an edge with their pieces);
+  - corners: the player's corner frontier (see Blokus).
+
+Both planes are padded by PAD squares on every side, so that shifting
+them by any square offset of a shape stays in bounds. For a given
+orientation, the legal anchors are then those where no shifted blocked
+plane is set and at least one shifted corners plane is: a handful of
+whole-array operations instead of one legal_to_place call per anchor.
+"""
+from typing import Optional
+
+import numpy as np
+
+from shape_definitions import ShapeKind
+from piece import Point
+from orientations import ALL_ORIENTATIONS, ORIENTATIONS, Orientation
+from move import Move
+from blokus import Blokus
+
+# The largest distance from a shape's origin to any of its squares.
+PAD = max(max(abs(dr), abs(dc))
+          for orientation in ALL_ORIENTATIONS
+          for dr, dc in orientation.squares)
+
+
+class BlokusNumpy(Blokus):
+    """
+    Blokus with vectorized legal-anchor masks. Drop-in replacement
+    for blokus.Blokus.
+
+    New attributes:
+        _blocked : (num_players + 1) padded boolean planes (index 0 is
+            unused) of the squares each player may not cover
+        _corners : (num_players + 1) padded boolean planes of each
+            player's corner frontier
+    """
+
+    _blocked: np.ndarray
+    _corners: np.ndarray
+
+    def __init__(
+        self,
+        num_players: int,
+        size: int,
+        start_positions: set[Point],
+        instrument: Optional[bool] = None,
+    ) -> None:
+        """
+        Constructor (See Blokus)
+        """
+        super().__init__(num_players, size, start_positions, instrument)
+        padded = size + 2 * PAD
+        self._blocked = np.ones((num_players + 1, padded, padded),
+                                dtype=bool)
+        self._blocked[:, PAD:PAD + size, PAD:PAD + size] = False
+        self._corners = np.zeros((num_players + 1, padded, padded),
+                                 dtype=bool)
+        for player, frontier in self._frontier.items():
+            for r, c in frontier:
+                self._corners[player, PAD + r, PAD + c] = True
+
+    def _sync(self, points: list[Point]) -> None:
+        """
+        Copies the blocked and corner frontier status of the given
+        squares from the Blokus state into the arrays.
+        """
+        for r, c in points:
+            cell = self._grid[r][c]
+            for player in range(1, self._num_players + 1):
+                point = (r, c)
+                self._blocked[player, PAD + r, PAD + c] = \
+                    cell is not None or point in self._edges[player]
+                self._corners[player, PAD + r, PAD + c] = \
+                    point in self._frontier[player]
+
+    def _touched(self, squares: list[Point]) -> list[Point]:
+        """
+        Returns the given squares plus every square whose frontier or
+        edge status the latest move changed.
+        """
+        undo = self._history[-1]
+        return squares + [point for _, point in undo.frontier_removed] + \
+            list(undo.frontier_added) + list(undo.edges_added)
+
+    def _place(self, move: Move, squares: list[Point]) -> None:
+        """
+        See Blokus
+        """
+        super()._place(move, squares)
+        self._sync(self._touched(squares))
+
+    def pop(self) -> Optional[Move]:
+        """
+        See Blokus
+        """
+        if self._history and self._history[-1].move is not None:
+            touched = self._touched(self._history[-1].move.squares())
+            move = super().pop()
+            self._sync(touched)
+            return move
+        return super().pop()
+
+    @classmethod
+    def from_snapshot(cls, data: bytes) -> "BlokusNumpy":
+        """
+        See Blokus
+        """
+        game = super().from_snapshot(data)
+        assert isinstance(game, BlokusNumpy)
+        game._sync([(r, c) for r in range(game.size)
+                    for c in range(game.size)])
+        return game
+
+    def _anchor_mask(self, orientation: Orientation) -> np.ndarray:
+        """
+        Returns the (size x size) boolean mask of the anchors at which
+        the current player may place the given orientation.
+        """
+        player = self.curr_player
+        blocked = self._blocked[player]
+        corners = self._corners[player]
+        n = self.size
+        fits = np.ones((n, n), dtype=bool)
+        touches = np.zeros((n, n), dtype=bool)
+        for dr, dc in orientation.squares:
+            r, c = PAD + dr, PAD + dc
+            fits &= ~blocked[r:r + n, c:c + n]
+            touches |= corners[r:r + n, c:c + n]
+        return fits & touches
+
+    def legal_anchors(self, kind: ShapeKind,
+                      orientation_id: int) -> np.ndarray:
+        """
+        Returns the (size x size) boolean mask of the anchors at which
+        the current player may legally place the given orientation
+        (see orientations.py) of the given shape.
+
+        Raises ValueError if the player has already
+        played a piece with this shape.
+        """
+        if kind not in self._remaining[self.curr_player]:
+            raise ValueError
+        return self._anchor_mask(ORIENTATIONS[kind][orientation_id])
+
+    def legal_moves(self) -> set[Move]:
+        """
+        See Blokus
+        """
+        moves: set[Move] = set()
+        player = self.curr_player
+        if not self._frontier[player]:
+            return moves
+        for kind in self._remaining[player]:
+            for orientation in ORIENTATIONS[kind]:
+                rows, cols = np.nonzero(self._anchor_mask(orientation))
+                for r, c in zip(rows.tolist(), cols.tolist()):
+                    moves.add(Move(kind, orientation.orientation_id,
+                                   (r, c)))
+        return moves
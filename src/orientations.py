@@ -0,0 +1,159 @@
+"""
+Precomputed orientations of the 21 Blokus shapes.
+
+The catalog is built once, when this module is first imported, and is
+shared by the game engines, bots and user interfaces. It holds:
+
+  - SHAPES: each ShapeKind's Shape, parsed from shape_definitions.py
+    (use copy_shapes to get Shapes that may be modified);
+  - ORIENTATIONS: each ShapeKind's distinct orientations; and
+  - ALL_ORIENTATIONS: the 91 distinct orientations of all shapes.
+
+Two orientations are the same if they cover the same squares up to a
+translation. For example, rotating LETTER_O about its (0, 0) origin only
+moves it by one square, so LETTER_O has a single orientation, while the
+asymmetric shapes (such as F and L) have eight.
+"""
+from types import MappingProxyType
+from typing import Mapping, NamedTuple
+
+from shape_definitions import ShapeKind, definitions
+from piece import Point, Shape, Piece
+
+
+class Orientation(NamedTuple):
+    """
+    One distinct orientation of a shape.
+
+        kind : the shape kind
+        orientation_id : position among the orientations of this kind;
+            0 is the orientation defined in shape_definitions.py
+        catalog_index : position in ALL_ORIENTATIONS
+        flipped : whether the shape is flipped horizontally...
+        rotation : ... before being rotated right this many times
+        squares : the squares, relative to the origin of the shape
+    """
+
+    kind: ShapeKind
+    orientation_id: int
+    catalog_index: int
+    flipped: bool
+    rotation: int
+    squares: tuple[Point, ...]
+
+    def anchors(self, size: int) -> tuple[range, range]:
+        """
+        Returns the rows and columns at which this orientation can be
+        anchored on a (size x size) board without hitting a wall.
+        """
+        rows = [r for r, _ in self.squares]
+        cols = [c for _, c in self.squares]
+        return (range(-min(rows), size - max(rows)),
+                range(-min(cols), size - max(cols)))
+
+    def piece(self, anchor: Point) -> Piece:
+        """
+        Returns a new Piece in this orientation at the given anchor.
+        """
+        piece = Piece(SHAPES[self.kind])
+        piece.shape.squares = list(self.squares)
+        piece.set_anchor(anchor)
+        return piece
+
+
+def normalize(squares: list[Point] | tuple[Point, ...]) -> frozenset[Point]:
+    """
+    Translates the squares so that the topmost row and leftmost
+    column are both 0. Two sets of squares are translations of one
+    another exactly when they normalize to the same set.
+    """
+    min_r = min(r for r, _ in squares)
+    min_c = min(c for _, c in squares)
+    return frozenset((r - min_r, c - min_c) for r, c in squares)
+
+
+def find_orientation(kind: ShapeKind,
+                     squares: list[Point] | tuple[Point, ...]) -> Orientation:
+    """
+    Returns the orientation of the given kind of shape that covers
+    the given squares (up to a translation).
+
+    Raises ValueError if no orientation of the shape does.
+    """
+    orientation = _BY_FOOTPRINT.get((kind, normalize(squares)))
+    if orientation is None:
+        raise ValueError(f"Not an orientation of {kind}: {squares}")
+    return orientation
+
+
+def copy_shapes() -> dict[ShapeKind, Shape]:
+    """
+    Returns a new copy of every Shape in SHAPES, so that callers may
+    flip and rotate them in place without parsing the definitions again.
+    """
+    return {kind: Shape(kind, shape.origin, shape.can_be_transformed,
+                        list(shape.squares))
+            for kind, shape in SHAPES.items()}
+
+
+def _load_shapes() -> dict[ShapeKind, Shape]:
+    """
+    Parses every shape in shape_definitions.py.
+    """
+    return {kind: Shape.from_string(kind, definition)
+            for kind, definition in definitions.items()}
+
+
+def _load_orientations(
+    shapes: Mapping[ShapeKind, Shape],
+) -> dict[ShapeKind, tuple[Orientation, ...]]:
+    """
+    Generates the eight flips and rotations of each shape, in the
+    same order as Piece (flip first, then rotate right), keeping the
+    first of any that are translations of one another.
+    """
+    result = {}
+    index = 0
+    for kind, shape in shapes.items():
+        orientations: list[Orientation] = []
+        seen: set[frozenset[Point]] = set()
+        for flipped in (False, True):
+            for rotation in range(4):
+                transformed = Shape(kind, shape.origin,
+                                    shape.can_be_transformed,
+                                    list(shape.squares))
+                if flipped:
+                    transformed.flip_horizontally()
+                for _ in range(rotation):
+                    transformed.rotate_right()
+                key = normalize(transformed.squares)
+                if key in seen:
+                    continue
+                seen.add(key)
+                orientations.append(Orientation(
+                    kind, len(orientations), index, flipped, rotation,
+                    tuple(transformed.squares)))
+                index += 1
+        result[kind] = tuple(orientations)
+    return result
+
+
+SHAPES: Mapping[ShapeKind, Shape] = MappingProxyType(_load_shapes())
+
+ORIENTATIONS: Mapping[ShapeKind, tuple[Orientation, ...]] = \
+    MappingProxyType(_load_orientations(SHAPES))
+
+ALL_ORIENTATIONS: tuple[Orientation, ...] = tuple(
+    orientation
+    for orientations in ORIENTATIONS.values()
+    for orientation in orientations
+)
+
+_BY_FOOTPRINT: dict[tuple[ShapeKind, frozenset[Point]], Orientation] = {
+    (orientation.kind, normalize(orientation.squares)): orientation
+    for orientation in ALL_ORIENTATIONS
+}
+
+NUM_ORIENTATIONS = 91
+
+assert len(ALL_ORIENTATIONS) == NUM_ORIENTATIONS
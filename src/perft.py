@@ -0,0 +1,193 @@
+"""
+Perft: counting the positions reachable in a given number of plies.
+
+perft(game, depth) walks every sequence of depth moves from a
+position (a player without a legal move retires, which counts as their
+ply) and counts the positions reached at the end, broken down by the
+shape of the last move ("retire" for a retirement). Lines on which
+the game ends early are not counted. The counts only depend on the
+rules, so any two engines must agree on them: running perft on a new
+or optimized BlokusBase engine and comparing with blokus.Blokus
+checks its move generation, and timing it measures its speed.
+
+perft works with any BlokusBase engine. Engines with push and pop
+(Blokus and its subclasses) search in place; others are copied at
+every move. At the last ply the moves are counted without being made.
+
+    python src/perft.py duo -d 2
+    python src/perft.py mini-2 -d 3 -e blokus -e bitboard -e numpy
+    python src/perft.py classic-4 -d 2 --plies 8 --seed 1
+"""
+import copy
+import sys
+import time
+from collections import Counter
+from typing import NamedTuple, Optional, Sequence
+
+import click
+
+from base import BlokusBase
+from blokus import Blokus
+from shape_definitions import ShapeKind
+from move import Move
+from engines import ENGINES, SETUPS, game_moves, setup_game
+
+RETIRE = "retire"
+
+
+class PerftResult(NamedTuple):
+    """
+    The outcome of a perft run.
+
+        nodes : the number of positions reached at the last ply
+        shapes : those positions by the shape of the last move
+            (ShapeKind names, and RETIRE for retirements)
+        seconds : the time taken
+    """
+
+    nodes: int
+    shapes: dict[str, int]
+    seconds: float
+
+    @property
+    def nodes_per_second(self) -> float:
+        """
+        Returns the number of positions counted per second.
+        """
+        return self.nodes / self.seconds if self.seconds else 0.0
+
+
+def moves(game: BlokusBase) -> list[Move]:
+    """
+    Returns the current player's legal moves, from the engine's own
+    move generator (legal_moves if it has one, available_moves
+    otherwise).
+    """
+    if isinstance(game, Blokus):
+        return list(game.legal_moves())
+    return [Move.from_piece(piece) for piece in game.available_moves()]
+
+
+def _count(game: BlokusBase, depth: int, shapes: Counter) -> int:
+    """
+    Returns the number of positions depth plies from the game's
+    position, counting them in shapes by their last move.
+    """
+    if depth == 0:
+        return 1
+    if game.game_over:
+        return 0
+    legal: list[Optional[Move]] = list(moves(game))
+    if depth == 1:
+        for move in legal:
+            assert move is not None
+            shapes[move.kind.name] += 1
+        if not legal:
+            shapes[RETIRE] += 1
+        return max(1, len(legal))
+
+    total = 0
+    for move in legal or [None]:
+        if isinstance(game, Blokus):
+            game.push(move, trusted=True)
+            try:
+                total += _count(game, depth - 1, shapes)
+            finally:
+                game.pop()
+        else:
+            child = copy.deepcopy(game)
+            if move is None:
+                child.retire()
+            else:
+                assert child.maybe_place(move.to_piece())
+            total += _count(child, depth - 1, shapes)
+    return total
+
+
+def perft(game: BlokusBase, depth: int) -> PerftResult:
+    """
+    Counts the positions depth plies from the game's position (see
+    the module docstring). The game is left as it was.
+
+    Raises ValueError if depth is negative.
+    """
+    if depth < 0:
+        raise ValueError("Depth must not be negative.")
+    shapes: Counter = Counter()
+    start = time.perf_counter()
+    nodes = _count(game, depth, shapes)
+    seconds = time.perf_counter() - start
+    order = [kind.name for kind in ShapeKind] + [RETIRE]
+    return PerftResult(nodes, {name: shapes[name] for name in order
+                               if shapes[name]}, seconds)
+
+
+def start_position(engine: type[BlokusBase], setup: str, plies: int = 0,
+                   seed: int = 0) -> BlokusBase:
+    """
+    Returns a game of the engine in a setup (see engines.SETUPS),
+    after the first plies moves of a seeded random game.
+
+    Raises ValueError if the seeded game is shorter than plies.
+    """
+    layout = SETUPS[setup]
+    history = game_moves(layout, seed)
+    if plies > len(history):
+        raise ValueError(f"The game only has {len(history)} moves.")
+    return setup_game(engine, layout, history[:plies])
+
+
+def compare(results: dict[str, PerftResult]) -> list[str]:
+    """
+    Returns the engines whose counts differ from the first engine's.
+    """
+    names = list(results)
+    reference = results[names[0]]
+    return [name for name in names[1:]
+            if results[name][:2] != reference[:2]]
+
+
+@click.command
+@click.argument("setup", type=click.Choice(list(SETUPS)))
+@click.option("-d", "--depth", default=2, help="plies to search")
+@click.option("-e", "--engine", "engines", multiple=True,
+              type=click.Choice(list(ENGINES)),
+              help="engine (repeatable, to compare with the first; "
+                   "default: blokus)")
+@click.option("--plies", default=0,
+              help="random moves to make before counting")
+@click.option("--seed", default=0, help="seed of the random moves")
+def main_perft(setup: str, depth: int, engines: Sequence[str], plies: int,
+               seed: int) -> None:
+    """
+    Count the positions reachable from SETUP in DEPTH plies, with one
+    or more engines, and check that the engines agree.
+    """
+    results = {}
+    for name in engines or ["blokus"]:
+        game = start_position(ENGINES[name], setup, plies, seed)
+        results[name] = result = perft(game, depth)
+        print(f"{name:<10} {result.nodes:>12} nodes "
+              f"{result.seconds:>9.3f} s "
+              f"{result.nodes_per_second:>12.0f} nodes/s", flush=True)
+
+    print()
+    reference = next(iter(results.values()))
+    for shape, count in reference.shapes.items():
+        print(f"{shape:<10} {count:>12}")
+
+    mismatched = compare(results)
+    for name in mismatched:
+        print(f"MISMATCH {name}: {results[name].nodes} nodes")
+        names = reference.shapes.keys() | results[name].shapes.keys()
+        for shape in sorted(names):
+            expected = reference.shapes.get(shape, 0)
+            actual = results[name].shapes.get(shape, 0)
+            if expected != actual:
+                print(f"  {shape:<10} {actual:>12} != {expected}")
+    if mismatched:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main_perft()
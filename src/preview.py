@@ -0,0 +1,77 @@
+"""
+Legality preview of the pending piece, shared by the GUI and TUI.
+
+With the NumPy backend (see numpy_backend.py), the legal anchors of
+the pending piece's orientation are computed in one vectorized step
+and cached until the position or the orientation changes, so moving
+the piece around the board only looks its anchor up in the mask.
+Without numpy, or with other backends, each preview is one
+legal_to_place call.
+"""
+from typing import Any, Optional
+
+from base import BlokusBase
+from blokus import Blokus
+from piece import Point, Piece
+from move import Move
+
+try:
+    from numpy_backend import BlokusNumpy
+    HAVE_NUMPY = True
+except ImportError:
+    HAVE_NUMPY = False
+
+
+def new_game(num_players: int, size: int,
+             start_positions: set[Point],
+             engine: type[Blokus] = Blokus) -> Blokus:
+    """
+    Returns a new game for the GUI and TUI. The default engine is
+    Blokus, not BlokusNumpy: the NumPy backend generates moves more
+    slowly (see benchmark.py), and only previews faster.
+    """
+    return engine(num_players, size, start_positions)
+
+
+class PendingPreview:
+    """
+    Answers whether a UI's pending piece may be placed where it is.
+    """
+
+    game: BlokusBase
+    _mask_key: Optional[tuple[int, Any, int]]
+    _mask: Any
+
+    def __init__(self, game: BlokusBase) -> None:
+        """
+        Constructor
+
+            game: the game whose current player holds the piece
+        """
+        self.game = game
+        self._mask_key = None
+        self._mask = None
+
+    def legal(self, piece: Piece) -> bool:
+        """
+        Returns whether the current player may place the piece at its
+        anchor. Pieces whose shape the player has already played are
+        never legal.
+        """
+        try:
+            if not HAVE_NUMPY or \
+                    not isinstance(self.game, BlokusNumpy):
+                return self.game.legal_to_place(piece)
+            if self.game.any_wall_collisions(piece):
+                return False
+        except ValueError:
+            return False
+
+        move = Move.from_piece(piece)
+        key = (self.game.position_hash, move.kind, move.orientation_id)
+        if key != self._mask_key:
+            self._mask = self.game.legal_anchors(move.kind,
+                                                 move.orientation_id)
+            self._mask_key = key
+        r, c = move.anchor
+        return bool(self._mask[r, c])
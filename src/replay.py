@@ -0,0 +1,190 @@
+"""
+Compact binary game records, and replaying them.
+
+A record is a short header followed by one move code (see
+move.encode_move) per move, in the order the moves were made:
+
+    magic      4 bytes   b"BLKR"
+    version    1 byte    1
+    size       1 byte    board size
+    players    1 byte    number of players
+    starts     1 byte    number of start positions
+    positions  2 bytes   row and column of each start position
+    moves      2 bytes   little-endian code of each move, or
+                         retire_code(size) for a retirement
+                         (4 bytes per move on boards larger than 26 x 26)
+
+so a typical two-player game takes well under 100 bytes. Replayer
+rebuilds the game at any point of a record, moving forwards with
+Blokus.push and backwards with Blokus.pop; in trusted mode, moves
+are not checked for legality on the way.
+"""
+import struct
+import sys
+from array import array
+from typing import NamedTuple, Optional, Union
+
+from piece import Point
+from move import Move, encode_move, decode_move, code_array
+from blokus import Blokus
+
+MAGIC = b"BLKR"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sBBBB")
+
+
+class Header(NamedTuple):
+    """
+    The layout of a recorded game.
+
+        size : board size
+        num_players : number of players
+        start_positions : the start positions, sorted
+    """
+
+    size: int
+    num_players: int
+    start_positions: tuple[Point, ...]
+
+
+def retire_code(size: int) -> int:
+    """
+    Returns the code that records a retirement on a (size x size)
+    board: the largest value a move code of that board can hold.
+    """
+    return (1 << (8 * code_array(size).itemsize)) - 1
+
+
+def dumps(header: Header, moves: list[Optional[Move]]) -> bytes:
+    """
+    Returns the record of the given moves (None for a retirement).
+
+    Raises ValueError if the board is larger than 255 x 255, or if a
+    move's anchor is off the board.
+    """
+    if header.size > 255:
+        raise ValueError("Board too large to record.")
+    codes = code_array(header.size)
+    retire = retire_code(header.size)
+    codes.extend(retire if move is None else encode_move(move, header.size)
+                 for move in moves)
+    if sys.byteorder == "big":
+        codes.byteswap()
+    starts = bytes(coord for point in header.start_positions
+                   for coord in point)
+    return _HEADER.pack(MAGIC, VERSION, header.size, header.num_players,
+                        len(header.start_positions)) + starts + \
+        codes.tobytes()
+
+
+def record(game: Blokus) -> bytes:
+    """
+    Returns the record of every move made so far in the game.
+    """
+    header = Header(game.size, game.num_players,
+                    tuple(sorted(game.start_positions)))
+    return dumps(header, game.history)
+
+
+def loads(data: Union[bytes, memoryview]) -> tuple[Header, array]:
+    """
+    Returns the header and the move codes (see retire_code) of a
+    record, given as bytes or as a view of them (such as an archive
+    entry, read without copying).
+
+    Raises ValueError if the data is not a record.
+    """
+    if len(data) < _HEADER.size:
+        raise ValueError("Not a game record.")
+    magic, version, size, num_players, num_starts = \
+        _HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not a game record.")
+    end = _HEADER.size + 2 * num_starts
+    starts = data[_HEADER.size:end]
+    codes = code_array(size)
+    if len(starts) != 2 * num_starts or \
+            (len(data) - end) % codes.itemsize:
+        raise ValueError("Truncated game record.")
+    codes.frombytes(data[end:])
+    if sys.byteorder == "big":
+        codes.byteswap()
+    header = Header(size, num_players,
+                    tuple(zip(starts[::2], starts[1::2])))
+    return header, codes
+
+
+class Replayer:
+    """
+    A game being replayed from a record.
+
+        game : the game, as of position moves into the record
+        position : how many of the record's moves have been made
+        trusted : whether moves are made without checking them
+    """
+
+    header: Header
+    codes: array
+    game: Blokus
+    position: int
+    trusted: bool
+    _retire: int
+
+    def __init__(self, data: Union[bytes, memoryview],
+                 trusted: bool = False,
+                 engine: type[Blokus] = Blokus) -> None:
+        """
+        Loads a record and sets up its game before the first move.
+
+            trusted: make moves without checking that they are legal
+                (only for records of games known to be valid)
+            engine: the Blokus class to replay with
+
+        Raises ValueError if the data is not a record.
+        """
+        self.header, self.codes = loads(data)
+        self.trusted = trusted
+        self._retire = retire_code(self.header.size)
+        self.game = engine(self.header.num_players, self.header.size,
+                           set(self.header.start_positions))
+        self.position = 0
+
+    def __len__(self) -> int:
+        """
+        Returns the number of moves in the record.
+        """
+        return len(self.codes)
+
+    def move(self, i: int) -> Optional[Move]:
+        """
+        Returns the record's move number i (None for a retirement).
+        """
+        code = self.codes[i]
+        if code == self._retire:
+            return None
+        return decode_move(code, self.header.size)
+
+    def seek(self, position: int) -> Blokus:
+        """
+        Replays or takes back moves until the first position moves
+        of the record have been made, and returns the game.
+
+        Raises IndexError if position is not between 0 and len(self),
+        and ValueError (unless trusted) if the record has an illegal
+        move.
+        """
+        if not 0 <= position <= len(self.codes):
+            raise IndexError(position)
+        game = self.game
+        while self.position > position:
+            game.pop()
+            self.position -= 1
+        while self.position < position:
+            move = self.move(self.position)
+            if not self.trusted and game.game_over or \
+                    not game.push(move, trusted=self.trusted):
+                raise ValueError(
+                    f"Illegal move {self.position} in record: {move}")
+            self.position += 1
+        return game
@@ -0,0 +1,199 @@
+"""
+A common interface for bots, and a scheduler that runs them with
+per-move time budgets.
+
+A bot is anything with a choose_move method (see Bot): given a game
+state and a deadline (a time.perf_counter() value, or None for no
+limit), it returns the move it wants to make, or None to retire,
+without changing the state. The caller decides what happens to the
+move, so the same bot can drive a live game, a GUI or a tournament.
+
+Scheduler runs the bots of a game one decision at a time. Each bot is
+handed a copy of the position (restored from Blokus.snapshot), so a
+bot can never corrupt the live game, and each decision's wall-clock
+time is recorded per player (see Latency). With enforce=True, a bot
+that answers after its deadline retires instead of moving, which
+caps the time a slow bot can cost its opponents.
+"""
+import math
+import time
+from typing import NamedTuple, Optional, Protocol, Sequence
+
+from base import BlokusBase
+from blokus import Blokus
+from move import Move
+
+
+class Bot(Protocol):
+    """
+    A player that chooses moves.
+    """
+
+    def choose_move(self, state: Blokus,
+                    deadline: Optional[float]) -> Optional[Move]:
+        """
+        Returns the move to make in the state (None to retire), if
+        possible before time.perf_counter() reaches deadline (None
+        for no limit). The state must be left as it was.
+        """
+
+
+def apply(game: BlokusBase, move: Optional[Move]) -> bool:
+    """
+    Makes a move for the current player (retires for None), and
+    returns whether it was legal (an illegal move is not made).
+    """
+    if move is None:
+        game.retire()
+        return True
+    if move.kind not in game.remaining_shapes(game.curr_player):
+        return False
+    return game.maybe_place(move.to_piece())
+
+
+class Decision(NamedTuple):
+    """
+    One move chosen by a bot.
+
+        player : the player the bot chose for
+        move : the move made (None for a retirement)
+        seconds : how long the bot took to choose
+        late : whether the bot answered after its deadline
+    """
+
+    player: int
+    move: Optional[Move]
+    seconds: float
+    late: bool
+
+
+class Latency:
+    """
+    The decision times of one bot.
+
+        samples : each decision's time, in seconds, in order
+        late : how many decisions came after their deadline
+    """
+
+    samples: list[float]
+    late: int
+
+    def __init__(self) -> None:
+        self.samples = []
+        self.late = 0
+
+    def add(self, decision: Decision) -> None:
+        """
+        Records a decision.
+        """
+        self.samples.append(decision.seconds)
+        self.late += decision.late
+
+    def percentile(self, q: float) -> float:
+        """
+        Returns the q-th percentile (0 to 100) of the decision times,
+        by the nearest-rank method (0.0 if there are none).
+        """
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        rank = max(1, math.ceil(q / 100 * len(ordered)))
+        return ordered[rank - 1]
+
+    def summary(self) -> dict[str, float]:
+        """
+        Returns the number of decisions, their mean, median, 95th and
+        99th percentile and longest time, and the number of late ones.
+        """
+        count = len(self.samples)
+        return {
+            "decisions": count,
+            "mean": sum(self.samples) / count if count else 0.0,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": max(self.samples, default=0.0),
+            "late": self.late,
+        }
+
+
+class Scheduler:
+    """
+    Runs the bots of a game, one decision at a time.
+
+        game : the live game
+        bots : the bot of each player (index 0 unused)
+        budget : time per decision, in seconds (None for no limit)
+        enforce : whether a late decision is replaced by retiring
+        isolate : whether bots get a copy of the position, rather
+            than the live game
+        decisions : every decision made so far
+        latency : each player's decision times
+    """
+
+    game: Blokus
+    bots: list[Optional[Bot]]
+    budget: Optional[float]
+    enforce: bool
+    isolate: bool
+    decisions: list[Decision]
+    latency: dict[int, Latency]
+
+    def __init__(self, game: Blokus, bots: Sequence[Bot],
+                 budget: Optional[float] = None, enforce: bool = False,
+                 isolate: bool = True) -> None:
+        """
+        Constructor (see the class attributes; bots has one bot per
+        player, in player order).
+
+        Raises ValueError if there is not one bot per player.
+        """
+        if len(bots) != game.num_players:
+            raise ValueError("Need one bot per player.")
+        self.game = game
+        self.bots = [None, *bots]
+        self.budget = budget
+        self.enforce = enforce
+        self.isolate = isolate
+        self.decisions = []
+        self.latency = {player: Latency()
+                        for player in range(1, game.num_players + 1)}
+
+    def step(self) -> Decision:
+        """
+        Has the current player's bot choose a move, and makes it.
+
+        Raises ValueError if the game is over, or if the bot chose an
+        illegal move.
+        """
+        game = self.game
+        if game.game_over:
+            raise ValueError("The game is over.")
+        player = game.curr_player
+        bot = self.bots[player]
+        assert bot is not None
+        state = type(game).from_snapshot(game.snapshot()) if self.isolate \
+            else game
+
+        start = time.perf_counter()
+        deadline = None if self.budget is None else start + self.budget
+        move = bot.choose_move(state, deadline)
+        end = time.perf_counter()
+
+        late = deadline is not None and end > deadline
+        if late and self.enforce:
+            move = None
+        if not apply(game, move):
+            raise ValueError(f"Illegal move by player {player}: {move}")
+        decision = Decision(player, move, end - start, late)
+        self.decisions.append(decision)
+        self.latency[player].add(decision)
+        return decision
+
+    def play(self) -> list[Decision]:
+        """
+        Plays until the game is over, and returns every decision made.
+        """
+        while not self.game.game_over:
+            self.step()
+        return self.decisions
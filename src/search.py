@@ -0,0 +1,452 @@
+"""
+Iterative-deepening game-tree search bot.
+
+SearchBot looks a fixed number of plies ahead and evaluates the
+positions it reaches with a heuristic: each player's score, plus
+MOBILITY points for each square of their corner frontier (the squares
+their later pieces can start from) while they are still playing. Two
+strategies extend two-player minimax to more players:
+
+  - paranoid: the bot's player maximizes their margin over the best
+    other player, and assumes every other player is out to minimize
+    it, so the tree can be searched with alpha-beta pruning;
+  - max-n: every player maximizes their own evaluation; there is no
+    pruning, but the opponents are modelled more realistically.
+
+The search deepens one ply at a time until its deadline, and always
+has a move ready: the best move found by the deepest search so far
+(before any is found, the first move in search order). Each search
+starts with the best move of the one before, so a search cut short
+still only replaces that move with a better one. The deadline is
+checked at every node, so a move takes at most about one node's work
+(one legal-move generation) longer than its time budget.
+
+Moves are searched in an order that makes pruning effective: the best
+move of an earlier search of the position (kept in a transposition
+table; see transposition.py) first, then the biggest pieces, and
+among pieces of the same size, those that open the most new corners.
+"""
+import math
+import random
+import time
+from enum import Enum
+from typing import NamedTuple, Optional, Union
+
+from piece import Point
+from move import Move, encode_move
+from blokus import Blokus
+from transposition import Bound, TranspositionTable
+from scheduler import apply
+
+MOBILITY = 0.5
+
+# Mixed into paranoid entries' keys: their values depend on whose
+# margin is being searched, not only on the position.
+_ROOT_SALT = 0x9E3779B97F4A7C15
+_MASK = (1 << 64) - 1
+
+
+class Strategy(Enum):
+    """
+    How the opponents are assumed to play (see the module docstring).
+    """
+    PARANOID = "paranoid"
+    MAX_N = "max-n"
+
+
+class SearchResult(NamedTuple):
+    """
+    The outcome of a search.
+
+        move : the chosen move (None to retire)
+        depth : the depth of the search that chose the move (0 if
+            the deadline passed before any move was searched)
+        value : the chosen move's value at that depth (the margin for
+            paranoid, each player's evaluation for max-n; None for
+            depth 0)
+        nodes : the number of positions visited
+        seconds : the time taken
+    """
+
+    move: Optional[Move]
+    depth: int
+    value: Optional[float | tuple[float, ...]]
+    nodes: int
+    seconds: float
+
+
+class _Timeout(Exception):
+    """
+    Raised inside a search when its deadline has passed.
+    """
+
+
+def evaluate(game: Blokus) -> tuple[float, ...]:
+    """
+    Returns each player's heuristic value in the position (index 0
+    unused; see the module docstring).
+    """
+    values = [0.0]
+    for player in range(1, game.num_players + 1):
+        value = float(game.get_score(player))
+        if not game.game_over and player not in game.retired_players:
+            value += MOBILITY * len(game.frontier(player))
+        values.append(value)
+    return tuple(values)
+
+
+def margin(values: tuple[float, ...], player: int) -> float:
+    """
+    Returns a player's value minus the best value of the other players
+    (just their value, in one-player games).
+    """
+    others = [value for other, value in enumerate(values)
+              if other not in (0, player)]
+    return values[player] - max(others) if others else values[player]
+
+
+def new_corners(game: Blokus, move: Move) -> int:
+    """
+    Returns how many squares a move would add to the current player's
+    corner frontier.
+    """
+    player = game.curr_player
+    size = game.size
+    grid = game.grid
+    frontier = game.frontier(player)
+    squares = set(move.squares())
+    seen: set[Point] = set()
+    count = 0
+    for r, c in squares:
+        for corner in ((r - 1, c - 1), (r - 1, c + 1),
+                       (r + 1, c - 1), (r + 1, c + 1)):
+            cr, cc = corner
+            if corner in squares or corner in seen or corner in frontier \
+                    or not (0 <= cr < size and 0 <= cc < size) \
+                    or grid[cr][cc] is not None:
+                continue
+            seen.add(corner)
+            for edge in ((cr - 1, cc), (cr, cc - 1), (cr, cc + 1),
+                         (cr + 1, cc)):
+                er, ec = edge
+                if edge in squares:
+                    break
+                cell = grid[er][ec] if 0 <= er < size and 0 <= ec < size \
+                    else None
+                if cell is not None and cell[0] == player:
+                    break
+            else:
+                count += 1
+    return count
+
+
+class _Search:
+    """
+    One search, from the position of a game, for the game's current
+    player.
+    """
+
+    game: Blokus
+    player: int
+    strategy: Strategy
+    table: TranspositionTable
+    rng: random.Random
+    deadline: Optional[float]
+    nodes: int
+    cutoff: bool
+
+    def __init__(self, game: Blokus, strategy: Strategy,
+                 table: TranspositionTable, rng: random.Random,
+                 deadline: Optional[float]) -> None:
+        self.game = game
+        self.player = game.curr_player
+        self.strategy = strategy
+        self.table = table
+        self.rng = rng
+        self.deadline = deadline
+        self.nodes = 0
+        # Whether the last iteration stopped at its depth limit
+        # anywhere (if not, searching deeper changes nothing).
+        self.cutoff = False
+
+    def key(self) -> int:
+        """
+        Returns the transposition table key of the position.
+        """
+        key = self.game.position_hash
+        if self.strategy is Strategy.PARANOID:
+            key ^= (_ROOT_SALT * self.player) & _MASK
+        return key
+
+    def visit(self) -> None:
+        """
+        Counts a node, and raises _Timeout if the deadline has passed.
+        """
+        self.nodes += 1
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            raise _Timeout
+
+    def moves(self, depth: int,
+              first: Optional[Move] = None) -> list[Optional[Move]]:
+        """
+        Returns the current player's moves (or [None], to retire, if
+        there are none) in search order (see the module docstring),
+        starting with first if it is legal. New corners are only
+        counted depth > 1 plies from the horizon, where ordering
+        saves more work than it costs.
+        """
+        game = self.game
+        moves = sorted(game.legal_moves(),
+                       key=lambda move: encode_move(move, game.size))
+        if not moves:
+            return [None]
+        self.rng.shuffle(moves)
+        if depth > 1:
+            moves.sort(key=lambda move: (len(move.orientation.squares),
+                                         new_corners(game, move)),
+                       reverse=True)
+        else:
+            moves.sort(key=lambda move: len(move.orientation.squares),
+                       reverse=True)
+        if first is not None and first in moves:
+            moves.remove(first)
+            moves.insert(0, first)
+        return list(moves)
+
+    def paranoid(self, depth: int, alpha: float,
+                 beta: float) -> tuple[float, Optional[Move]]:
+        """
+        Returns the paranoid value of the position searched depth
+        plies deep with alpha-beta pruning, and the best move found.
+        """
+        self.visit()
+        game = self.game
+        if game.game_over or depth == 0:
+            if not game.game_over:
+                self.cutoff = True
+            return margin(evaluate(game), self.player), None
+
+        key = self.key()
+        entry = self.table.probe(key)
+        first = None
+        if entry is not None:
+            first = entry.move
+            if entry.depth >= depth:
+                assert isinstance(entry.value, float)
+                if entry.bound is Bound.EXACT:
+                    return entry.value, entry.move
+                if entry.bound is Bound.LOWER:
+                    alpha = max(alpha, entry.value)
+                else:
+                    beta = min(beta, entry.value)
+                if alpha >= beta:
+                    return entry.value, entry.move
+
+        maximizing = game.curr_player == self.player
+        low, high = alpha, beta
+        best_value = -math.inf if maximizing else math.inf
+        best_move = None
+        for move in self.moves(depth, first):
+            game.push(move, trusted=True)
+            try:
+                value, _ = self.paranoid(depth - 1, alpha, beta)
+            finally:
+                game.pop()
+            if maximizing and value > best_value or \
+                    not maximizing and value < best_value:
+                best_value, best_move = value, move
+            if maximizing:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if alpha >= beta:
+                break
+
+        if best_value <= low:
+            bound = Bound.UPPER
+        elif best_value >= high:
+            bound = Bound.LOWER
+        else:
+            bound = Bound.EXACT
+        self.table.store(key, depth, best_value, bound, best_move)
+        return best_value, best_move
+
+    def max_n(self, depth: int) -> tuple[tuple[float, ...], Optional[Move]]:
+        """
+        Returns the max-n value of the position searched depth plies
+        deep, and the best move found.
+        """
+        self.visit()
+        game = self.game
+        if game.game_over or depth == 0:
+            if not game.game_over:
+                self.cutoff = True
+            return evaluate(game), None
+
+        key = self.key()
+        entry = self.table.probe(key)
+        first = None
+        if entry is not None:
+            first = entry.move
+            if entry.depth >= depth:
+                assert isinstance(entry.value, tuple)
+                return entry.value, entry.move
+
+        player = game.curr_player
+        best_value: Optional[tuple[float, ...]] = None
+        best_move = None
+        for move in self.moves(depth, first):
+            game.push(move, trusted=True)
+            try:
+                value, _ = self.max_n(depth - 1)
+            finally:
+                game.pop()
+            if best_value is None or value[player] > best_value[player]:
+                best_value, best_move = value, move
+
+        assert best_value is not None
+        self.table.store(key, depth, best_value, Bound.EXACT, best_move)
+        return best_value, best_move
+
+    def root(self, moves: list[Optional[Move]], depth: int,
+             best: list) -> None:
+        """
+        Searches each of the root moves depth plies deep, in order,
+        and keeps best up to date as [value, move] for the best move
+        searched so far, so that a search cut short by its deadline
+        still has the best move among those it completed (each move is
+        searched with pruning against the best before it, so a move
+        that beats it was searched exactly).
+        """
+        self.visit()
+        game = self.game
+        alpha = -math.inf
+        for move in moves:
+            game.push(move, trusted=True)
+            try:
+                value: Union[float, tuple[float, ...]]
+                if self.strategy is Strategy.PARANOID:
+                    score, _ = self.paranoid(depth - 1, alpha, math.inf)
+                    value = score
+                else:
+                    values, _ = self.max_n(depth - 1)
+                    value, score = values, values[self.player]
+            finally:
+                game.pop()
+            if not best or score > alpha:
+                alpha = score
+                best[:] = [value, move]
+
+
+def search(game: Blokus, deadline: Optional[float] = None,
+           max_depth: Optional[int] = None,
+           strategy: Optional[Strategy] = None,
+           table: Optional[TranspositionTable] = None,
+           rng: Optional[random.Random] = None) -> SearchResult:
+    """
+    Searches the game's position for its current player, one ply
+    deeper at a time, until time.perf_counter() passes deadline,
+    max_depth plies have been searched, or searching deeper would
+    change nothing. The game is left as it was.
+
+        strategy: PARANOID by default for two players, MAX_N otherwise
+        table: a table to reuse between searches (a fresh one by
+            default)
+        rng: breaks ties in move order (a fixed seed by default)
+
+    If the deadline cuts a search short after its first move (the
+    best move of the search before) has been searched, the best move
+    of the partial search is returned, with the depth it was being
+    searched to.
+
+    Raises ValueError if neither deadline nor max_depth is given.
+    """
+    if deadline is None and max_depth is None:
+        raise ValueError("Need a deadline or a maximum depth.")
+    start = time.perf_counter()
+    if strategy is None:
+        strategy = Strategy.PARANOID if game.num_players == 2 \
+            else Strategy.MAX_N
+    state = _Search(game, strategy,
+                    table if table is not None else TranspositionTable(),
+                    rng if rng is not None else random.Random(0), deadline)
+
+    moves = state.moves(2)
+    result = SearchResult(moves[0], 0, None, 0, 0.0)
+    depth = 0
+    while len(moves) > 1 and (max_depth is None or depth < max_depth):
+        depth += 1
+        state.cutoff = False
+        best: list = []
+        try:
+            state.root(moves, depth, best)
+        except _Timeout:
+            pass
+        if best:
+            value, move = best
+            result = SearchResult(move, depth, value, 0, 0.0)
+            moves.remove(move)
+            moves.insert(0, move)
+        if not best or not state.cutoff or \
+                deadline is not None and time.perf_counter() >= deadline:
+            break
+    return result._replace(nodes=state.nodes,
+                           seconds=time.perf_counter() - start)
+
+
+class SearchBot:
+    """
+    Bot that chooses moves by iterative-deepening search.
+
+        game : the game the bot plays in
+        rng : random number generator (breaks ties in move order)
+        seconds : time per move
+        max_depth : maximum search depth (None for no limit)
+        strategy : search strategy (None for search's default)
+        table : transposition table, kept between moves
+        last : the result of the bot's latest search
+    """
+
+    game: Blokus
+    rng: random.Random
+    seconds: float
+    max_depth: Optional[int]
+    strategy: Optional[Strategy]
+    table: TranspositionTable
+    last: Optional[SearchResult]
+
+    def __init__(self, game: Blokus, rng: Optional[random.Random] = None,
+                 seconds: float = 1.0, max_depth: Optional[int] = None,
+                 strategy: Optional[Strategy] = None,
+                 table_bytes: int = 16 << 20) -> None:
+        """
+        Constructor (see the class attributes).
+
+            table_bytes: memory cap of the transposition table
+        """
+        self.game = game
+        self.rng = rng if rng is not None else random.Random()
+        self.seconds = seconds
+        self.max_depth = max_depth
+        self.strategy = strategy
+        self.table = TranspositionTable(table_bytes)
+        self.last = None
+
+    def choose_move(self, state: Blokus,
+                    deadline: Optional[float] = None) -> Optional[Move]:
+        """
+        Returns the best move found for the state (None to retire)
+        within the bot's time budget, or by deadline if that comes
+        first (see scheduler.Bot).
+        """
+        own = time.perf_counter() + self.seconds
+        self.last = search(state, own if deadline is None
+                           else min(own, deadline), self.max_depth,
+                           self.strategy, self.table, self.rng)
+        return self.last.move
+
+    def move(self) -> None:
+        """
+        Makes the chosen move in the bot's game (or retires).
+        """
+        apply(self.game, self.choose_move(self.game))
@@ -0,0 +1,235 @@
+"""
+Per-game records of bot simulations, streamed to a file.
+
+Each finished game is appended to the file as one record and flushed
+straight away, so a crashed run loses nothing but the games still in
+progress, and memory use does not grow with the number of games.
+Files ending in .csv are written as CSV (with the list-valued columns
+encoded as JSON); any other file is written as JSON Lines.
+
+The summary command reads a record file back one record at a time and
+prints win rates and score statistics:
+
+    python src/simlog.py runs.jsonl
+"""
+import csv
+import json
+import math
+from typing import Any, Iterator, NamedTuple, Optional, TextIO
+
+import click
+
+
+class GameRecord(NamedTuple):
+    """
+    The outcome of one simulated game.
+
+        game_index : position of the game in its simulation
+        seed : the game's random seed
+        bots : the name of each player's bot
+        size : board size
+        start_positions : the start positions, as [row, col] lists
+        scores : each player's final score, in player order
+        winners : the winning players
+        moves : number of pieces placed
+        seconds : wall-clock time taken to play the game
+    """
+
+    game_index: int
+    seed: int
+    bots: list[str]
+    size: int
+    start_positions: list[list[int]]
+    scores: list[int]
+    winners: list[int]
+    moves: int
+    seconds: float
+
+
+FIELDS = list(GameRecord._fields)
+_LIST_FIELDS = {"bots", "start_positions", "scores", "winners"}
+
+
+def _is_csv(path: str) -> bool:
+    """
+    Returns whether a record file is CSV, rather than JSON Lines.
+    """
+    return path.lower().endswith(".csv")
+
+
+class RecordWriter:
+    """
+    Appends GameRecords to a JSON Lines or CSV file, flushing
+    after each one. Use as a context manager.
+    """
+
+    path: str
+    _file: TextIO
+    _csv: Optional[Any]
+
+    def __init__(self, path: str) -> None:
+        """
+        Opens (and truncates) the file at path.
+        """
+        self.path = path
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self._csv = None
+        if _is_csv(path):
+            self._csv = csv.writer(self._file)
+            self._csv.writerow(FIELDS)
+
+    def write(self, record: GameRecord) -> None:
+        """
+        Appends one record to the file.
+        """
+        if self._csv is not None:
+            self._csv.writerow(
+                [json.dumps(value) if field in _LIST_FIELDS else value
+                 for field, value in zip(FIELDS, record)])
+        else:
+            self._file.write(json.dumps(record._asdict()) + "\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        """
+        Closes the file.
+        """
+        self._file.close()
+
+    def __enter__(self) -> "RecordWriter":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+def read_records(path: str) -> Iterator[GameRecord]:
+    """
+    Yields the records of a JSON Lines or CSV record file, one at a
+    time. A partly written last line (from a crashed run) is skipped.
+    """
+    with open(path, newline="", encoding="utf-8") as file:
+        if _is_csv(path):
+            for row in csv.DictReader(file):
+                try:
+                    yield GameRecord(
+                        game_index=int(row["game_index"]),
+                        seed=int(row["seed"]),
+                        bots=json.loads(row["bots"]),
+                        size=int(row["size"]),
+                        start_positions=json.loads(row["start_positions"]),
+                        scores=json.loads(row["scores"]),
+                        winners=json.loads(row["winners"]),
+                        moves=int(row["moves"]),
+                        seconds=float(row["seconds"]))
+                except (TypeError, ValueError):
+                    continue
+        else:
+            for line in file:
+                try:
+                    yield GameRecord(**json.loads(line))
+                except (TypeError, ValueError):
+                    continue
+
+
+class _Stat:
+    """
+    Running count, mean and variance (Welford's method).
+    """
+
+    count: int
+    mean: float
+    _m2: float
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, x: float) -> None:
+        """
+        Adds one observation.
+        """
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (x - self.mean)
+
+    @property
+    def stdev(self) -> float:
+        """
+        Returns the sample standard deviation (0 for fewer than two
+        observations).
+        """
+        if self.count < 2:
+            return 0.0
+        return math.sqrt(self._m2 / (self.count - 1))
+
+
+def summarize(records: Iterator[GameRecord]) -> dict[str, Any]:
+    """
+    Computes summary statistics of a stream of records, in constant
+    memory: the number of games, each player's win and tie rates and
+    score mean and standard deviation, and the mean number of moves
+    and seconds per game.
+    """
+    games = 0
+    wins: dict[int, int] = {}
+    ties: dict[int, int] = {}
+    scores: dict[int, _Stat] = {}
+    moves = _Stat()
+    seconds = _Stat()
+    for record in records:
+        games += 1
+        for player, score in enumerate(record.scores, start=1):
+            scores.setdefault(player, _Stat()).add(score)
+            wins.setdefault(player, 0)
+            ties.setdefault(player, 0)
+        for player in record.winners:
+            if len(record.winners) == 1:
+                wins[player] += 1
+            else:
+                ties[player] += 1
+        moves.add(record.moves)
+        seconds.add(record.seconds)
+
+    players = {}
+    for player, stat in scores.items():
+        players[player] = {
+            "win_rate": wins[player] / games,
+            "tie_rate": ties[player] / games,
+            "mean_score": stat.mean,
+            "stdev_score": stat.stdev,
+        }
+    return {
+        "games": games,
+        "players": players,
+        "mean_moves": moves.mean,
+        "mean_seconds": seconds.mean,
+    }
+
+
+@click.command
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--json", "as_json", is_flag=True,
+              help="print the summary as JSON")
+def main_summary(path: str, as_json: bool) -> None:
+    """
+    Summarize a file of simulation records (JSON Lines or CSV).
+    """
+    summary = summarize(read_records(path))
+    if as_json:
+        print(json.dumps(summary, indent=2))
+        return
+    print(f"Games       | {summary['games']}")
+    for player, stats in summary["players"].items():
+        print(f"Player {player}    | wins {stats['win_rate'] * 100:.1f} %, "
+              f"ties {stats['tie_rate'] * 100:.1f} %, "
+              f"score {stats['mean_score']:.2f} "
+              f"(sd {stats['stdev_score']:.2f})")
+    print(f"Moves       | {summary['mean_moves']:.1f} per game")
+    print(f"Time        | {summary['mean_seconds']:.4f} s per game")
+
+
+if __name__ == "__main__":
+    main_summary()
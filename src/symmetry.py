@@ -0,0 +1,164 @@
+"""
+Symmetries of the Blokus board, and canonical position hashes.
+
+Rotating or mirroring a position (with one of the 8 symmetries of the
+square) gives a position that plays exactly the same way, as long as
+the symmetry maps the set of start positions onto itself: all four for
+the classic corners, four for duo's (4, 4) and (9, 9), and so on.
+
+canonicalize picks, among the images of a position under the
+applicable symmetries, the one with the smallest Zobrist hash (see
+zobrist.py). Positions that are images of one another then share a
+canonical hash, so caches keyed on it (transposition tables, opening
+books) need to store only one of them. It also returns the symmetry
+that takes the position to its canonical image, so that moves can be
+mapped to the canonical position with transform_move and back with
+the symmetry's inverse.
+"""
+from enum import Enum
+from functools import lru_cache
+from typing import Iterable, NamedTuple
+
+from piece import Point
+from base import BlokusBase
+from move import Move
+from orientations import find_orientation
+from zobrist import SHAPE_INDEX, zobrist_keys
+
+
+class Symmetry(Enum):
+    """
+    The symmetries of a square board.
+    """
+    IDENTITY = 0
+    ROTATE_90 = 1
+    ROTATE_180 = 2
+    ROTATE_270 = 3
+    FLIP_HORIZONTAL = 4
+    FLIP_VERTICAL = 5
+    TRANSPOSE = 6
+    ANTI_TRANSPOSE = 7
+
+    def point(self, point: Point, size: int) -> Point:
+        """
+        Returns the image of a square of a (size x size) board.
+        Rotations are clockwise; FLIP_HORIZONTAL mirrors columns
+        and FLIP_VERTICAL mirrors rows.
+        """
+        r, c = point
+        m = size - 1
+        if self is Symmetry.IDENTITY:
+            return (r, c)
+        if self is Symmetry.ROTATE_90:
+            return (c, m - r)
+        if self is Symmetry.ROTATE_180:
+            return (m - r, m - c)
+        if self is Symmetry.ROTATE_270:
+            return (m - c, r)
+        if self is Symmetry.FLIP_HORIZONTAL:
+            return (r, m - c)
+        if self is Symmetry.FLIP_VERTICAL:
+            return (m - r, c)
+        if self is Symmetry.TRANSPOSE:
+            return (c, r)
+        return (m - c, m - r)
+
+    @property
+    def inverse(self) -> "Symmetry":
+        """
+        Returns the symmetry that undoes this one.
+        """
+        if self is Symmetry.ROTATE_90:
+            return Symmetry.ROTATE_270
+        if self is Symmetry.ROTATE_270:
+            return Symmetry.ROTATE_90
+        return self
+
+
+class Canonical(NamedTuple):
+    """
+    The canonical form of a position.
+
+        hash : the Zobrist hash of the canonical image
+        symmetry : the symmetry taking the position to that image
+    """
+
+    hash: int
+    symmetry: Symmetry
+
+
+def symmetries(size: int, start_positions: Iterable[Point]) -> list[Symmetry]:
+    """
+    Returns the symmetries of a (size x size) board that map the set
+    of start positions onto itself (always including IDENTITY).
+    """
+    starts = set(start_positions)
+    return [symmetry for symmetry in Symmetry
+            if {symmetry.point(point, size) for point in starts} == starts]
+
+
+@lru_cache(maxsize=None)
+def _permutation(symmetry: Symmetry, size: int) -> tuple[int, ...]:
+    """
+    Returns the image of each square index (r * size + c) under the
+    symmetry, as a square index.
+    """
+    result = []
+    for r in range(size):
+        for c in range(size):
+            r2, c2 = symmetry.point((r, c), size)
+            result.append(r2 * size + c2)
+    return tuple(result)
+
+
+def transform_move(move: Move, symmetry: Symmetry, size: int) -> Move:
+    """
+    Returns the image of a move on a (size x size) board.
+    """
+    squares = [symmetry.point(point, size) for point in move.squares()]
+    orientation = find_orientation(move.kind, squares)
+    dr = min(r for r, _ in squares) - min(r for r, _ in orientation.squares)
+    dc = min(c for _, c in squares) - min(c for _, c in orientation.squares)
+    return Move(move.kind, orientation.orientation_id, (dr, dc))
+
+
+def canonicalize(game: BlokusBase) -> Canonical:
+    """
+    Returns the canonical hash of a position, and the symmetry that
+    takes the position to its canonical image (see the module
+    docstring). Ties between symmetries go to the one listed first
+    in Symmetry, so the identity is chosen whenever it is canonical.
+    """
+    size = game.size
+    keys = zobrist_keys(size)
+
+    # Everything but the occupied squares is unchanged by a symmetry.
+    base = keys.to_move[game.curr_player]
+    for player in range(1, game.num_players + 1):
+        remaining = game.remaining_shapes(player)
+        for kind, i in SHAPE_INDEX.items():
+            if kind not in remaining:
+                base ^= keys.shapes[player][i]
+    for player in game.retired_players:
+        base ^= keys.retired[player]
+
+    occupied = [(r * size + c, cell[0])
+                for r, row in enumerate(game.grid)
+                for c, cell in enumerate(row) if cell is not None]
+    best = None
+    for symmetry in symmetries(size, game.start_positions):
+        permutation = _permutation(symmetry, size)
+        h = base
+        for i, player in occupied:
+            h ^= keys.squares[player][permutation[i]]
+        if best is None or h < best.hash:
+            best = Canonical(h, symmetry)
+    assert best is not None
+    return best
+
+
+def canonical_hash(game: BlokusBase) -> int:
+    """
+    Returns the canonical hash of a position (see canonicalize).
+    """
+    return canonicalize(game).hash
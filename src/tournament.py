@@ -0,0 +1,350 @@
+"""
+Round-robin tournaments between the registered bots, with ratings.
+
+Every group of bots that fills a layout's seats (every pair for duo
+and classic-2, every three for classic-3, every four for classic-4)
+plays each round once in every seat rotation, so that no bot gains
+from always moving first. In one-player layouts (mono), every pair of
+bots plays the same seeded solo game side by side, and the higher
+score wins. Each game is recorded as a simlog.GameRecord (for mono,
+one record per pair), and streamed to a file if one is given, so that
+an interrupted overnight run keeps every finished game and can be
+rated later.
+
+Games are played on a pool of worker processes, each bot seeded from
+the tournament seed, so the results depend only on the arguments (up
+to the timing of bots with time budgets).
+
+Ratings are on the Elo scale (a 400-point gap means 10:1 odds). Each
+game counts as one result between every two of its bots, by score
+(1 for the higher, 0.5 each for a tie), and the ratings are the
+Bradley-Terry maximum-likelihood fit of those results, with one
+virtual draw between every two bots to keep unbeaten bots finite.
+Confidence intervals come from refitting on bootstrap resamples of
+the games:
+
+    python src/tournament.py -b random -b simple -b search -r 10 -w 8
+    python src/tournament.py --rate runs.jsonl
+"""
+import contextlib
+import itertools
+import math
+import multiprocessing
+import os
+import random
+import time
+from typing import Callable, Iterator, NamedTuple, Optional, Sequence
+
+import click
+
+from blokus import Blokus
+from bot import RandomBot, SimpleBot
+from layouts import LAYOUTS, Layout
+from mcts import MCTSBot
+from scheduler import Bot, Scheduler
+from search import SearchBot
+from simlog import GameRecord, RecordWriter, read_records
+
+# Builds a bot for a game, from its random generator and its time
+# budget per move (in seconds).
+BotFactory = Callable[[Blokus, random.Random, float], Bot]
+
+BOTS: dict[str, BotFactory] = {
+    "random": lambda game, rng, seconds: RandomBot(game, rng),
+    "simple": lambda game, rng, seconds: SimpleBot(game, rng),
+    "search": lambda game, rng, seconds: SearchBot(game, rng, seconds),
+    "mcts": lambda game, rng, seconds: MCTSBot(game, rng, None, seconds),
+}
+
+DEFAULT_LAYOUTS = tuple(LAYOUTS)
+
+ELO_BASE = 1500.0
+
+
+class Match(NamedTuple):
+    """
+    One game of a tournament.
+
+        game_index : position of the game in the tournament
+        layout : the name of the layout
+        bots : the bots' names, in seat order
+        seed : the game's random seed
+        seconds : each bot's time budget per move
+    """
+
+    game_index: int
+    layout: str
+    bots: tuple[str, ...]
+    seed: int
+    seconds: float
+
+
+class Rating(NamedTuple):
+    """
+    A bot's standing in a tournament.
+
+        bot : the bot's name
+        elo : its rating
+        low : the lower end of its confidence interval
+        high : the upper end of its confidence interval
+        games : the number of games it played
+        score : its share of the points of its pairwise results
+    """
+
+    bot: str
+    elo: float
+    low: float
+    high: float
+    games: int
+    score: float
+
+
+def schedule(bots: Sequence[str], layouts: Sequence[str], rounds: int,
+             seed: int = 0, seconds: float = 0.1) -> list[Match]:
+    """
+    Returns the games of a tournament (see the module docstring).
+    Layouts with more seats than there are bots are left out.
+    """
+    matches: list[Match] = []
+    for _ in range(rounds):
+        for name in layouts:
+            seats = max(2, LAYOUTS[name].num_players)
+            for group in itertools.combinations(bots, seats):
+                rotations = seats if LAYOUTS[name].num_players > 1 else 1
+                for r in range(rotations):
+                    index = len(matches)
+                    game_seed = random.Random(
+                        f"blokus-tournament-{seed}-{index}").getrandbits(64)
+                    matches.append(Match(index, name,
+                                         group[r:] + group[:r],
+                                         game_seed, seconds))
+    return matches
+
+
+def _play(layout: Layout, bots: Sequence[str], seed: int,
+          seconds: float) -> Blokus:
+    """
+    Plays a game of the layout between the named bots, in seat order,
+    each seeded from the game's seed, and returns the finished game.
+    """
+    game = Blokus(layout.num_players, layout.size,
+                  set(layout.start_positions))
+    players = [BOTS[name](game, random.Random(f"{seed}-{seat}"), seconds)
+               for seat, name in enumerate(bots)]
+    Scheduler(game, players, isolate=False).play()
+    for player in players:
+        if isinstance(player, MCTSBot):
+            player.close()
+    return game
+
+
+def play_match(match: Match) -> GameRecord:
+    """
+    Plays one game of a tournament, and returns its record.
+    """
+    start = time.perf_counter()
+    layout = LAYOUTS[match.layout]
+    if layout.num_players == 1:
+        games = [_play(layout, [name], match.seed, match.seconds)
+                 for name in match.bots]
+        scores = [game.get_score(1) for game in games]
+        moves = sum(len(game.history) for game in games)
+    else:
+        game = _play(layout, match.bots, match.seed, match.seconds)
+        players = range(1, layout.num_players + 1)
+        scores = [game.get_score(player) for player in players]
+        moves = len(game.history)
+    best = max(scores)
+    return GameRecord(
+        game_index=match.game_index,
+        seed=match.seed,
+        bots=list(match.bots),
+        size=layout.size,
+        start_positions=[list(point)
+                         for point in sorted(layout.start_positions)],
+        scores=scores,
+        winners=[seat for seat, score in enumerate(scores, start=1)
+                 if score == best],
+        moves=moves,
+        seconds=time.perf_counter() - start)
+
+
+def run(matches: Sequence[Match], workers: Optional[int] = None,
+        output: Optional[str] = None) -> Iterator[GameRecord]:
+    """
+    Plays the games on a pool of worker processes (one per CPU by
+    default; workers=1 plays them in this process), and yields their
+    records in game order, writing each to output, if given, as soon
+    as it is yielded.
+    """
+    with contextlib.ExitStack() as stack:
+        writer = None
+        if output is not None:
+            writer = stack.enter_context(RecordWriter(output))
+        if workers == 1:
+            records: Iterator[GameRecord] = map(play_match, matches)
+        else:
+            workers = workers or os.cpu_count() or 1
+            pool = stack.enter_context(multiprocessing.Pool(workers))
+            records = pool.imap(play_match, matches)
+        for record in records:
+            if writer is not None:
+                writer.write(record)
+            yield record
+
+
+# A pairwise result: the two bots, and the first one's points (1 for a
+# win, 0.5 for a tie, 0 for a loss).
+_Result = tuple[str, str, float]
+
+
+def pairwise(record: GameRecord) -> list[_Result]:
+    """
+    Returns the result between every two bots of a game, by score.
+    """
+    results = []
+    for (a, score_a), (b, score_b) in itertools.combinations(
+            zip(record.bots, record.scores), 2):
+        if a != b:
+            points = 1.0 if score_a > score_b else \
+                0.5 if score_a == score_b else 0.0
+            results.append((a, b, points))
+    return results
+
+
+def fit(bots: Sequence[str], results: Sequence[_Result],
+        iterations: int = 200) -> dict[str, float]:
+    """
+    Returns the Elo-scale Bradley-Terry ratings of the bots from
+    pairwise results (see the module docstring), with mean ELO_BASE.
+    """
+    points = dict.fromkeys(bots, 0.0)
+    played = {bot: dict.fromkeys(bots, 0.0) for bot in bots}
+    for a, b, result in results:
+        points[a] += result
+        points[b] += 1.0 - result
+        played[a][b] += 1
+        played[b][a] += 1
+    # One virtual draw between every two bots.
+    for a, b in itertools.combinations(bots, 2):
+        points[a] += 0.5
+        points[b] += 0.5
+        played[a][b] += 1
+        played[b][a] += 1
+
+    strength = dict.fromkeys(bots, 1.0)
+    for _ in range(iterations):
+        for bot in bots:
+            denominator = sum(n / (strength[bot] + strength[other])
+                              for other, n in played[bot].items() if n)
+            if denominator:
+                strength[bot] = points[bot] / denominator
+        mean = sum(math.log(s) for s in strength.values()) / len(bots)
+        strength = {bot: s / math.exp(mean) for bot, s in strength.items()}
+    return {bot: ELO_BASE + 400 * math.log10(s)
+            for bot, s in strength.items()}
+
+
+def ratings(records: Sequence[GameRecord], bootstrap: int = 200,
+            confidence: float = 0.95, seed: int = 0) -> list[Rating]:
+    """
+    Returns the bots' ratings, best first, with confidence intervals
+    from bootstrap resamples of the games.
+    """
+    bots = sorted({bot for record in records for bot in record.bots})
+    if not bots:
+        return []
+    games = [pairwise(record) for record in records]
+    elo = fit(bots, [result for game in games for result in game])
+
+    rng = random.Random(f"blokus-ratings-{seed}")
+    samples: dict[str, list[float]] = {bot: [] for bot in bots}
+    for _ in range(bootstrap):
+        resample = [result for game in rng.choices(games, k=len(games))
+                    for result in game]
+        for bot, value in fit(bots, resample).items():
+            samples[bot].append(value)
+
+    played = {bot: 0 for bot in bots}
+    points = {bot: [0.0, 0] for bot in bots}
+    for record, game in zip(records, games):
+        for bot in set(record.bots):
+            played[bot] += 1
+        for a, b, result in game:
+            points[a][0] += result
+            points[a][1] += 1
+            points[b][0] += 1.0 - result
+            points[b][1] += 1
+
+    table = []
+    tail = (1 - confidence) / 2
+    for bot in bots:
+        values = sorted(samples[bot])
+        if values:
+            low = values[int(tail * (len(values) - 1))]
+            high = values[math.ceil((1 - tail) * (len(values) - 1))]
+        else:
+            low = high = elo[bot]
+        total, count = points[bot]
+        table.append(Rating(bot, elo[bot], low, high, played[bot],
+                            total / count if count else 0.0))
+    table.sort(key=lambda rating: -rating.elo)
+    return table
+
+
+def print_ratings(table: Sequence[Rating], confidence: float = 0.95) -> None:
+    """
+    Prints a ratings table, whose intervals are at the given
+    confidence level (as passed to ratings).
+    """
+    interval = f"{confidence * 100:g}% interval"
+    print(f"{'#':>2} {'bot':<10} {'elo':>6} {interval:>15} "
+          f"{'games':>6} {'score':>6}")
+    for rank, rating in enumerate(table, start=1):
+        print(f"{rank:>2} {rating.bot:<10} {rating.elo:>6.0f} "
+              f"{rating.low:>7.0f}-{rating.high:<7.0f} {rating.games:>6} "
+              f"{rating.score:>6.1%}")
+
+
+@click.command
+@click.option("-b", "--bot", "bots", multiple=True,
+              type=click.Choice(list(BOTS)),
+              help="bot to enter (repeatable; default: all)")
+@click.option("-l", "--layout", "layouts", multiple=True,
+              type=click.Choice(list(LAYOUTS)),
+              help="layout to play (repeatable; default: all)")
+@click.option("-r", "--rounds", default=1, help="rounds")
+@click.option("-t", "--seconds", default=0.1,
+              help="time per move of the searching bots")
+@click.option("-s", "--seed", default=0, help="random seed")
+@click.option("-w", "--workers", type=int, default=None,
+              help="worker processes (default: one per CPU)")
+@click.option("-o", "--output", default=None,
+              help="record file (.jsonl or .csv)")
+@click.option("--bootstrap", default=200,
+              help="bootstrap resamples for the intervals")
+@click.option("--rate", "rate_path", default=None,
+              type=click.Path(exists=True, dir_okay=False),
+              help="rate the games of a record file instead of playing")
+def main_tournament(bots: tuple[str, ...], layouts: tuple[str, ...],
+                    rounds: int, seconds: float, seed: int,
+                    workers: Optional[int], output: Optional[str],
+                    bootstrap: int, rate_path: Optional[str]) -> None:
+    """
+    Play a round-robin tournament between bots, and rate them.
+    """
+    if rate_path is not None:
+        records = list(read_records(rate_path))
+    else:
+        matches = schedule(bots or list(BOTS), layouts or DEFAULT_LAYOUTS,
+                           rounds, seed, seconds)
+        records = []
+        for record in run(matches, workers, output):
+            records.append(record)
+            print(f"{len(records)}/{len(matches)} "
+                  f"{' '.join(record.bots)}: {record.scores}", flush=True)
+    print_ratings(ratings(records, bootstrap, seed=seed))
+
+
+if __name__ == "__main__":
+    main_tournament()
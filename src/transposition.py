@@ -0,0 +1,170 @@
+"""
+Transposition table for bot search.
+
+Search bots store what they learn about a position (how deep it was
+searched, its value, whether that value is exact or only a bound, and
+the best move found) under the position's Zobrist hash (see
+zobrist.py), and look it up again when the same position is reached
+by a different move order, or in a later search.
+
+The table has a fixed number of buckets, chosen from a memory cap.
+Each bucket has two slots:
+
+  - a depth-preferred slot, which keeps the most deeply searched entry
+    (the most expensive one to recompute), and
+  - an always-replace slot, which keeps the most recent entry that did
+    not qualify for the depth-preferred slot.
+
+An entry pushed out of the depth-preferred slot moves to the
+always-replace slot, so a bucket only forgets the older of two shallow
+entries.
+"""
+from enum import Enum
+from typing import NamedTuple, Optional, Union
+
+from move import Move
+
+# A score for the player to move, or one score per player (max-n).
+Value = Union[float, tuple[float, ...]]
+
+# Rough size of one stored entry (the tuple, its fields and the
+# bucket reference), used to turn a memory cap into a bucket count.
+ENTRY_BYTES = 160
+
+
+class Bound(Enum):
+    """
+    How a stored value relates to the true value of the position.
+    """
+    EXACT = "exact"
+    LOWER = "lower"
+    UPPER = "upper"
+
+
+class Entry(NamedTuple):
+    """
+    What a search learned about one position.
+
+        key : the position's Zobrist hash
+        depth : how many moves deep the position was searched
+        value : the value found
+        bound : whether value is exact, or a lower or upper bound
+        move : the best move found (None if the search did not get
+            as far as choosing one, or the best move was to retire)
+    """
+    key: int
+    depth: int
+    value: Value
+    bound: Bound
+    move: Optional[Move]
+
+
+class TranspositionTable:
+    """
+    A bounded table of search results keyed by position hash,
+    with hit, miss and eviction statistics.
+    """
+
+    _deep: list[Optional[Entry]]
+    _recent: list[Optional[Entry]]
+    hits: int
+    misses: int
+    stores: int
+    evictions: int
+
+    def __init__(self, max_bytes: int = 64 << 20) -> None:
+        """
+        Constructor
+
+            max_bytes: approximate upper limit on the memory used
+                by stored entries
+
+        Raises ValueError if max_bytes is not positive.
+        """
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+        num_buckets = max(1, max_bytes // (2 * ENTRY_BYTES))
+        self._deep = [None] * num_buckets
+        self._recent = [None] * num_buckets
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    @property
+    def capacity(self) -> int:
+        """
+        Returns the maximum number of entries the table can hold.
+        """
+        return 2 * len(self._deep)
+
+    def __len__(self) -> int:
+        """
+        Returns the number of entries currently stored.
+        """
+        return sum(entry is not None for entry in self._deep) + \
+            sum(entry is not None for entry in self._recent)
+
+    def probe(self, key: int) -> Optional[Entry]:
+        """
+        Returns the entry stored for the given position hash, or None.
+        """
+        i = key % len(self._deep)
+        entry = self._deep[i]
+        if entry is None or entry.key != key:
+            entry = self._recent[i]
+            if entry is None or entry.key != key:
+                self.misses += 1
+                return None
+        self.hits += 1
+        return entry
+
+    def store(self, key: int, depth: int, value: Value, bound: Bound,
+              move: Optional[Move]) -> None:
+        """
+        Stores a search result for the given position hash, replacing
+        any earlier result for the same position.
+        """
+        self.stores += 1
+        i = key % len(self._deep)
+        entry = Entry(key, depth, value, bound, move)
+        deep = self._deep[i]
+        recent = self._recent[i]
+
+        if deep is None or deep.key == key or depth >= deep.depth:
+            self._deep[i] = entry
+            if recent is not None and recent.key == key:
+                self._recent[i] = None
+                recent = None
+            if deep is not None and deep.key != key:
+                # The displaced entry takes the always-replace slot.
+                if recent is not None:
+                    self.evictions += 1
+                self._recent[i] = deep
+        else:
+            if recent is not None and recent.key != key:
+                self.evictions += 1
+            self._recent[i] = entry
+
+    def clear(self) -> None:
+        """
+        Removes every entry (but keeps the statistics).
+        """
+        self._deep = [None] * len(self._deep)
+        self._recent = [None] * len(self._recent)
+
+    def stats(self) -> dict[str, float]:
+        """
+        Returns the hit, miss, store and eviction counts, the hit
+        rate and how full the table is.
+        """
+        probes = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / probes if probes else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "entries": len(self),
+            "capacity": self.capacity,
+        }
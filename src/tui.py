@@ -2,8 +2,9 @@ import sys
 import curses
 import random
 from base import BlokusBase, Grid
-from fakes import BlokusFake, BlokusStub
+from layouts import LAYOUTS
 from piece import Piece
+from preview import PendingPreview, new_game
 from shape_definitions import ShapeKind
 
 
@@ -22,6 +23,7 @@ class TUI:
         curses.init_pair(2, curses.COLOR_BLUE, curses.COLOR_BLACK)
         curses.init_pair(3, curses.COLOR_RED, curses.COLOR_BLACK)
         curses.init_pair(4, curses.COLOR_MAGENTA, curses.COLOR_BLACK)
+        curses.init_pair(5, curses.COLOR_YELLOW, curses.COLOR_BLACK)
         self.setup_game()
 
     def select_pending_piece(self) -> None:
@@ -32,7 +34,8 @@ class TUI:
             None
             
         """
-        shapes_left: list[ShapeKind] = list(self.game.shapes.keys())
+        shapes_left: list[ShapeKind] = \
+            self.game.remaining_shapes(self.game.curr_player)
         some_shape: ShapeKind = random.choice(shapes_left)
         self.pending_piece: Piece = Piece(self.game.shapes[some_shape])
         self.pending_piece.set_anchor((self.game.size // 2, self.game.size // 2))
@@ -50,16 +53,16 @@ class TUI:
         if arg.isdigit():
             size: int = int(arg)
             assert 5 <= size <= 20
-            self.game: BlokusFake = BlokusFake(2, size, {(0, 0), (size - 1, size - 1)})
-        elif arg == 'mono':
-            self.game: BlokusFake = BlokusFake(2, 11, {(5, 5)})
-        elif arg == 'duo':
-            self.game: BlokusFake = BlokusFake(2, 14, {(4, 4), (9, 9)})
+            self.game: BlokusBase = new_game(2, size, {(0, 0), (size - 1, size - 1)})
+        elif arg in ('mono', 'duo'):
+            num_players, size, starts = LAYOUTS[arg]
+            self.game: BlokusBase = new_game(num_players, size, set(starts))
         else:
             self.stdscr.addstr('Please input a valid argument\n', curses.color_pair(1))
             self.stdscr.refresh()
             self.stdscr.getch()
             sys.exit(1)
+        self.preview = PendingPreview(self.game)
         self.select_pending_piece()
 
     def draw_board(self):
@@ -67,6 +70,10 @@ class TUI:
         """
         self.stdscr.clear()
         nrows, ncols = self.game.size, self.game.size
+        if self.preview.legal(self.pending_piece):
+            pending_color = curses.color_pair(self.game.curr_player + 1)
+        else:
+            pending_color = curses.color_pair(5)
         for r in range(nrows):
             for c in range(ncols):
                 cell: tuple[int, ShapeKind] = self.game.grid[r][c]
@@ -77,7 +84,7 @@ class TUI:
                         color = curses.color_pair(4)
                         char = '▋'
                     if self.pending_piece and (r, c) in self.pending_piece.squares():
-                        color = curses.color_pair(self.game.curr_player + 1)
+                        color = pending_color
                         char: str = '▋'
                 if cell is not None:
                     player, _ = cell
@@ -0,0 +1,91 @@
+"""
+Zobrist hashing of Blokus positions.
+
+A position's hash is the XOR of one random 64-bit key for each
+  - occupied square, keyed by the player occupying it;
+  - shape each player has played;
+  - retired player; and
+  - the player to move.
+
+Playing a piece, retiring or passing the turn changes only a few of
+these terms, so an engine can keep the hash up to date with a handful
+of XORs per move instead of rehashing the whole grid (see
+Blokus.position_hash).
+
+The keys for each board size are generated from a fixed seed, so the
+same position has the same hash in every process and on every run,
+and hashes can be stored in files and shared between workers.
+"""
+import random
+from functools import lru_cache
+
+from shape_definitions import ShapeKind
+from base import BlokusBase
+
+MAX_PLAYERS = 4
+
+SHAPE_INDEX: dict[ShapeKind, int] = {
+    kind: i for i, kind in enumerate(ShapeKind)
+}
+
+
+class ZobristKeys:
+    """
+    The Zobrist keys for one board size. Every table is indexed by
+    player number first (index 0 is unused):
+
+        squares[player][r * size + c] : player occupies square (r, c)
+        shapes[player][SHAPE_INDEX[kind]] : player has played kind
+        retired[player] : player has retired
+        to_move[player] : it is player's turn
+    """
+
+    size: int
+    squares: list[list[int]]
+    shapes: list[list[int]]
+    retired: list[int]
+    to_move: list[int]
+
+    def __init__(self, size: int) -> None:
+        """
+        Generates the keys for a (size x size) board.
+        """
+        rng = random.Random(f"blokus-zobrist-{size}")
+        players = range(MAX_PLAYERS + 1)
+        self.size = size
+        self.squares = [[rng.getrandbits(64) for _ in range(size * size)]
+                        for _ in players]
+        self.shapes = [[rng.getrandbits(64) for _ in SHAPE_INDEX]
+                       for _ in players]
+        self.retired = [rng.getrandbits(64) for _ in players]
+        self.to_move = [rng.getrandbits(64) for _ in players]
+
+
+@lru_cache(maxsize=None)
+def zobrist_keys(size: int) -> ZobristKeys:
+    """
+    Returns the (shared) Zobrist keys for a (size x size) board.
+    """
+    return ZobristKeys(size)
+
+
+def compute_hash(game: BlokusBase) -> int:
+    """
+    Computes the Zobrist hash of a game from scratch, using only the
+    BlokusBase interface. Engines that maintain the hash incrementally
+    must agree with this function.
+    """
+    keys = zobrist_keys(game.size)
+    h = keys.to_move[game.curr_player]
+    for r, row in enumerate(game.grid):
+        for c, cell in enumerate(row):
+            if cell is not None:
+                h ^= keys.squares[cell[0]][r * game.size + c]
+    for player in range(1, game.num_players + 1):
+        remaining = game.remaining_shapes(player)
+        for kind, i in SHAPE_INDEX.items():
+            if kind not in remaining:
+                h ^= keys.shapes[player][i]
+    for player in game.retired_players:
+        h ^= keys.retired[player]
+    return h
@@ -0,0 +1,55 @@
+import random
+from typing import Callable, Iterator, Optional
+
+import pytest
+
+import test_blokus
+from base import BlokusBase
+from blokus import Blokus
+from move import Move
+
+BLOKUS_TESTS = [
+    getattr(test_blokus, name) for name in dir(test_blokus)
+    if name.startswith("test_")
+]
+
+
+def blokus_suite(engine: Optional[type[BlokusBase]] = None,
+                 env: Optional[dict[str, str]] = None) -> Callable:
+    """
+    Returns a test that runs every test in test_blokus.py against an
+    engine in place of Blokus, and/or with environment variables set.
+    Assign it to a test_ name in a test module to collect it.
+    """
+    @pytest.mark.parametrize("test", BLOKUS_TESTS,
+                             ids=lambda t: t.__name__)
+    def test_blokus_suite(test, monkeypatch) -> None:
+        if engine is not None:
+            monkeypatch.setattr(test_blokus, "Blokus", engine)
+        for name, value in (env or {}).items():
+            monkeypatch.setenv(name, value)
+        test()
+
+    if engine is not None:
+        test_blokus_suite.__doc__ = (
+            f"Run every test in test_blokus.py against {engine.__name__} "
+            "in place of Blokus.")
+    else:
+        test_blokus_suite.__doc__ = (
+            f"Run every test in test_blokus.py with {', '.join(env or {})} "
+            "set.")
+    return test_blokus_suite
+
+
+def random_moves(blokus: Blokus, seed: int) -> Iterator[Optional[Move]]:
+    """
+    Plays a seeded random game on blokus to its end: yields each
+    uniformly random legal move (None to retire) before making it, so
+    the caller sees the position the move is made in.
+    """
+    rng = random.Random(seed)
+    while not blokus.game_over:
+        legal = sorted(blokus.legal_moves(), key=repr)
+        move = rng.choice(legal) if legal else None
+        yield move
+        assert blokus.push(move)
@@ -0,0 +1,117 @@
+import multiprocessing
+import pickle
+
+import pytest
+
+from test_replay import random_game
+from archive import ArchiveReader, ArchiveWriter, index_path
+from replay import loads, record
+
+
+def moves_in(job: tuple[ArchiveReader, int]) -> int:
+    """
+    Returns the number of moves in a record of an archive.
+    """
+    archive, i = job
+    return len(loads(archive[i])[1])
+
+
+@pytest.fixture
+def games():
+    return [random_game(seed)[0] for seed in range(3)]
+
+
+def test_append_and_read(tmp_path, games) -> None:
+    """
+    Records read back as appended, singly, as spans and by iterating,
+    including after reopening the archive to append more.
+    """
+    path = str(tmp_path / "games.blk")
+    data = [record(game) for game in games]
+    with ArchiveWriter(path) as writer:
+        assert writer.append_game(games[0]) == 0
+        assert writer.append(data[1]) == 1
+    with ArchiveWriter(path) as writer:
+        assert len(writer) == 2
+        assert writer.append(data[2]) == 2
+
+    with ArchiveReader(path) as archive:
+        assert len(archive) == 3
+        assert [bytes(view) for view in archive] == data
+        assert bytes(archive[-1]) == data[2]
+        assert bytes(archive.span(1, 3)) == data[1] + data[2]
+        assert [bytes(view) for view in archive.records(1)] == data[1:]
+        replayer = archive.replayer(1)
+        assert replayer.seek(len(replayer)).position_hash == \
+            games[1].position_hash
+        with pytest.raises(IndexError):
+            archive[3]
+
+
+def test_crash_recovery(tmp_path, games) -> None:
+    """
+    Bytes written without an index entry, and a partial index entry,
+    are ignored by readers and dropped by the next writer.
+    """
+    path = str(tmp_path / "games.blk")
+    with ArchiveWriter(path) as writer:
+        writer.append_game(games[0])
+    with open(path, "ab") as file:
+        file.write(record(games[1])[:10])
+    with open(index_path(path), "ab") as file:
+        file.write(b"\x01\x02")
+
+    with ArchiveReader(path) as archive:
+        assert len(archive) == 1
+    with ArchiveWriter(path) as writer:
+        writer.append_game(games[2])
+    with ArchiveReader(path) as archive:
+        assert [bytes(view) for view in archive] == \
+            [record(games[0]), record(games[2])]
+
+
+def test_views_outlive_reader(tmp_path, games) -> None:
+    """
+    Closing a reader while views from it are alive leaves them
+    readable.
+    """
+    path = str(tmp_path / "games.blk")
+    with ArchiveWriter(path) as writer:
+        writer.append_game(games[0])
+    with ArchiveReader(path) as archive:
+        for view in archive:
+            pass
+    assert bytes(view) == record(games[0])
+
+
+def test_truncated_data(tmp_path, games) -> None:
+    """
+    A data file shorter than its index is an error for writers, rather
+    than being padded out.
+    """
+    path = str(tmp_path / "games.blk")
+    with ArchiveWriter(path) as writer:
+        writer.append_game(games[0])
+        writer.append_game(games[1])
+    with open(path, "r+b") as file:
+        file.truncate(len(record(games[0])) + 5)
+    with pytest.raises(ValueError):
+        ArchiveWriter(path)
+    with ArchiveReader(path) as archive:
+        assert len(archive) == 1
+
+
+def test_shared_by_pool(tmp_path, games) -> None:
+    """
+    Readers pickle as their path, so pool workers map the archive
+    themselves.
+    """
+    path = str(tmp_path / "games.blk")
+    with ArchiveWriter(path) as writer:
+        for game in games:
+            writer.append_game(game)
+    archive = ArchiveReader(path)
+    assert len(pickle.dumps(archive)) < 200
+    with multiprocessing.Pool(2) as pool:
+        counts = pool.map(moves_in, [(archive, i) for i in range(3)])
+    assert counts == [len(game.history) for game in games]
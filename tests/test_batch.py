@@ -0,0 +1,89 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from shape_definitions import ShapeKind
+from blokus import Blokus
+from move import Move, encode_move
+from batch import (BlokusBatch, RETIRE, placements, random_actions,
+                   play_random_games)
+
+
+def test_placements() -> None:
+    """
+    The placement table lists every on-board placement once,
+    with its squares and neighbors.
+    """
+    table = placements(5)
+    assert placements(5) is table
+    assert len(set(table.codes.tolist())) == len(table)
+
+    i = table.moves.index(Move(ShapeKind.ONE, 0, (0, 0)))
+    assert table.num_squares[i] == 1
+    assert table.squares[i].tolist() == [0, 25, 25, 25, 25]
+    assert sorted(table.edges[i][table.edges[i] < 25].tolist()) == [1, 5]
+    assert table.corners[i][table.corners[i] < 25].tolist() == [6]
+
+
+def test_matches_blokus() -> None:
+    """
+    Through a batch of seeded random games, the legal masks, scores,
+    players to move and game-over flags agree with Blokus.
+    """
+    starts = {(0, 0), (0, 10), (10, 0), (10, 10)}
+    batch = BlokusBatch(6, 4, 11, starts)
+    games = [Blokus(4, 11, starts) for _ in range(6)]
+    table = batch.placements
+    rng = np.random.default_rng(11)
+    while not batch.done.all():
+        legal = batch.legal_mask()
+        for i, game in enumerate(games):
+            assert bool(batch.done[i]) == game.game_over
+            assert batch.scores[i, 1:].tolist() == \
+                [game.get_score(p) for p in range(1, 5)]
+            if game.game_over:
+                continue
+            assert batch.curr_player[i] == game.curr_player
+            codes = {encode_move(move, 11) for move in game.legal_moves()}
+            assert set(table.codes[legal[i]].tolist()) == codes
+        actions = random_actions(batch, rng)
+        for i, game in enumerate(games):
+            if not game.game_over:
+                assert legal[i, actions[i]] if legal[i].any() \
+                    else actions[i] == RETIRE
+                assert game.push(batch.move(int(actions[i])))
+        batch.step(actions)
+
+    for i, game in enumerate(games):
+        assert batch.scores[i, 1:].tolist() == \
+            [game.get_score(p) for p in range(1, 5)]
+        assert set(np.nonzero(batch.winners()[i])[0].tolist()) == \
+            set(game.winners)
+
+
+def test_retire_and_finish() -> None:
+    """
+    Retiring ends a one-player game, and actions for finished games
+    are ignored.
+    """
+    batch = BlokusBatch(2, 1, 5, {(2, 2)})
+    x = placements(5).moves.index(Move(ShapeKind.X, 0, (2, 2)))
+    batch.step(np.array([RETIRE, x]))
+    assert batch.done.tolist() == [True, False]
+    assert batch.scores[:, 1].tolist() == [-89, -84]
+    assert not batch.legal_mask()[0].any()
+
+    batch.step(np.array([x, RETIRE]))
+    assert batch.done.all()
+    assert batch.scores[:, 1].tolist() == [-89, -84]
+    assert batch.winners()[:, 1].all()
+
+
+def test_play_random_games() -> None:
+    """
+    Every game of a batch of random games ends, with scores in range.
+    """
+    batch = BlokusBatch(8, 2, 14, {(4, 4), (9, 9)})
+    scores = play_random_games(batch, np.random.default_rng(0))
+    assert batch.done.all()
+    assert ((scores[:, 1:] >= -89) & (scores[:, 1:] <= 20)).all()
@@ -0,0 +1,91 @@
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from blokus import Blokus
+from bitboard import BlokusBitboard
+from engines import SETUPS, game_moves
+from benchmark import (OPERATIONS, PHASES, Comparison, compare, load,
+                       main_benchmark, position, regressions, run_benchmarks,
+                       save)
+
+
+def test_positions() -> None:
+    """
+    Positions come from one seeded game, and are the same on every
+    engine.
+    """
+    layout = SETUPS["duo"]
+    moves = game_moves(layout, seed=5)
+    assert moves == game_moves(layout, seed=5)
+    for phase in PHASES.values():
+        game = position(Blokus, layout, moves, phase)
+        other = position(BlokusBitboard, layout, moves, phase)
+        assert game.grid == other.grid
+        assert game.available_moves() and not game.game_over
+
+
+def test_run_benchmarks() -> None:
+    """
+    Every operation gets a positive time in every phase.
+    """
+    results = run_benchmarks(["mini-2"], list(PHASES), list(OPERATIONS),
+                             repeat=1, min_time=0.001)
+    assert list(results) == [f"mini-2/{phase}/{operation}"
+                             for phase in PHASES for operation in OPERATIONS]
+    assert all(seconds > 0 for seconds in results.values())
+
+
+def test_compare(tmp_path) -> None:
+    """
+    Baselines round-trip through JSON, and only slowdowns beyond the
+    threshold are regressions.
+    """
+    path = str(tmp_path / "baseline.json")
+    save(path, {"a": 1.0, "b": 2.0}, "bitboard")
+    baseline = load(path)
+    assert baseline.engine == "bitboard"
+    comparisons = compare(baseline.results, {"a": 1.05, "b": 3.0, "c": 1.0})
+    assert comparisons == [Comparison("a", 1.0, 1.05, 1.05),
+                           Comparison("b", 2.0, 3.0, 1.5)]
+    assert [c.key for c in regressions(comparisons, 0.1)] == ["b"]
+
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump({"version": 0}, file)
+    with pytest.raises(ValueError):
+        load(path)
+
+
+def test_command_fails_on_regression(tmp_path) -> None:
+    """
+    The command exits with status 1 when a benchmark regressed.
+    """
+    key = "mini-1/opening/remaining_shapes"
+    path = str(tmp_path / "baseline.json")
+    args = ["-s", "mini-1", "-p", "opening", "-o", "remaining_shapes",
+            "-r", "1", "--min-time", "0.001", "--compare", path]
+    runner = CliRunner()
+
+    save(path, {key: 1e-12}, "blokus")
+    result = runner.invoke(main_benchmark, args)
+    assert result.exit_code == 1 and "REGRESSION" in result.output
+
+    save(path, {key: 1.0}, "blokus")
+    result = runner.invoke(main_benchmark, args)
+    assert result.exit_code == 0
+
+
+def test_command_checks_engine(tmp_path) -> None:
+    """
+    The command refuses to compare with a baseline recorded on another
+    engine.
+    """
+    key = "mini-1/opening/remaining_shapes"
+    path = str(tmp_path / "baseline.json")
+    save(path, {key: 1.0}, "bitboard")
+    result = CliRunner().invoke(main_benchmark, [
+        "-s", "mini-1", "-p", "opening", "-o", "remaining_shapes",
+        "-r", "1", "--min-time", "0.001", "--compare", path])
+    assert result.exit_code == 2 and "bitboard" in result.output
+    assert key not in result.output
@@ -0,0 +1,44 @@
+import pytest
+
+from conftest import blokus_suite
+from piece import Piece
+from shape_definitions import ShapeKind
+from bitboard import BlokusBitboard
+
+test_blokus_suite = blokus_suite(BlokusBitboard)
+
+
+def test_start_position_off_board() -> None:
+    """
+    Start positions on the far edge of the board are rejected.
+    """
+    with pytest.raises(ValueError):
+        BlokusBitboard(2, 5, {(0, 0), (5, 5)})
+
+
+def test_no_wraparound() -> None:
+    """
+    A piece in the last column does not share an edge with a piece
+    in the first column of the next row.
+    """
+    blokus = BlokusBitboard(1, 5, {(0, 4)})
+    piece = Piece(blokus.shapes[ShapeKind.ONE])
+    piece.set_anchor((0, 4))
+    assert blokus.maybe_place(piece)
+
+    piece = Piece(blokus.shapes[ShapeKind.TWO])
+    piece.set_anchor((1, 0))
+    assert not blokus.legal_to_place(piece)
+    piece.set_anchor((1, 2))
+    assert blokus.legal_to_place(piece)
+
+
+def test_available_moves_unique() -> None:
+    """
+    Every available move covers a different set of squares.
+    """
+    blokus = BlokusBitboard(1, 11, {(5, 5)})
+    moves = blokus.available_moves()
+    footprints = {frozenset(move.squares()) for move in moves}
+    assert len(footprints) == len(moves)
+    assert all(blokus.legal_to_place(move) for move in moves)
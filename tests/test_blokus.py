@@ -1,4 +1,5 @@
 import pytest
+import random
 from typing import Optional
 
 import shape_definitions
@@ -6,6 +7,7 @@ from shape_definitions import ShapeKind
 from piece import Shape, Piece
 from blokus import Blokus
 from base import BlokusBase
+from orientations import ORIENTATIONS
 
 def test_inheritance() -> None:
     assert issubclass(
@@ -953,3 +955,71 @@ def test_20_points() -> None:
     assert blokus.get_score(2) == 20
     assert blokus.winners == [2]
 
+
+def brute_force_moves(blokus: BlokusBase) -> set[frozenset]:
+    """
+    Returns the squares covered by every legal placement, found by
+    trying every orientation of every remaining shape at every anchor.
+    """
+    footprints = set()
+    for kind in blokus.remaining_shapes(blokus.curr_player):
+        for orientation in ORIENTATIONS[kind]:
+            rows, cols = orientation.anchors(blokus.size)
+            for r in rows:
+                for c in cols:
+                    piece = orientation.piece((r, c))
+                    if blokus.legal_to_place(piece):
+                        footprints.add(frozenset(piece.squares()))
+    return footprints
+
+def test_available_moves_match_brute_force() -> None:
+    """
+    Play a seeded random 4-player game and verify, every few moves, that
+    available_moves finds exactly the legal placements (each once).
+    """
+    rng = random.Random(14200)
+    blokus = Blokus(4, 12, {(0, 0), (0, 11), (11, 0), (11, 11)})
+    turn = 0
+    while not blokus.game_over:
+        moves = list(blokus.available_moves())
+        if turn % 5 == 0:
+            footprints = {frozenset(move.squares()) for move in moves}
+            assert len(footprints) == len(moves)
+            assert footprints == brute_force_moves(blokus)
+        if moves:
+            assert blokus.maybe_place(rng.choice(moves))
+        else:
+            blokus.retire()
+        turn += 1
+
+def test_retire_skips_retired_players() -> None:
+    """
+    After a player retires, the turn passes over players who retired
+    earlier, and remaining_shapes reflects each player's placed pieces.
+    """
+    blokus = Blokus(3, 7, {(0, 0), (0, 6), (6, 0)})
+
+    for start in [(0, 0), (0, 6), (6, 0)]:
+        piece = Piece(blokus.shapes[ShapeKind.ONE])
+        piece.set_anchor(start)
+        assert blokus.maybe_place(piece)
+
+    assert blokus.curr_player == 1
+    blokus.retire()
+    assert blokus.curr_player == 2
+    piece = Piece(blokus.shapes[ShapeKind.TWO])
+    piece.set_anchor((1, 4))
+    assert blokus.maybe_place(piece)
+    assert blokus.curr_player == 3
+    blokus.retire()
+    assert blokus.curr_player == 2
+    assert not blokus.game_over
+
+    assert len(blokus.remaining_shapes(1)) == 20
+    assert len(blokus.remaining_shapes(2)) == 19
+    assert ShapeKind.TWO not in blokus.remaining_shapes(2)
+    assert ShapeKind.TWO in blokus.remaining_shapes(3)
+
+    blokus.retire()
+    assert blokus.game_over
+    assert blokus.winners == [2]
@@ -0,0 +1,69 @@
+import random
+
+import pytest
+
+from blokus import Blokus
+from layouts import LAYOUTS
+from book import OpeningBook, build_book
+from bot import RandomBot
+from symmetry import Symmetry, transform_move
+
+
+@pytest.fixture(scope="module")
+def book() -> OpeningBook:
+    return build_book(LAYOUTS["duo"], 12, plies=2, min_visits=1, seed=1)
+
+
+def test_build_is_deterministic(book: OpeningBook) -> None:
+    """
+    A book depends only on its seed, not on the number of workers.
+    """
+    again = build_book(LAYOUTS["duo"], 12, plies=2, min_visits=1, seed=1,
+                       workers=2)
+    assert again.entries == book.entries
+
+
+def test_round_trip(book: OpeningBook, tmp_path) -> None:
+    """
+    A saved book loads back the same, in 20 bytes per position.
+    """
+    path = str(tmp_path / "duo.book")
+    book.save(path)
+    loaded = OpeningBook.load(path)
+    assert loaded.layout == book.layout and loaded.plies == 2
+    assert loaded.entries.keys() == book.entries.keys()
+    for key, entry in book.entries.items():
+        assert loaded.entries[key].move == entry.move
+        assert loaded.entries[key].value == pytest.approx(entry.value)
+    assert len(book.dumps()) == 13 + 4 + 20 * len(book)
+    with pytest.raises(ValueError):
+        OpeningBook.loads(book.dumps()[:-1])
+
+
+def test_lookup(book: OpeningBook) -> None:
+    """
+    The book has a legal move for the first position and for its
+    symmetric images, mapped to each image's frame, and none for
+    other layouts.
+    """
+    blokus = Blokus(*LAYOUTS["duo"])
+    move = book.lookup(blokus)
+    assert move is not None and blokus.push(move)
+    reply = book.lookup(blokus)
+    assert reply is not None
+
+    image = Blokus(*LAYOUTS["duo"])
+    assert image.push(transform_move(move, Symmetry.TRANSPOSE, 14))
+    assert book.lookup(image) == \
+        transform_move(reply, Symmetry.TRANSPOSE, 14)
+    assert book.lookup(Blokus(*LAYOUTS["mono"])) is None
+
+
+def test_bot_plays_book_move(book: OpeningBook) -> None:
+    """
+    A bot with a book plays the book's move.
+    """
+    blokus = Blokus(*LAYOUTS["duo"])
+    move = book.lookup(blokus)
+    RandomBot(blokus, random.Random(0), book).move()
+    assert blokus.history == [move]
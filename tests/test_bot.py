@@ -0,0 +1,34 @@
+from bot import game_seed, play_game, simulation
+from simlog import read_records
+
+
+def test_play_game_is_deterministic() -> None:
+    """
+    A game depends only on its seed.
+    """
+    first = play_game(game_seed(0, 0))
+    second = play_game(game_seed(0, 0))
+    assert first._replace(seconds=0) == second._replace(seconds=0)
+    assert first.moves > 0 and first.bots == ["RandomBot", "SimpleBot"]
+    assert game_seed(0, 0) != game_seed(0, 1)
+    assert game_seed(0, 0) != game_seed(1, 0)
+
+
+def test_simulation_independent_of_workers() -> None:
+    """
+    The tallies are the same however many processes play the games.
+    """
+    wins = simulation(3, workers=1, seed=7)
+    assert sum(wins.values()) == 3
+    assert simulation(3, workers=2, seed=7) == wins
+
+
+def test_simulation_output(tmp_path) -> None:
+    """
+    A simulation writes one record per game, in game order.
+    """
+    path = str(tmp_path / "runs.jsonl")
+    simulation(2, workers=1, seed=3, output=path)
+    records = list(read_records(path))
+    assert [record.game_index for record in records] == [0, 1]
+    assert records[1].seed == game_seed(3, 1)
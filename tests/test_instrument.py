@@ -0,0 +1,150 @@
+import copy
+import json
+import pickle
+import random
+
+import pytest
+
+from conftest import blokus_suite
+from shape_definitions import ShapeKind
+from piece import Piece
+from move import Move
+from orientations import ORIENTATIONS
+from blokus import Blokus
+from layouts import LAYOUTS
+from instrument import ENV_VAR, METHODS, REASONS
+
+test_blokus_suite = blokus_suite(env={ENV_VAR: "1"})
+
+
+def test_opt_in(monkeypatch) -> None:
+    """
+    Games are only instrumented when asked, and otherwise run the
+    engine's own class.
+    """
+    monkeypatch.delenv(ENV_VAR, raising=False)
+    blokus = Blokus(*LAYOUTS["duo"])
+    assert type(blokus) is Blokus and blokus.counters is None
+    monkeypatch.setenv(ENV_VAR, "0")
+    assert Blokus(*LAYOUTS["duo"]).counters is None
+
+    monkeypatch.setenv(ENV_VAR, "yes")
+    blokus = Blokus(*LAYOUTS["duo"])
+    assert isinstance(blokus, Blokus) and blokus.counters is not None
+    assert Blokus(*LAYOUTS["duo"], instrument=False).counters is None
+
+    # Copies and restored snapshots follow the environment too.
+    monkeypatch.delenv(ENV_VAR)
+    restored = type(blokus).from_snapshot(blokus.snapshot())
+    assert type(restored) is Blokus and restored.counters is None
+
+
+def test_opt_in_numpy(monkeypatch) -> None:
+    """
+    The NumPy backend is instrumented by the environment variable, or
+    when asked, too.
+    """
+    numpy_backend = pytest.importorskip("numpy_backend")
+    monkeypatch.setenv(ENV_VAR, "1")
+    game = numpy_backend.BlokusNumpy(*LAYOUTS["duo"])
+    assert isinstance(game, numpy_backend.BlokusNumpy)
+    assert game.counters is not None
+    monkeypatch.delenv(ENV_VAR)
+    game = numpy_backend.BlokusNumpy(*LAYOUTS["duo"], instrument=True)
+    assert game.counters is not None
+    game.legal_moves()
+    assert game.counters.calls["legal_moves"] == 1
+
+
+def piece(kind: ShapeKind, anchor: tuple[int, int]) -> Piece:
+    """
+    Returns a piece of the given kind, unrotated, at anchor.
+    """
+    result = Piece(Blokus(*LAYOUTS["duo"]).shapes[kind])
+    result.set_anchor(anchor)
+    return result
+
+
+def test_counts_and_reasons() -> None:
+    """
+    Calls and times are counted, nested calls included, and each
+    rejection is put down to its reason.
+    """
+    blokus = Blokus(*LAYOUTS["duo"], instrument=True)
+    counters = blokus.counters
+    assert counters is not None
+
+    assert not blokus.legal_to_place(piece(ShapeKind.ONE, (0, -1)))
+    assert not blokus.legal_to_place(piece(ShapeKind.ONE, (0, 0)))
+    assert blokus.maybe_place(piece(ShapeKind.ONE, (4, 4)))
+    assert blokus.maybe_place(piece(ShapeKind.ONE, (9, 9)))
+    assert not blokus.legal_to_place(piece(ShapeKind.TWO, (4, 4)))
+    assert not blokus.legal_to_place(piece(ShapeKind.TWO, (4, 5)))
+    assert not blokus.legal_to_place(piece(ShapeKind.TWO, (0, 0)))
+    assert counters.rejections == dict.fromkeys(REASONS, 1)
+    blokus.available_moves()
+    blokus.remaining_shapes(1)
+
+    assert counters.calls == {"available_moves": 1, "legal_moves": 1,
+                              "legal_to_place": 7, "any_collisions": 7,
+                              "remaining_shapes": 1, "maybe_place": 2}
+    assert all(counters.seconds[name] > 0 for name in METHODS
+               if counters.calls[name])
+
+    copied = copy.deepcopy(blokus)
+    copied.remaining_shapes(2)
+    assert copied.counters.calls["remaining_shapes"] == 2
+    assert counters.calls["remaining_shapes"] == 1
+
+    data = json.loads(counters.to_json())
+    assert data["methods"]["maybe_place"]["calls"] == 2
+    assert data["rejections"] == counters.rejections
+    assert "own-edge" in counters.table()
+    counters.reset()
+    assert sum(counters.calls.values()) == 0
+
+
+def test_move_generation_rejections() -> None:
+    """
+    Move generation counts every candidate placement it rejects, and
+    push counts its rejected moves.
+    """
+    blokus = Blokus(*LAYOUTS["duo"], instrument=True)
+    counters = blokus.counters
+    assert counters is not None
+    rng = random.Random(1)
+    for _ in range(10):
+        assert blokus.push(rng.choice(sorted(blokus.legal_moves(), key=repr)))
+    counters.reset()
+
+    player = blokus.curr_player
+    candidates = {(orientation.catalog_index, r - dr, c - dc)
+                  for r, c in blokus.frontier(player)
+                  for kind in blokus.remaining_shapes(player)
+                  for orientation in ORIENTATIONS[kind]
+                  for dr, dc in orientation.squares}
+    moves = blokus.legal_moves()
+    assert sum(counters.rejections.values()) == len(candidates) - len(moves)
+    assert counters.rejections["own-edge"] > 0
+    assert counters.rejections["start-position"] == 0
+    assert counters.rejections["no-corner"] == 0
+
+    counters.reset()
+    assert not blokus.push(Move.from_piece(piece(ShapeKind.TWO, (0, 0))))
+    assert counters.rejections["no-corner"] == 1
+
+
+def test_pickle() -> None:
+    """
+    Instrumented games pickle, and come back instrumented, counters
+    and all.
+    """
+    blokus = Blokus(*LAYOUTS["duo"], instrument=True)
+    assert blokus.maybe_place(piece(ShapeKind.ONE, (4, 4)))
+    restored = pickle.loads(pickle.dumps(blokus))
+    assert type(restored) is type(blokus)
+    assert restored.snapshot() == blokus.snapshot()
+    assert restored.counters.calls == blokus.counters.calls
+    restored.remaining_shapes(1)
+    assert restored.counters.calls["remaining_shapes"] == 1
+    assert blokus.counters.calls["remaining_shapes"] == 0
@@ -0,0 +1,72 @@
+import random
+
+from test_undo import state
+from shape_definitions import ShapeKind
+from blokus import Blokus
+from layouts import LAYOUTS
+from move import Move
+from mcts import ALPHA, WIDENING, MCTSBot, rewards, search
+
+
+def test_sample_move() -> None:
+    """
+    Through a seeded random game, sample_move returns a legal move
+    whenever there is one, and None otherwise.
+    """
+    rng = random.Random(19)
+    blokus = Blokus(3, 11, {(0, 0), (0, 10), (10, 0), (10, 10)})
+    while not blokus.game_over:
+        legal = blokus.legal_moves()
+        move = blokus.sample_move(rng)
+        assert move in legal if legal else move is None
+        assert blokus.push(move)
+
+
+def test_search_restores_game() -> None:
+    """
+    A search runs the requested playouts, widens progressively and
+    leaves the game as it was.
+    """
+    blokus = Blokus(*LAYOUTS["duo"])
+    assert blokus.push(Move(ShapeKind.X, 0, (4, 4)))
+    before = state(blokus)
+    root = search(blokus, random.Random(0), playouts=60)
+    assert state(blokus) == before and len(blokus.history) == 1
+    assert root.visits == 60 and root.player == 2
+    assert sum(child.visits for child in root.children) == 60
+    assert len(root.children) < WIDENING * 60 ** ALPHA + 1
+    legal = blokus.legal_moves()
+    assert all(child.move in legal for child in root.children)
+
+
+def test_rewards() -> None:
+    """
+    Players share the win; a single player's score is scaled to 0..1.
+    """
+    blokus = Blokus(2, 5, {(0, 0), (4, 4)})
+    blokus.retire()
+    blokus.retire()
+    assert rewards(blokus) == [0.0, 0.5, 0.5]
+    mono = Blokus(1, 5, {(2, 2)})
+    mono.retire()
+    assert rewards(mono) == [0.0, 0.0]
+
+
+def test_bot_is_deterministic() -> None:
+    """
+    A seeded bot plays the same legal move every time, in one
+    process or several.
+    """
+    moves = []
+    for workers in (1, 1, 2):
+        blokus = Blokus(*LAYOUTS["mono"])
+        bot = MCTSBot(blokus, random.Random(5), playouts=30,
+                      workers=workers)
+        moves.append(bot.choose_move(blokus))
+        bot.close()
+        assert moves[-1] in blokus.legal_moves()
+    assert moves[0] == moves[1]
+
+    blokus = Blokus(*LAYOUTS["mono"])
+    MCTSBot(blokus, random.Random(5), playouts=30).move()
+    assert blokus.history == [moves[0]]
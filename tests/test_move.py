@@ -0,0 +1,87 @@
+import pickle
+
+from shape_definitions import ShapeKind
+from piece import Piece
+from blokus import Blokus
+from move import Move, encode_move, decode_move, num_move_codes
+from orientations import ALL_ORIENTATIONS, SHAPES
+
+
+def test_move_value_semantics() -> None:
+    """
+    Moves compare and hash by value, and cannot be modified.
+    """
+    move = Move(ShapeKind.Z, 1, (3, 4))
+    assert move == Move(ShapeKind.Z, 1, (3, 4))
+    assert move != Move(ShapeKind.Z, 2, (3, 4))
+    assert len({move, Move(ShapeKind.Z, 1, (3, 4))}) == 1
+    assert pickle.loads(pickle.dumps(move)) == move
+    try:
+        move.anchor = (0, 0)  # type: ignore
+        assert False, "Move should be immutable"
+    except AttributeError:
+        pass
+
+
+def test_piece_round_trip() -> None:
+    """
+    Converting a Move to a Piece and back gives the same Move.
+    """
+    for orientation in ALL_ORIENTATIONS:
+        move = Move(orientation.kind, orientation.orientation_id, (6, 6))
+        piece = move.to_piece()
+        assert piece.squares() == move.squares()
+        assert Move.from_piece(piece) == move
+
+
+def test_from_translated_piece() -> None:
+    """
+    Pieces whose rotations only translate the shape (LETTER_O) map
+    to the single orientation of the shape, at the right anchor.
+    """
+    piece = Piece(SHAPES[ShapeKind.LETTER_O])
+    piece.set_anchor((5, 5))
+    piece.rotate_right()
+    move = Move.from_piece(piece)
+    assert move.orientation_id == 0
+    assert sorted(move.squares()) == sorted(piece.squares())
+
+
+def test_legal_moves_match_available_moves() -> None:
+    """
+    legal_moves and available_moves describe the same placements.
+    """
+    blokus = Blokus(2, 14, {(4, 4), (9, 9)})
+    piece = Piece(blokus.shapes[ShapeKind.F])
+    piece.set_anchor((4, 4))
+    assert blokus.maybe_place(piece)
+
+    moves = blokus.legal_moves()
+    pieces = blokus.available_moves()
+    assert {Move.from_piece(p) for p in pieces} == moves
+
+
+def test_move_codes_bijective() -> None:
+    """
+    Every code in range decodes to a Move that encodes back to it.
+    """
+    size = 7
+    codes = set()
+    for code in range(num_move_codes(size)):
+        move = decode_move(code, size)
+        assert encode_move(move, size) == code
+        codes.add(move)
+    assert len(codes) == 91 * 7 * 7
+    assert num_move_codes(20) < 1 << 16
+
+
+def test_available_moves_packed() -> None:
+    """
+    The packed moves are the sorted codes of legal_moves.
+    """
+    blokus = Blokus(2, 14, {(4, 4), (9, 9)})
+    packed = blokus.available_moves_packed()
+    assert packed.typecode == "H"
+    assert list(packed) == sorted(encode_move(move, 14)
+                                  for move in blokus.legal_moves())
+    assert {decode_move(code, 14) for code in packed} == blokus.legal_moves()
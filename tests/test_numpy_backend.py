@@ -0,0 +1,84 @@
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from conftest import blokus_suite
+from shape_definitions import ShapeKind
+from blokus import Blokus
+from move import Move
+from numpy_backend import BlokusNumpy
+from preview import PendingPreview, new_game
+
+test_blokus_suite = blokus_suite(BlokusNumpy)
+
+
+def test_matches_blokus_with_pop() -> None:
+    """
+    Through a seeded random game, with every other move taken back
+    and replayed, BlokusNumpy finds the same moves as Blokus.
+    """
+    rng = random.Random(10)
+    starts = {(0, 0), (0, 12), (12, 0), (12, 12)}
+    reference = Blokus(4, 13, starts)
+    blokus = BlokusNumpy(4, 13, starts)
+    turn = 0
+    while not blokus.game_over:
+        moves = blokus.legal_moves()
+        assert moves == reference.legal_moves()
+        move = rng.choice(sorted(moves, key=repr)) if moves else None
+        assert blokus.push(move) and reference.push(move)
+        if turn % 2:
+            assert blokus.pop() == move
+            assert blokus.legal_moves() == moves
+            blokus.push(move)
+        turn += 1
+
+
+def test_legal_anchors() -> None:
+    """
+    The mask for an orientation marks exactly the legal anchors.
+    """
+    blokus = BlokusNumpy(1, 11, {(5, 5)})
+    assert blokus.push(Move(ShapeKind.X, 0, (5, 5)))
+
+    mask = blokus.legal_anchors(ShapeKind.L, 2)
+    legal = blokus.legal_moves()
+    assert mask.shape == (11, 11)
+    for r in range(11):
+        for c in range(11):
+            assert mask[r, c] == (Move(ShapeKind.L, 2, (r, c)) in legal)
+    with pytest.raises(ValueError):
+        blokus.legal_anchors(ShapeKind.X, 0)
+
+
+def test_pending_preview() -> None:
+    """
+    The UI preview agrees with legal_to_place as the pending piece
+    moves around the board.
+    """
+    assert type(new_game(2, 14, {(4, 4), (9, 9)})) is Blokus
+    blokus = new_game(2, 14, {(4, 4), (9, 9)}, BlokusNumpy)
+    assert blokus.push(Move(ShapeKind.W, 0, (4, 4)))
+    preview = PendingPreview(blokus)
+    piece = Move(ShapeKind.P, 3, (0, 0)).to_piece()
+    for r in range(1, 13):
+        for c in range(1, 13):
+            piece.set_anchor((r, c))
+            assert preview.legal(piece) == blokus.legal_to_place(piece)
+    assert blokus.push(Move(ShapeKind.ONE, 0, (9, 9)))
+    assert not preview.legal(Move(ShapeKind.W, 0, (6, 6)).to_piece())
+
+
+def test_from_snapshot() -> None:
+    """
+    A restored snapshot has up-to-date masks.
+    """
+    blokus = BlokusNumpy(2, 14, {(4, 4), (9, 9)})
+    assert blokus.push(Move(ShapeKind.W, 0, (4, 4)))
+    assert blokus.push(Move(ShapeKind.ONE, 0, (9, 9)))
+    restored = BlokusNumpy.from_snapshot(blokus.snapshot())
+    assert isinstance(restored, BlokusNumpy)
+    assert restored.legal_moves() == Blokus.from_snapshot(
+        blokus.snapshot()).legal_moves()
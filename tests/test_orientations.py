@@ -0,0 +1,70 @@
+from shape_definitions import ShapeKind
+from piece import Piece
+from blokus import Blokus
+from orientations import (SHAPES, ORIENTATIONS, ALL_ORIENTATIONS,
+                          copy_shapes, normalize)
+
+
+def test_orientation_counts() -> None:
+    """
+    Symmetric shapes have fewer distinct orientations.
+    """
+    assert len(ALL_ORIENTATIONS) == 91
+    assert len(ORIENTATIONS[ShapeKind.ONE]) == 1
+    assert len(ORIENTATIONS[ShapeKind.LETTER_O]) == 1
+    assert len(ORIENTATIONS[ShapeKind.X]) == 1
+    assert len(ORIENTATIONS[ShapeKind.TWO]) == 2
+    assert len(ORIENTATIONS[ShapeKind.Z]) == 4
+    assert len(ORIENTATIONS[ShapeKind.F]) == 8
+
+
+def test_orientations_distinct() -> None:
+    """
+    No two orientations of a shape are translations of each other,
+    and their ids and indexes are consecutive.
+    """
+    for kind, orientations in ORIENTATIONS.items():
+        keys = {normalize(o.squares) for o in orientations}
+        assert len(keys) == len(orientations)
+        for i, orientation in enumerate(orientations):
+            assert orientation.kind == kind
+            assert orientation.orientation_id == i
+    for i, orientation in enumerate(ALL_ORIENTATIONS):
+        assert orientation.catalog_index == i
+
+
+def test_orientation_matches_piece() -> None:
+    """
+    Each orientation covers the same squares as a Piece flipped
+    and rotated the same way.
+    """
+    for orientation in ALL_ORIENTATIONS:
+        piece = Piece(SHAPES[orientation.kind])
+        piece.set_anchor((7, 7))
+        if orientation.flipped:
+            piece.flip_horizontally()
+        for _ in range(orientation.rotation):
+            piece.rotate_right()
+        assert piece.squares() == orientation.piece((7, 7)).squares()
+
+
+def test_copy_shapes() -> None:
+    """
+    Copied shapes can be transformed without changing the catalog.
+    """
+    shapes = copy_shapes()
+    shapes[ShapeKind.Z].rotate_left()
+    assert shapes[ShapeKind.Z].squares != SHAPES[ShapeKind.Z].squares
+    assert ORIENTATIONS[ShapeKind.Z][0].squares == \
+        tuple(SHAPES[ShapeKind.Z].squares)
+
+
+def test_available_moves_unique() -> None:
+    """
+    Every available move covers a different set of squares.
+    """
+    blokus = Blokus(2, 14, {(4, 4), (9, 9)})
+    moves = blokus.available_moves()
+    footprints = {frozenset(move.squares()) for move in moves}
+    assert len(footprints) == len(moves)
+    assert all((4, 4) in f or (9, 9) in f for f in footprints)
@@ -0,0 +1,65 @@
+import pytest
+from click.testing import CliRunner
+
+from conftest import random_moves
+from test_undo import state
+from blokus import Blokus
+from engines import ENGINES
+from perft import RETIRE, compare, main_perft, perft, start_position
+
+
+def test_shallow_counts() -> None:
+    """
+    Depth 0 counts the position itself, and depth 1 its legal moves.
+    """
+    blokus = start_position(Blokus, "duo", plies=4)
+    assert perft(blokus, 0).nodes == 1
+    result = perft(blokus, 1)
+    assert result.nodes == len(blokus.available_moves())
+    assert sum(result.shapes.values()) == result.nodes
+    with pytest.raises(ValueError):
+        perft(blokus, -1)
+
+
+def test_search_restores_game() -> None:
+    """
+    Searching in place leaves the game as it was.
+    """
+    blokus = start_position(Blokus, "mini-2", plies=2)
+    before = state(blokus)
+    assert perft(blokus, 2).nodes > 0
+    assert state(blokus) == before
+
+
+@pytest.mark.parametrize("plies", [0, 3])
+def test_engines_agree(plies: int) -> None:
+    """
+    Every engine (the NumPy one if numpy is installed) reaches the
+    same positions, shape for shape.
+    """
+    results = {name: perft(start_position(engine, "mini-2", plies), 2)
+               for name, engine in ENGINES.items()}
+    assert compare(results) == []
+
+
+def test_retirements() -> None:
+    """
+    A player without a legal move retires, which counts as a ply.
+    """
+    blokus = Blokus(2, 5, {(0, 0), (4, 4)})
+    for move in random_moves(blokus, 3):
+        if move is None:
+            assert perft(blokus, 1).shapes == {RETIRE: 1}
+            break
+    else:
+        pytest.fail("Nobody retired.")
+
+
+def test_command() -> None:
+    """
+    The command compares engines, and exits 0 when they agree.
+    """
+    result = CliRunner().invoke(main_perft, ["mini-1", "-d", "2", "-e",
+                                             "blokus", "-e", "bitboard"])
+    assert result.exit_code == 0, result.output
+    assert "MISMATCH" not in result.output and "nodes/s" in result.output
@@ -0,0 +1,72 @@
+import pickle
+import random
+
+import pytest
+
+from conftest import random_moves
+from test_undo import state
+from shape_definitions import ShapeKind
+from blokus import Blokus
+from move import Move
+from replay import Header, Replayer, dumps, loads, record, retire_code
+
+
+def random_game(seed: int) -> tuple[Blokus, list]:
+    """
+    Plays a seeded random 3-player game, returning the game and the
+    state before each move and at the end.
+    """
+    blokus = Blokus(3, 12, {(0, 0), (0, 11), (11, 0), (11, 11)})
+    states = [state(blokus) for _ in random_moves(blokus, seed)]
+    states.append(state(blokus))
+    return blokus, states
+
+
+def test_round_trip() -> None:
+    """
+    A record holds the layout and every move, in two bytes per move.
+    """
+    blokus, _ = random_game(5)
+    data = record(blokus)
+    header, codes = loads(data)
+    assert header == Header(12, 3, ((0, 0), (0, 11), (11, 0), (11, 11)))
+    assert len(data) == 8 + 2 * 4 + 2 * len(blokus.history)
+    assert retire_code(12) in codes
+    assert len(data) * 20 < len(pickle.dumps(blokus.placed_pieces))
+
+
+@pytest.mark.parametrize("trusted", [False, True])
+def test_seek(trusted: bool) -> None:
+    """
+    Seeking to any position, forwards or backwards, rebuilds the
+    game as it was after that many moves.
+    """
+    blokus, states = random_game(6)
+    replayer = Replayer(record(blokus), trusted=trusted)
+    assert len(replayer) == len(states) - 1
+    positions = list(range(len(states)))
+    random.Random(7).shuffle(positions)
+    for position in positions:
+        game = replayer.seek(position)
+        assert replayer.position == position
+        assert state(game) == states[position]
+    assert replayer.seek(len(replayer)).position_hash == \
+        blokus.position_hash
+    with pytest.raises(IndexError):
+        replayer.seek(len(replayer) + 1)
+
+
+def test_illegal_record() -> None:
+    """
+    An illegal move is rejected unless the record is trusted,
+    and data that is not a record is rejected.
+    """
+    header = Header(5, 1, ((0, 0),))
+    data = dumps(header, [Move(ShapeKind.ONE, 0, (2, 2))])
+    with pytest.raises(ValueError):
+        Replayer(data).seek(1)
+    assert Replayer(data, trusted=True).seek(1).grid[2][2] is not None
+    with pytest.raises(ValueError):
+        loads(b"BLKX" + data[4:])
+    with pytest.raises(ValueError):
+        loads(data[:-1])
@@ -0,0 +1,118 @@
+import random
+import time
+from typing import Optional
+
+import pytest
+
+from shape_definitions import ShapeKind
+from blokus import Blokus
+from layouts import LAYOUTS
+from move import Move
+from bot import RandomBot, SimpleBot
+from search import SearchBot
+from scheduler import Decision, Latency, Scheduler
+
+
+class SlowBot:
+    """
+    Bot that plays the X at the start, after sleeping.
+    """
+
+    def __init__(self, seconds: float) -> None:
+        self.seconds = seconds
+        self.states: list[Blokus] = []
+
+    def choose_move(self, state: Blokus,
+                    deadline: Optional[float]) -> Optional[Move]:
+        self.states.append(state)
+        time.sleep(self.seconds)
+        return Move(ShapeKind.X, 0, (4, 4))
+
+
+def test_play() -> None:
+    """
+    The scheduler plays a game to the end, recording each decision
+    and its time.
+    """
+    blokus = Blokus(*LAYOUTS["duo"])
+    rng = random.Random(21)
+    scheduler = Scheduler(blokus, [RandomBot(blokus, rng),
+                                   SimpleBot(blokus, rng)])
+    decisions = scheduler.play()
+    assert blokus.game_over
+    assert [d.move for d in decisions] == blokus.history
+    assert sum(len(latency.samples)
+               for latency in scheduler.latency.values()) == len(decisions)
+    assert all(not d.late for d in decisions)
+    with pytest.raises(ValueError):
+        scheduler.step()
+
+
+def test_bots_get_copies() -> None:
+    """
+    Bots choose on a copy of the position, unless isolation is off.
+    """
+    blokus = Blokus(*LAYOUTS["duo"])
+    bot = SlowBot(0.0)
+    Scheduler(blokus, [bot, bot]).step()
+    assert bot.states[0] is not blokus
+    assert bot.states[0].snapshot() == Blokus(*LAYOUTS["duo"]).snapshot()
+
+    blokus = Blokus(*LAYOUTS["duo"])
+    Scheduler(blokus, [bot, bot], isolate=False).step()
+    assert bot.states[1] is blokus
+
+
+def test_deadlines() -> None:
+    """
+    Late decisions are flagged, and replaced by retiring if the
+    budget is enforced; illegal moves are refused.
+    """
+    blokus = Blokus(*LAYOUTS["duo"])
+    slow = SlowBot(0.02)
+    decision = Scheduler(blokus, [slow, slow], budget=0.01).step()
+    assert decision.late and decision.move is not None
+
+    blokus = Blokus(*LAYOUTS["duo"])
+    scheduler = Scheduler(blokus, [slow, slow], budget=0.01, enforce=True)
+    decision = scheduler.step()
+    assert decision.late and decision.move is None
+    assert blokus.retired_players == {1}
+    assert scheduler.latency[1].summary()["late"] == 1
+
+    blokus = Blokus(*LAYOUTS["duo"])
+    fast = SlowBot(0.0)
+    scheduler = Scheduler(blokus, [fast, fast])
+    scheduler.step()
+    with pytest.raises(ValueError):
+        # Player 2's X would overlap player 1's.
+        scheduler.step()
+    assert len(blokus.history) == 1
+
+
+def test_search_bot_budget() -> None:
+    """
+    A search bot keeps to the scheduler's budget.
+    """
+    blokus = Blokus(*LAYOUTS["duo"])
+    bots = [SearchBot(blokus, random.Random(0), seconds=10),
+            RandomBot(blokus, random.Random(0))]
+    scheduler = Scheduler(blokus, bots, budget=0.1)
+    for _ in range(4):
+        scheduler.step()
+    assert scheduler.latency[1].summary()["max"] < 0.3
+
+
+def test_latency() -> None:
+    """
+    Percentiles are taken by nearest rank.
+    """
+    latency = Latency()
+    for seconds in (0.4, 0.1, 0.3, 0.2):
+        latency.add(Decision(1, None, seconds, seconds > 0.35))
+    assert latency.percentile(50) == 0.2
+    assert latency.percentile(95) == 0.4
+    assert latency.percentile(0) == 0.1
+    summary = latency.summary()
+    assert summary["decisions"] == 4 and summary["late"] == 1
+    assert summary["mean"] == pytest.approx(0.25)
@@ -0,0 +1,112 @@
+import random
+import time
+
+import pytest
+
+from test_undo import state
+from blokus import Blokus
+from layouts import LAYOUTS
+from search import (SearchBot, Strategy, evaluate, margin, new_corners,
+                    search)
+
+
+def random_position(layout: str, plies: int, seed: int) -> Blokus:
+    """
+    Returns a game of the layout after the given number of random
+    plies.
+    """
+    rng = random.Random(seed)
+    blokus = Blokus(*LAYOUTS[layout])
+    for _ in range(plies):
+        assert blokus.push(blokus.sample_move(rng))
+    return blokus
+
+
+def test_new_corners() -> None:
+    """
+    new_corners counts exactly the squares a move adds to the frontier.
+    """
+    rng = random.Random(20)
+    blokus = Blokus(*LAYOUTS["classic-3"])
+    while not blokus.game_over:
+        legal = sorted(blokus.legal_moves(), key=repr)
+        player = blokus.curr_player
+        before = set(blokus.frontier(player))
+        for move in rng.sample(legal, min(5, len(legal))):
+            blokus.push(move)
+            added = blokus.frontier(player) - before
+            blokus.pop()
+            assert new_corners(blokus, move) == len(added)
+        assert blokus.push(rng.choice(legal) if legal else None)
+
+
+def test_depth_one_maximizes_margin() -> None:
+    """
+    A one-ply paranoid search picks a move with the best margin.
+    """
+    blokus = random_position("duo", 4, 1)
+    before = state(blokus)
+    result = search(blokus, max_depth=1)
+    assert state(blokus) == before
+    player = blokus.curr_player
+    values = []
+    for move in blokus.legal_moves():
+        blokus.push(move)
+        values.append(margin(evaluate(blokus), player))
+        blokus.pop()
+    assert result.depth == 1 and result.value == max(values)
+    assert result.move in blokus.legal_moves()
+
+
+@pytest.mark.parametrize("strategy", list(Strategy))
+def test_deeper_search(strategy: Strategy) -> None:
+    """
+    Both strategies search a three-player position to depth 2 and
+    choose a legal move, leaving the game as it was.
+    """
+    rng = random.Random(2)
+    blokus = Blokus(3, 9, {(0, 0), (0, 8), (8, 0)})
+    for _ in range(7):
+        assert blokus.push(blokus.sample_move(rng))
+    before = state(blokus)
+    result = search(blokus, max_depth=2, strategy=strategy)
+    assert state(blokus) == before
+    assert result.depth == 2 and result.move in blokus.legal_moves()
+
+
+def test_deadline() -> None:
+    """
+    A search stops at its deadline with a legal move, even before
+    finishing its first iteration.
+    """
+    blokus = random_position("classic-4", 8, 3)
+    for seconds in (0.0, 0.3):
+        result = search(blokus, time.perf_counter() + seconds)
+        assert result.seconds < seconds + 0.2
+        assert result.move in blokus.legal_moves()
+
+
+def test_endgame() -> None:
+    """
+    Near the end, the search sees to the end of the game and stops
+    early; with no legal moves, it retires.
+    """
+    blokus = random_position("duo", 26, 6)
+    result = search(blokus, time.perf_counter() + 5)
+    assert result.seconds < 5 and result.move in blokus.legal_moves()
+    while blokus.legal_moves():
+        blokus.push(blokus.sample_move(random.Random(0)))
+    if not blokus.game_over:
+        assert search(blokus, max_depth=3).move is None
+
+
+def test_bot_moves() -> None:
+    """
+    SearchBot plays a legal move within its time budget.
+    """
+    blokus = Blokus(*LAYOUTS["duo"])
+    bot = SearchBot(blokus, random.Random(0), seconds=0.2)
+    legal = blokus.legal_moves()
+    bot.move()
+    assert blokus.history[0] in legal
+    assert bot.last is not None and bot.last.depth >= 1
@@ -0,0 +1,45 @@
+import pytest
+
+from simlog import GameRecord, RecordWriter, read_records, summarize
+
+RECORDS = [
+    GameRecord(0, 11, ["RandomBot", "SimpleBot"], 11, [[0, 0], [10, 10]],
+               [-60, -50], [2], 18, 0.25),
+    GameRecord(1, 12, ["RandomBot", "SimpleBot"], 11, [[0, 0], [10, 10]],
+               [-40, -50], [1], 20, 0.5),
+    GameRecord(2, 13, ["RandomBot", "SimpleBot"], 11, [[0, 0], [10, 10]],
+               [-45, -45], [1, 2], 22, 0.75),
+]
+
+
+@pytest.mark.parametrize("name", ["runs.jsonl", "runs.csv"])
+def test_round_trip(tmp_path, name: str) -> None:
+    """
+    Records read back as written, each one on disk as soon as it is
+    written, and a partly written last line is skipped.
+    """
+    path = str(tmp_path / name)
+    with RecordWriter(path) as writer:
+        for i, record in enumerate(RECORDS):
+            writer.write(record)
+            assert list(read_records(path)) == RECORDS[:i + 1]
+    with open(path, "a", encoding="utf-8") as file:
+        file.write('3,14,"[""Rand')
+    assert list(read_records(path)) == RECORDS
+
+
+def test_summarize() -> None:
+    """
+    The summary has each player's win and tie rates and score
+    statistics, and the mean moves and time per game.
+    """
+    summary = summarize(iter(RECORDS))
+    assert summary["games"] == 3
+    one, two = summary["players"][1], summary["players"][2]
+    assert one["win_rate"] == pytest.approx(1 / 3)
+    assert two["win_rate"] == pytest.approx(1 / 3)
+    assert one["tie_rate"] == two["tie_rate"] == pytest.approx(1 / 3)
+    assert one["mean_score"] == pytest.approx(-145 / 3)
+    assert two["stdev_score"] == pytest.approx(2.8867513)
+    assert summary["mean_moves"] == 20
+    assert summary["mean_seconds"] == pytest.approx(0.5)
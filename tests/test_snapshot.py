@@ -0,0 +1,51 @@
+import random
+
+import pytest
+
+from test_undo import state
+from blokus import Blokus
+
+
+def test_snapshot_round_trip() -> None:
+    """
+    At every point of a seeded random game, a restored snapshot has
+    the same state, hash and legal moves, and plays on identically.
+    """
+    rng = random.Random(16)
+    blokus = Blokus(4, 14, {(0, 0), (0, 13), (13, 0), (13, 13)})
+    while not blokus.game_over:
+        restored = Blokus.from_snapshot(blokus.snapshot())
+        assert state(restored) == state(blokus)
+        assert restored.position_hash == blokus.position_hash
+        assert restored.legal_moves() == blokus.legal_moves()
+        assert restored.snapshot() == blokus.snapshot()
+        legal = sorted(blokus.legal_moves(), key=repr)
+        move = rng.choice(legal) if legal else None
+        assert blokus.push(move) and restored.push(move)
+        assert restored.position_hash == blokus.position_hash
+
+    restored = Blokus.from_snapshot(blokus.snapshot())
+    assert restored.game_over and restored.winners == blokus.winners
+    with pytest.raises(IndexError):
+        restored.pop()
+
+
+def test_start_off_board() -> None:
+    """
+    Start positions off the board are rejected when the game is
+    created, rather than breaking snapshot later.
+    """
+    for start in ((-1, 0), (0, -1), (14, 0), (0, 14)):
+        with pytest.raises(ValueError):
+            Blokus(2, 14, {(4, 4), start})
+
+
+def test_bad_snapshot() -> None:
+    """
+    Data that is not a whole snapshot is rejected.
+    """
+    data = Blokus(2, 14, {(4, 4), (9, 9)}).snapshot()
+    for bad in (b"", b"BLKX" + data[4:], data[:-1], data[:20],
+                data + b"\0"):
+        with pytest.raises(ValueError):
+            Blokus.from_snapshot(bad)
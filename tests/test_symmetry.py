@@ -0,0 +1,70 @@
+import pytest
+
+from conftest import random_moves
+from shape_definitions import ShapeKind
+from blokus import Blokus
+from move import Move
+from symmetry import (Symmetry, canonical_hash, canonicalize, symmetries,
+                      transform_move)
+
+CORNERS = {(0, 0), (0, 12), (12, 0), (12, 12)}
+
+
+def test_symmetries() -> None:
+    """
+    Only symmetries that preserve the start positions apply.
+    """
+    assert symmetries(13, CORNERS) == list(Symmetry)
+    assert symmetries(14, {(4, 4), (9, 9)}) == [
+        Symmetry.IDENTITY, Symmetry.ROTATE_180, Symmetry.TRANSPOSE,
+        Symmetry.ANTI_TRANSPOSE]
+    assert symmetries(14, {(4, 4)}) == [Symmetry.IDENTITY,
+                                        Symmetry.TRANSPOSE]
+
+
+@pytest.mark.parametrize("symmetry", list(Symmetry))
+def test_transform_move(symmetry: Symmetry) -> None:
+    """
+    A move's image covers the images of its squares, and the
+    inverse symmetry maps it back.
+    """
+    for kind in (ShapeKind.F, ShapeKind.V, ShapeKind.LETTER_O):
+        move = Move(kind, 0, (3, 4))
+        image = transform_move(move, symmetry, 11)
+        assert set(image.squares()) == \
+            {symmetry.point(point, 11) for point in move.squares()}
+        assert transform_move(image, symmetry.inverse, 11) == move
+
+
+@pytest.mark.parametrize("symmetry", list(Symmetry))
+def test_images_share_canonical_hash(symmetry: Symmetry) -> None:
+    """
+    Playing the images of a seeded random game's moves gives the
+    image position: the same canonical hash, and the images of the
+    legal moves.
+    """
+    blokus = Blokus(4, 13, CORNERS)
+    image = Blokus(4, 13, CORNERS)
+    for move in random_moves(blokus, 17):
+        canonical = canonicalize(blokus)
+        assert canonical_hash(image) == canonical.hash
+        assert canonical.hash <= blokus.position_hash
+        assert image.legal_moves() == \
+            {transform_move(legal, symmetry, 13)
+             for legal in blokus.legal_moves()}
+        assert image.push(None if move is None else
+                          transform_move(move, symmetry, 13))
+
+
+def test_canonical_symmetry() -> None:
+    """
+    The returned symmetry takes the position to one whose hash is
+    the canonical hash.
+    """
+    blokus = Blokus(2, 14, {(4, 4), (9, 9)})
+    assert blokus.push(Move(ShapeKind.L, 0, (4, 4)))
+    canonical = canonicalize(blokus)
+    image = Blokus(2, 14, {(4, 4), (9, 9)})
+    assert image.push(transform_move(Move(ShapeKind.L, 0, (4, 4)),
+                                     canonical.symmetry, 14))
+    assert image.position_hash == canonical.hash
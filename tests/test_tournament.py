@@ -0,0 +1,76 @@
+import pytest
+
+from simlog import GameRecord, read_records
+from tournament import ELO_BASE, fit, pairwise, ratings, run, schedule
+
+
+def record(bots: list[str], scores: list[int]) -> GameRecord:
+    """
+    Returns a record with the given bots and scores.
+    """
+    return GameRecord(0, 0, bots, 14, [], scores, [], 0, 0.0)
+
+
+def test_schedule() -> None:
+    """
+    Every group plays in every seat rotation; layouts with more seats
+    than bots are left out.
+    """
+    matches = schedule(["a", "b", "c"], ["duo", "mono", "classic-4"], 2)
+    duo = [match.bots for match in matches if match.layout == "duo"]
+    assert len(duo) == 2 * 3 * 2
+    assert duo.count(("a", "b")) == duo.count(("b", "a")) == 2
+    mono = [match for match in matches if match.layout == "mono"]
+    assert len(mono) == 2 * 3
+    assert all(match.layout != "classic-4" for match in matches)
+    assert [match.game_index for match in matches] == list(range(len(matches)))
+    assert len({match.seed for match in matches}) == len(matches)
+
+
+def test_pairwise() -> None:
+    """
+    Each pair of bots in a game scores by comparing their scores.
+    """
+    assert pairwise(record(["a", "b", "c"], [-5, -5, -9])) == \
+        [("a", "b", 0.5), ("a", "c", 1.0), ("b", "c", 1.0)]
+
+
+def test_fit() -> None:
+    """
+    Even results give even ratings; a bot that wins more rates higher,
+    and the ratings average ELO_BASE.
+    """
+    even = fit(["a", "b"], [("a", "b", 1.0), ("a", "b", 0.0)])
+    assert even["a"] == pytest.approx(even["b"]) == pytest.approx(ELO_BASE)
+    elo = fit(["a", "b", "c"], [("a", "b", 1.0)] * 6 +
+              [("b", "c", 1.0)] * 6 + [("a", "c", 1.0)] * 6)
+    assert elo["a"] > elo["b"] > elo["c"]
+    assert sum(elo.values()) / 3 == pytest.approx(ELO_BASE)
+
+
+def test_ratings() -> None:
+    """
+    Ratings come best first, inside their confidence intervals.
+    """
+    records = [record(["a", "b"], [-10, -20])] * 5 + \
+        [record(["b", "a"], [-10, -20])] * 2
+    table = ratings(records, bootstrap=50)
+    assert [rating.bot for rating in table] == ["a", "b"]
+    assert all(r.low <= r.elo <= r.high and r.games == 7 for r in table)
+    assert table[0].score == pytest.approx(5 / 7)
+
+
+def test_run_independent_of_workers(tmp_path) -> None:
+    """
+    A tournament's games are the same however many processes play
+    them, and are written to the output file in order.
+    """
+    matches = schedule(["random", "simple"], ["duo", "mono"], 1, seed=3)
+    path = str(tmp_path / "games.jsonl")
+    first = list(run(matches, workers=1, output=path))
+    second = list(run(matches, workers=2))
+    assert [r._replace(seconds=0) for r in first] == \
+        [r._replace(seconds=0) for r in second]
+    assert list(read_records(path)) == first
+    assert [r.bots for r in first] == \
+        [["random", "simple"], ["simple", "random"], ["random", "simple"]]
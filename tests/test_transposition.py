@@ -0,0 +1,83 @@
+import pytest
+
+from shape_definitions import ShapeKind
+from move import Move
+from transposition import TranspositionTable, Bound, ENTRY_BYTES
+
+
+def one_bucket_table() -> TranspositionTable:
+    """
+    Returns a table with a single bucket, so every key collides.
+    """
+    table = TranspositionTable(2 * ENTRY_BYTES)
+    assert table.capacity == 2
+    return table
+
+
+def test_store_and_probe() -> None:
+    """
+    Stored entries can be found again, and misses are counted.
+    """
+    table = TranspositionTable(1 << 20)
+    move = Move(ShapeKind.F, 3, (4, 5))
+    table.store(12345, 3, 1.5, Bound.EXACT, move)
+
+    entry = table.probe(12345)
+    assert entry is not None
+    assert (entry.depth, entry.value, entry.bound, entry.move) == \
+        (3, 1.5, Bound.EXACT, move)
+    assert table.probe(54321) is None
+    assert table.hits == 1
+    assert table.misses == 1
+    assert len(table) == 1
+
+
+def test_depth_preferred_replacement() -> None:
+    """
+    A deeper entry keeps its slot; shallower ones rotate through
+    the always-replace slot, evicting each other.
+    """
+    table = one_bucket_table()
+    table.store(1, 5, 0.0, Bound.EXACT, None)
+    table.store(2, 2, 0.0, Bound.LOWER, None)
+    table.store(3, 1, 0.0, Bound.UPPER, None)
+
+    assert table.probe(1) is not None
+    assert table.probe(2) is None
+    assert table.probe(3) is not None
+    assert table.evictions == 1
+
+
+def test_deeper_entry_demotes() -> None:
+    """
+    A deeper entry for a new position takes the depth-preferred slot,
+    and the old one moves to the always-replace slot.
+    """
+    table = one_bucket_table()
+    table.store(1, 2, 0.0, Bound.EXACT, None)
+    table.store(2, 4, 0.0, Bound.EXACT, None)
+    assert table.probe(1) is not None
+    assert table.probe(2) is not None
+    assert table.evictions == 0
+
+    table.store(3, 6, 0.0, Bound.EXACT, None)
+    assert table.probe(1) is None
+    assert table.evictions == 1
+
+
+def test_same_key_is_replaced() -> None:
+    """
+    Storing a position again replaces its entry rather than
+    duplicating it.
+    """
+    table = one_bucket_table()
+    table.store(7, 1, 0.0, Bound.LOWER, None)
+    table.store(7, 3, 2.0, Bound.EXACT, None)
+    assert len(table) == 1
+    entry = table.probe(7)
+    assert entry is not None and entry.value == 2.0
+
+
+def test_invalid_size() -> None:
+    with pytest.raises(ValueError):
+        TranspositionTable(0)
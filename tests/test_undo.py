@@ -0,0 +1,81 @@
+import copy
+
+from conftest import random_moves
+from shape_definitions import ShapeKind
+from piece import Piece
+from blokus import Blokus
+from move import Move
+
+
+def state(blokus: Blokus) -> tuple:
+    """
+    Returns a deep copy of everything push and pop must restore.
+    """
+    players = range(1, blokus.num_players + 1)
+    return copy.deepcopy((
+        blokus.grid,
+        blokus.curr_player,
+        blokus.retired_players,
+        blokus.game_over,
+        [blokus.get_score(p) for p in players],
+        [blokus.remaining_shapes(p) for p in players],
+        blokus._frontier,
+        blokus._edges,
+        blokus._placed_moves,
+    ))
+
+
+def test_push_pop_restores_state() -> None:
+    """
+    Play a seeded random 3-player game with push, then pop every
+    move, checking that each earlier state is restored exactly.
+    """
+    blokus = Blokus(3, 10, {(0, 0), (0, 9), (9, 0), (9, 9)})
+    states = []
+    moves = []
+    for move in random_moves(blokus, 142):
+        states.append(state(blokus))
+        moves.append(move)
+
+    while moves:
+        assert blokus.pop() == moves.pop()
+        assert state(blokus) == states.pop()
+
+
+def test_push_illegal_move() -> None:
+    """
+    An illegal push changes nothing, and a repeated shape is an error.
+    """
+    blokus = Blokus(2, 14, {(4, 4), (9, 9)})
+    before = state(blokus)
+    assert not blokus.push(Move(ShapeKind.ONE, 0, (0, 0)))
+    assert state(blokus) == before
+
+    assert blokus.push(Move(ShapeKind.ONE, 0, (4, 4)))
+    assert blokus.push(Move(ShapeKind.ONE, 0, (9, 9)))
+    try:
+        blokus.push(Move(ShapeKind.ONE, 0, (5, 5)))
+        assert False, "Shape already played"
+    except ValueError:
+        pass
+
+
+def test_pop_reverts_maybe_place_and_retire() -> None:
+    """
+    pop also reverts moves made with maybe_place and retire,
+    including the end-of-game bonus.
+    """
+    blokus = Blokus(1, 5, {(0, 0)})
+    piece = Piece(blokus.shapes[ShapeKind.ONE])
+    piece.set_anchor((0, 0))
+    assert blokus.maybe_place(piece)
+    blokus.retire()
+    assert blokus.game_over
+
+    assert blokus.pop() is None
+    assert not blokus.game_over
+    assert blokus.retired_players == set()
+    assert blokus.pop() == Move(ShapeKind.ONE, 0, (0, 0))
+    assert blokus.get_score(1) == -89
+    assert blokus.grid == [[None] * 5] * 5
+    assert len(blokus.remaining_shapes(1)) == 21
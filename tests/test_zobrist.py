@@ -0,0 +1,53 @@
+from conftest import random_moves
+from shape_definitions import ShapeKind
+from blokus import Blokus
+from move import Move
+from zobrist import compute_hash, zobrist_keys
+
+
+def test_incremental_hash_matches_full_hash() -> None:
+    """
+    Through a seeded random 4-player game and back again with pop,
+    position_hash always equals the hash computed from scratch.
+    """
+    blokus = Blokus(4, 12, {(0, 0), (0, 11), (11, 0), (11, 11)})
+    hashes = []
+    for _ in random_moves(blokus, 8):
+        assert blokus.position_hash == compute_hash(blokus)
+        hashes.append(blokus.position_hash)
+    assert blokus.position_hash == compute_hash(blokus)
+    assert len(set(hashes)) == len(hashes)
+
+    while hashes:
+        blokus.pop()
+        assert blokus.position_hash == hashes.pop()
+
+
+def test_transposition() -> None:
+    """
+    The same position reached by different move orders has the
+    same hash.
+    """
+    one = Move(ShapeKind.ONE, 0, (0, 0))
+    two = Move(ShapeKind.TWO, 0, (1, 1))
+
+    first = Blokus(1, 5, {(0, 0), (1, 1)})
+    assert first.push(one)
+    assert first.push(two)
+
+    second = Blokus(1, 5, {(0, 0), (1, 1)})
+    assert second.push(two)
+    assert second.push(one)
+
+    assert first.grid == second.grid
+    assert first.position_hash == second.position_hash
+    assert first.position_hash != Blokus(1, 5, {(0, 0)}).position_hash
+
+
+def test_keys_are_deterministic() -> None:
+    """
+    Keys depend only on the board size.
+    """
+    assert zobrist_keys(14) is zobrist_keys(14)
+    assert zobrist_keys(14).to_move[1] != zobrist_keys(20).to_move[1]
+    assert zobrist_keys(14).squares[2][17] < 1 << 64